@@ -2,6 +2,7 @@ using System;
 using System.Collections.Generic;
 using System.IO;
 using System.Linq;
+using System.Text;
 using System.Text.Json;
 using Microsoft.SqlServer.TransactSql.ScriptDom;
 
@@ -61,6 +62,20 @@ namespace SqlParser
         }
 
         public void SaveMetadataToFile(string filePath)
+        {
+            string json = ToMetadataJson(out int realToRealCount, out int tempInvolvedCount);
+
+            File.WriteAllText(filePath, json);
+            Console.WriteLine($"📄 Metadata saved to: {filePath}");
+            Console.WriteLine($"📊 Real tables -> Real tables: {realToRealCount} lineages");
+            Console.WriteLine($"📊 Temp/CTE involved: {tempInvolvedCount} lineages");
+            Console.WriteLine($"📊 Included {MergePatterns.Count} MERGE patterns");
+            Console.WriteLine($"📊 Included {TempTablePatterns.Count} temp table patterns");
+        }
+
+        public string ToMetadataJson() => ToMetadataJson(out _, out _);
+
+        private string ToMetadataJson(out int realToRealCount, out int tempInvolvedCount)
         {
             // Helper method to determine if a table is temporary/CTE
             bool IsTemporaryOrCte(string tableName)
@@ -144,17 +159,13 @@ namespace SqlParser
                 analysis_timestamp = DateTime.UtcNow.ToString("yyyy-MM-ddTHH:mm:ssZ")
             };
 
-            string json = System.Text.Json.JsonSerializer.Serialize(metadata, new System.Text.Json.JsonSerializerOptions
+            realToRealCount = metadata.column_lineages.real_to_real.Count;
+            tempInvolvedCount = metadata.column_lineages.temp_involved.Count;
+
+            return System.Text.Json.JsonSerializer.Serialize(metadata, new System.Text.Json.JsonSerializerOptions
             {
                 WriteIndented = true
             });
-
-            File.WriteAllText(filePath, json);
-            Console.WriteLine($"📄 Metadata saved to: {filePath}");
-            Console.WriteLine($"📊 Real tables -> Real tables: {metadata.column_lineages.real_to_real.Count} lineages");
-            Console.WriteLine($"📊 Temp/CTE involved: {metadata.column_lineages.temp_involved.Count} lineages");
-            Console.WriteLine($"📊 Included {metadata.merge_patterns.Count} MERGE patterns");
-            Console.WriteLine($"📊 Included {metadata.temp_table_patterns.Count} temp table patterns");
         }
     }
 
@@ -966,15 +977,23 @@ namespace SqlParser
 
     class Program
     {
+        const string DefaultSchemaPath = "/Users/jamesglasgow/Projects/parser/schema.json";
+
         static void Main(string[] args)
         {
+            // Long-lived worker mode for the Python hybrid parser: "--serve [schema.json]"
+            if (args.Length > 0 && args[0] == "--serve")
+            {
+                Serve(args.Length > 1 ? args[1] : DefaultSchemaPath);
+                return;
+            }
+
             Console.WriteLine("Loading database schema...");
-            string schemaPath = "/Users/jamesglasgow/Projects/parser/schema.json";
             DatabaseSchema schema;
             
             try
             {
-                schema = new DatabaseSchema(schemaPath);
+                schema = new DatabaseSchema(DefaultSchemaPath);
                 Console.WriteLine($"Schema loaded with {schema.GetAllTables().Count()} tables");
                 
                 // Test schema functionality
@@ -990,8 +1009,23 @@ namespace SqlParser
                 return;
             }
 
-            Console.WriteLine("Parsing SQL script...");
-            string sqlScript = File.ReadAllText("/Users/jamesglasgow/Projects/parser/test.sql");
+            // The SQL file to parse can be passed as the first argument
+            string sqlPath = args.Length > 0 ? args[0] : "/Users/jamesglasgow/Projects/parser/test.sql";
+            var analysis = AnalyzeSqlFile(schema, sqlPath);
+            if (analysis == null) return;
+
+            // Print standard results
+            analysis.PrintResults();
+            
+            // Save metadata to file for Python parser
+            string metadataPath = "/Users/jamesglasgow/Projects/parser/csharp_metadata.json";
+            analysis.SaveMetadataToFile(metadataPath);
+        }
+
+        static ProcedureAnalysis? AnalyzeSqlFile(DatabaseSchema schema, string sqlPath)
+        {
+            Console.WriteLine($"Parsing SQL script: {sqlPath}");
+            string sqlScript = File.ReadAllText(sqlPath);
 
             var parser = new TSql150Parser(true, SqlEngineType.All);
             var fragment = parser.Parse(new StringReader(sqlScript), out var errors);
@@ -1000,7 +1034,7 @@ namespace SqlParser
             {
                 Console.WriteLine("Errors parsing script:");
                 foreach (var error in errors) Console.WriteLine($"- {error.Message}");
-                return;
+                return null;
             }
 
             var visitor = new LineageVisitor(schema);
@@ -1009,12 +1043,56 @@ namespace SqlParser
             Console.WriteLine($"DEBUG: Parsing complete, now resolving lineage...");
             visitor.ResolveAndMergeLineage();
 
-            // Print standard results
-            visitor.Analysis.PrintResults();
-            
-            // Save metadata to file for Python parser
-            string metadataPath = "/Users/jamesglasgow/Projects/parser/csharp_metadata.json";
-            visitor.Analysis.SaveMetadataToFile(metadataPath);
+            return visitor.Analysis;
+        }
+
+        static void Serve(string schemaPath)
+        {
+            // Responses go to the real stdout; all diagnostic output is moved to stderr
+            var output = Console.OpenStandardOutput();
+            Console.SetOut(Console.Error);
+
+            // A schema that can't be loaded is reported on every request instead of ending the
+            // worker, which the Python side would otherwise restart for each file
+            DatabaseSchema? schema = null;
+            string? schemaError = null;
+            try
+            {
+                schema = new DatabaseSchema(schemaPath);
+            }
+            catch (Exception ex)
+            {
+                schemaError = $"Error loading schema {schemaPath}: {ex.Message}";
+                Console.WriteLine(schemaError);
+            }
+
+            // Protocol: one SQL file path per input line, answered by "<byte length>\n<metadata JSON>".
+            // A JSON null means the file could not be analyzed; {"error": "..."} means the worker can't
+            // analyze anything (its schema failed to load).
+            string? line;
+            while ((line = Console.In.ReadLine()) != null)
+            {
+                string sqlPath = line.Trim();
+                if (sqlPath.Length == 0) continue;
+
+                string json;
+                try
+                {
+                    json = schema == null
+                        ? JsonSerializer.Serialize(new Dictionary<string, string> { ["error"] = schemaError! })
+                        : AnalyzeSqlFile(schema, sqlPath)?.ToMetadataJson() ?? "null";
+                }
+                catch (Exception ex)
+                {
+                    Console.WriteLine($"Error analyzing {sqlPath}: {ex.Message}");
+                    json = "null";
+                }
+
+                byte[] payload = Encoding.UTF8.GetBytes(json);
+                output.Write(Encoding.ASCII.GetBytes($"{payload.Length}\n"));
+                output.Write(payload);
+                output.Flush();
+            }
         }
     }
-}
\ No newline at end of file
+}
@@ -81,6 +81,7 @@ class EndToEndLineageTracer:
         
         # Add temp-involved lineages (these are crucial for end-to-end tracing)
         temp_lineages = self.csharp_metadata.get('column_lineages', {}).get('temp_involved', [])
+        real_tables = self._get_real_tables()  # built once, not twice per lineage
         for lineage in temp_lineages:
             source = f"{lineage['source_table']}.{lineage['source_column']}"
             target = f"{lineage['target_table']}.{lineage['target_column']}"
@@ -89,8 +90,8 @@ class EndToEndLineageTracer:
             self.reverse_graph[target].append(source)
             
             # Determine if source/target are real or temp
-            source_is_real = lineage['source_table'] in self._get_real_tables()
-            target_is_real = lineage['target_table'] in self._get_real_tables()
+            source_is_real = lineage['source_table'] in real_tables
+            target_is_real = lineage['target_table'] in real_tables
             
             self.column_metadata[source] = {
                 'table': lineage['source_table'],
@@ -269,24 +270,32 @@ class EndToEndLineageTracer:
         return end_to_end_lineages
     
     def display_end_to_end_lineages(self, lineages: List[Dict]):
-        """Display the end-to-end lineages in a clear format"""
-        print("🎯 " + "=" * 90)
-        print("   COMPLETE END-TO-END COLUMN LINEAGE (Staging → Final)")
-        print("=" * 92)
+        """Display the end-to-end lineages in a clear format
+        
+        The report is collected as lines and written in one call, since it prints several lines per lineage.
+        """
+        lines = [
+            "🎯 " + "=" * 90,
+            "   COMPLETE END-TO-END COLUMN LINEAGE (Staging → Final)",
+            "=" * 92,
+        ]
         
         if not lineages:
-            print("❌ No complete end-to-end lineages found")
-            print("   This might indicate:")
-            print("   • Complex transformations through multiple temp tables")
-            print("   • Missing intermediate connections in the SQL parsing")
-            print("   • Business logic that requires manual mapping")
-            print("   • Indirect relationships through reference data")
-            print("")
-            print("💡 Recommendation: Check temp-involved lineages for intermediate steps")
+            lines += [
+                "❌ No complete end-to-end lineages found",
+                "   This might indicate:",
+                "   • Complex transformations through multiple temp tables",
+                "   • Missing intermediate connections in the SQL parsing",
+                "   • Business logic that requires manual mapping",
+                "   • Indirect relationships through reference data",
+                "",
+                "💡 Recommendation: Check temp-involved lineages for intermediate steps",
+            ]
+            sys.stdout.write("\n".join(lines) + "\n")
             return
         
-        print(f"🎉 Found {len(lineages)} complete end-to-end column lineages!")
-        print("")
+        lines.append(f"🎉 Found {len(lineages)} complete end-to-end column lineages!")
+        lines.append("")
         
         # Sort by source table and column for better organization
         lineages_sorted = sorted(lineages, key=lambda x: (x['source_table'], x['source_column']))
@@ -298,8 +307,8 @@ class EndToEndLineageTracer:
         
         for target_table in sorted(by_target_table.keys()):
             table_lineages = by_target_table[target_table]
-            print(f"📋 TARGET TABLE: {target_table}")
-            print("─" * 60)
+            lines.append(f"📋 TARGET TABLE: {target_table}")
+            lines.append("─" * 60)
             
             for lineage in table_lineages:
                 source_col = lineage['source_column']
@@ -307,32 +316,34 @@ class EndToEndLineageTracer:
                 steps = lineage['steps']
                 intermediate_steps = lineage['intermediate_steps']
                 
-                print(f"   🎯 {source_col} → {target_col}")
+                lines.append(f"   🎯 {source_col} → {target_col}")
                 
                 if intermediate_steps:
                     intermediate_str = ' → '.join([col.split('.')[-1] for col in intermediate_steps])
-                    print(f"       via: {intermediate_str}")
+                    lines.append(f"       via: {intermediate_str}")
                 
-                print(f"       steps: {steps}")
-                print("")
+                lines.append(f"       steps: {steps}")
+                lines.append("")
         
         # Summary
-        print("📊 " + "=" * 90)
-        print("   END-TO-END LINEAGE SUMMARY")
-        print("=" * 92)
-        print(f"   Total end-to-end lineages: {len(lineages)}")
-        print(f"   Unique source tables: {len(set(l['source_table'] for l in lineages))}")
-        print(f"   Unique target tables: {len(set(l['target_table'] for l in lineages))}")
-        
-        if lineages:
-            avg_steps = sum(l['steps'] for l in lineages) / len(lineages)
-            print(f"   Average transformation steps: {avg_steps:.1f}")
-            
-            complex_lineages = [l for l in lineages if l['steps'] > 3]
-            if complex_lineages:
-                print(f"   Complex transformations (>3 steps): {len(complex_lineages)}")
-        
-        print("=" * 92)
+        lines += [
+            "📊 " + "=" * 90,
+            "   END-TO-END LINEAGE SUMMARY",
+            "=" * 92,
+            f"   Total end-to-end lineages: {len(lineages)}",
+            f"   Unique source tables: {len(set(l['source_table'] for l in lineages))}",
+            f"   Unique target tables: {len(set(l['target_table'] for l in lineages))}",
+        ]
+        
+        avg_steps = sum(l['steps'] for l in lineages) / len(lineages)
+        lines.append(f"   Average transformation steps: {avg_steps:.1f}")
+        
+        complex_lineages = [l for l in lineages if l['steps'] > 3]
+        if complex_lineages:
+            lines.append(f"   Complex transformations (>3 steps): {len(complex_lineages)}")
+        
+        lines.append("=" * 92)
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def display_diagnostic_info(self):
         """Display diagnostic information to help understand the data flow"""
@@ -6,13 +6,12 @@ Purpose: Parse SQL files using sqllineage + merge with C# metadata to produce
          comprehensive end-to-end column lineage mappings
 """
 
-import re
-import sqlparse
-from sqllineage.runner import LineageRunner
 from collections import defaultdict
 import argparse
 import json
+import os
 from pathlib import Path
+from lineage_common import PROCEDURE_BODY_RE, extract_column_flows
 
 class EnhancedSQLLineageParser:
     """
@@ -55,8 +54,7 @@ class EnhancedSQLLineageParser:
     
     def _extract_procedure_body(self):
         """Extract procedure body if it's a stored procedure"""
-        proc_match = re.search(r'CREATE\s+PROCEDURE\s+[^\s]+.*?AS\s*BEGIN(.*?)END\s*GO', 
-                              self.sql_content, re.DOTALL | re.IGNORECASE)
+        proc_match = PROCEDURE_BODY_RE.search(self.sql_content)
         if proc_match:
             body = proc_match.group(1).strip()
             print(f"✅ Extracted stored procedure body ({len(body):,} characters)")
@@ -139,58 +137,18 @@ class EnhancedSQLLineageParser:
         """Extract column flows using sqllineage"""
         print("🔍 Extracting column flows with sqllineage...")
         
-        # Split SQL into manageable statements
-        statements = []
-        try:
-            statements = sqlparse.split(self.procedure_body)
-        except:
-            statements = [self.procedure_body]
-        
-        # Filter for DML statements
-        dml_statements = []
-        for stmt in statements:
-            stmt_clean = stmt.strip()
-            if stmt_clean and re.search(r'\b(INSERT|UPDATE|MERGE|SELECT.*INTO|WITH)\b', 
-                                       stmt_clean, re.IGNORECASE):
-                dml_statements.append(stmt_clean)
-        
-        print(f"   📋 Processing {len(dml_statements)} DML statements")
-        
-        processed_count = 0
-        for i, stmt in enumerate(dml_statements):
-            try:
-                # Clean statement
-                clean_stmt = re.sub(r'@[a-zA-Z_]\w*', "'placeholder'", stmt)
-                clean_stmt = re.sub(r'--.*?$', '', clean_stmt, flags=re.MULTILINE)
-                clean_stmt = re.sub(r'/\*.*?\*/', '', clean_stmt, flags=re.DOTALL)
-                
-                if len(clean_stmt.strip()) < 20:
-                    continue
-                
-                # Parse with sqllineage
-                result = LineageRunner(clean_stmt, dialect="tsql")
-                column_lineage = result.get_column_lineage()
-                
-                # Extract flows
-                for mapping in column_lineage:
-                    if mapping and len(mapping) >= 2:
-                        source_col = str(mapping[0]).lower()
-                        target_col = str(mapping[-1]).lower()
-                        self.column_flows[source_col].add(target_col)
-                        
-                        # Update column-table mappings
-                        if '.' in source_col:
-                            source_table = '.'.join(source_col.split('.')[:-1])
-                            self.column_table_map[source_col] = source_table
-                        if '.' in target_col:
-                            target_table = '.'.join(target_col.split('.')[:-1])
-                            self.column_table_map[target_col] = target_table
-                
-                processed_count += 1
-                
-            except Exception as e:
-                # Silently continue on parse errors
-                continue
+        dml_count, processed_count, flows = extract_column_flows(self.procedure_body)
+        print(f"   📋 Processing {dml_count} DML statements")
+        
+        # Extract flows
+        for source_col, target_col in flows:
+            self.column_flows[source_col].add(target_col)
+            
+            # Update column-table mappings
+            if '.' in source_col:
+                self.column_table_map[source_col] = source_col.rpartition('.')[0]
+            if '.' in target_col:
+                self.column_table_map[target_col] = target_col.rpartition('.')[0]
         
         print(f"   ✅ Successfully processed {processed_count} statements")
         print(f"   ✅ Extracted {len(self.column_flows)} column flow mappings")
@@ -231,33 +189,50 @@ class EnhancedSQLLineageParser:
         """Trace end-to-end lineage from source tables to final target tables"""
         print("🎯 Tracing end-to-end column lineage...")
         
-        def find_target_paths(start_col, visited=None, max_depth=5):
-            """Find all paths from start column to target table columns"""
-            if visited is None:
-                visited = set()
-            if start_col in visited or max_depth <= 0:
-                return []
+        column_table_map = self.column_table_map
+        target_tables = self.target_tables
+        column_flows = self.column_flows
+        
+        def find_target_paths(start_col, max_depth=5):
+            """Find all paths (of at most max_depth columns) from start column to target table columns
             
-            visited.add(start_col)
-            paths = []
+            Iterative depth-first search over one shared path instead of recursing with a
+            copied visited set per branch.
+            """
+            if max_depth <= 0:
+                return []
             
             # Check if current column is in a target table
-            if start_col in self.column_table_map:
-                table = self.column_table_map[start_col]
-                if table in self.target_tables:
-                    return [[start_col]]
+            if column_table_map.get(start_col) in target_tables:
+                return [[start_col]]
             
-            # Continue following flows
-            for next_col in self.column_flows.get(start_col, []):
-                if next_col not in visited:
-                    sub_paths = find_target_paths(next_col, visited.copy(), max_depth - 1)
-                    for path in sub_paths:
-                        paths.append([start_col] + path)
+            paths = []
+            path = [start_col]
+            on_path = {start_col}
+            stack = [iter(column_flows.get(start_col, ()))]
+            while stack:
+                for next_col in stack[-1]:
+                    if next_col in on_path:
+                        continue
+                    # A column in a target table ends the path
+                    if column_table_map.get(next_col) in target_tables:
+                        paths.append(path + [next_col])
+                        continue
+                    path.append(next_col)
+                    on_path.add(next_col)
+                    # Continue following flows while the path is still under the depth limit
+                    stack.append(iter(column_flows.get(next_col, ()) if len(path) < max_depth else ()))
+                    break
+                else:
+                    stack.pop()
+                    on_path.discard(path.pop())
             
             return paths
         
-        # Generate end-to-end mappings
-        all_mappings = []
+        # Generate end-to-end mappings, deduplicated as they are found: many paths usually reach the
+        # same target column, so key on (source table, source column, target table, target column)
+        # and keep the first mapping for each
+        unique_mappings = {}
         
         # Trace from each source table column
         for source_table in self.source_tables:
@@ -278,21 +253,24 @@ class EnhancedSQLLineageParser:
                             source_col_name = source_column
                             final_col_name = final_column.split('.')[-1]
                             
-                            all_mappings.append({
-                                'source_table': source_table,
-                                'source_column': source_col_name,
-                                'target_table': final_table,
-                                'target_column': final_col_name,
-                                'path_length': len(path),
-                                'transformation_type': 'traced'
-                            })
+                            key = (source_table, source_col_name, final_table, final_col_name)
+                            if key not in unique_mappings:
+                                unique_mappings[key] = {
+                                    'source_table': source_table,
+                                    'source_column': source_col_name,
+                                    'target_table': final_table,
+                                    'target_column': final_col_name,
+                                    'path_length': len(path),
+                                    'transformation_type': 'traced'
+                                }
         
         # Add direct schema-based matches for missing mappings
-        schema_mappings = self._generate_schema_based_mappings()
-        all_mappings.extend(schema_mappings)
+        for mapping in self._generate_schema_based_mappings():
+            key = (mapping['source_table'], mapping['source_column'],
+                   mapping['target_table'], mapping['target_column'])
+            unique_mappings.setdefault(key, mapping)
         
-        # Remove duplicates and filter
-        self.end_to_end_mappings = self._deduplicate_mappings(all_mappings)
+        self.end_to_end_mappings = list(unique_mappings.values())
         
         print(f"   ✅ Generated {len(self.end_to_end_mappings)} end-to-end mappings")
     
@@ -357,20 +335,6 @@ class EnhancedSQLLineageParser:
         
         return False
     
-    def _deduplicate_mappings(self, mappings):
-        """Remove duplicate mappings"""
-        seen = set()
-        unique_mappings = []
-        
-        for mapping in mappings:
-            key = (mapping['source_table'], mapping['source_column'],
-                   mapping['target_table'], mapping['target_column'])
-            if key not in seen:
-                seen.add(key)
-                unique_mappings.append(mapping)
-        
-        return unique_mappings
-    
     def analyze(self):
         """Main analysis method"""
         print("🔍 " + "=" * 80)
@@ -459,9 +423,14 @@ def main():
     parser.add_argument('--metadata', '-m', help='Path to C# metadata JSON', default='csharp_metadata.json')
     parser.add_argument('--schema', '-s', help='Path to schema JSON', default='schema.json')
     parser.add_argument('--export', '-e', help='Export results to JSON file')
+    parser.add_argument('--no-cache', action='store_true', help='Always run sqllineage instead of using cached column flows')
     
     args = parser.parse_args()
     
+    if args.no_cache:
+        # Through the environment so the sqllineage pool processes see it too
+        os.environ['SQL_LINEAGE_NO_CACHE'] = '1'
+    
     try:
         # Create and run parser
         parser_instance = EnhancedSQLLineageParser(args.sql_file, args.metadata, args.schema)
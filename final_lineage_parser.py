@@ -5,13 +5,12 @@ Produces clean, focused end-to-end column lineage mappings
 matching the specific requirements provided
 """
 
-import re
-import sqlparse
-from sqllineage.runner import LineageRunner
 from collections import defaultdict
 import argparse
 import json
+import os
 from pathlib import Path
+from lineage_common import PROCEDURE_BODY_RE, extract_column_flows
 
 class FinalSQLLineageParser:
     """
@@ -53,8 +52,7 @@ class FinalSQLLineageParser:
     
     def _extract_procedure_body(self):
         """Extract procedure body if it's a stored procedure"""
-        proc_match = re.search(r'CREATE\s+PROCEDURE\s+[^\s]+.*?AS\s*BEGIN(.*?)END\s*GO', 
-                              self.sql_content, re.DOTALL | re.IGNORECASE)
+        proc_match = PROCEDURE_BODY_RE.search(self.sql_content)
         if proc_match:
             body = proc_match.group(1).strip()
             print(f"✅ Extracted stored procedure body ({len(body):,} characters)")
@@ -146,57 +144,18 @@ class FinalSQLLineageParser:
         """Extract column flows using sqllineage"""
         print("🔍 Extracting column flows with sqllineage...")
         
-        statements = []
-        try:
-            statements = sqlparse.split(self.procedure_body)
-        except:
-            statements = [self.procedure_body]
-        
-        # Filter for DML statements
-        dml_statements = []
-        for stmt in statements:
-            stmt_clean = stmt.strip()
-            if stmt_clean and re.search(r'\b(INSERT|UPDATE|MERGE|SELECT.*INTO|WITH)\b', 
-                                       stmt_clean, re.IGNORECASE):
-                dml_statements.append(stmt_clean)
-        
-        print(f"   📋 Processing {len(dml_statements)} DML statements")
-        
-        processed_count = 0
-        for stmt in dml_statements:
-            try:
-                # Clean statement
-                clean_stmt = re.sub(r'@[a-zA-Z_]\w*', "'placeholder'", stmt)
-                clean_stmt = re.sub(r'--.*?$', '', clean_stmt, flags=re.MULTILINE)
-                clean_stmt = re.sub(r'/\*.*?\*/', '', clean_stmt, flags=re.DOTALL)
-                
-                if len(clean_stmt.strip()) < 20:
-                    continue
-                
-                # Parse with sqllineage
-                result = LineageRunner(clean_stmt, dialect="tsql")
-                column_lineage = result.get_column_lineage()
-                
-                # Extract flows
-                for mapping in column_lineage:
-                    if mapping and len(mapping) >= 2:
-                        source_col = str(mapping[0]).lower()
-                        target_col = str(mapping[-1]).lower()
-                        self.column_flows[source_col].add(target_col)
-                        
-                        # Update column-table mappings
-                        if '.' in source_col:
-                            source_table = '.'.join(source_col.split('.')[:-1])
-                            self.column_table_map[source_col] = source_table
-                        if '.' in target_col:
-                            target_table = '.'.join(target_col.split('.')[:-1])
-                            self.column_table_map[target_col] = target_table
-                
-                processed_count += 1
-                
-            except Exception:
-                # Silently continue on parse errors
-                continue
+        dml_count, processed_count, flows = extract_column_flows(self.procedure_body)
+        print(f"   📋 Processing {dml_count} DML statements")
+        
+        # Extract flows
+        for source_col, target_col in flows:
+            self.column_flows[source_col].add(target_col)
+            
+            # Update column-table mappings
+            if '.' in source_col:
+                self.column_table_map[source_col] = source_col.rpartition('.')[0]
+            if '.' in target_col:
+                self.column_table_map[target_col] = target_col.rpartition('.')[0]
         
         print(f"   ✅ Successfully processed {processed_count} statements")
         print(f"   ✅ Extracted {len(self.column_flows)} column flow mappings")
@@ -288,26 +247,31 @@ class FinalSQLLineageParser:
                         })
         
         # Add additional mappings from traced flows
-        def find_target_paths(start_col, max_depth=3):
-            """Find paths from source to final targets"""
-            if max_depth <= 0:
-                return []
-            
-            paths = []
+        # Only the final column of each path is used, so memoize the finals reachable
+        # from (column, remaining depth); shared suffixes are then resolved once
+        finals_cache = {}
+        
+        def find_target_finals(start_col, max_depth=3):
+            """Find final target columns reachable from a column, in path order"""
+            key = (start_col, max_depth)
+            if key in finals_cache:
+                return finals_cache[key]
             
+            if max_depth <= 0:
+                finals = ()
             # Check if current column is in a final target table
-            if start_col in self.column_table_map:
-                table = self.column_table_map[start_col]
-                if table in self.final_target_tables:
-                    return [[start_col]]
+            elif self.column_table_map.get(start_col) in self.final_target_tables:
+                finals = (start_col,)
+            else:
+                # Follow flows
+                reached = {}
+                for next_col in self.column_flows.get(start_col, []):
+                    for final_column in find_target_finals(next_col, max_depth - 1):
+                        reached[final_column] = None
+                finals = tuple(reached)
             
-            # Follow flows
-            for next_col in self.column_flows.get(start_col, []):
-                sub_paths = find_target_paths(next_col, max_depth - 1)
-                for path in sub_paths:
-                    paths.append([start_col] + path)
-            
-            return paths
+            finals_cache[key] = finals
+            return finals
         
         # Trace from source tables
         for source_table in self.source_tables:
@@ -316,22 +280,21 @@ class FinalSQLLineageParser:
             for source_column in source_columns:
                 source_full = f"{source_table}.{source_column}"
                 
-                paths = find_target_paths(source_full)
+                # A source column that is itself final has no path of two or more columns
+                if self.column_table_map.get(source_full) in self.final_target_tables:
+                    continue
                 
-                for path in paths:
-                    if len(path) >= 2:
-                        final_column = path[-1]
-                        if final_column in self.column_table_map:
-                            final_table = self.column_table_map[final_column]
-                            final_col_name = final_column.split('.')[-1]
-                            
-                            all_mappings.append({
-                                'source_table': source_table,
-                                'source_column': source_column,
-                                'target_table': final_table,
-                                'target_column': final_col_name,
-                                'transformation_type': 'traced_flow'
-                            })
+                for final_column in find_target_finals(source_full):
+                    final_table = self.column_table_map[final_column]
+                    final_col_name = final_column.split('.')[-1]
+                    
+                    all_mappings.append({
+                        'source_table': source_table,
+                        'source_column': source_column,
+                        'target_table': final_table,
+                        'target_column': final_col_name,
+                        'transformation_type': 'traced_flow'
+                    })
         
         # Remove duplicates and filter meaningful mappings
         self.end_to_end_mappings = self._filter_meaningful_mappings(all_mappings)
@@ -441,9 +404,14 @@ def main():
     parser.add_argument('--metadata', '-m', help='Path to C# metadata JSON', default='csharp_metadata.json')
     parser.add_argument('--schema', '-s', help='Path to schema JSON', default='schema.json')
     parser.add_argument('--export', '-e', help='Export results to JSON file')
+    parser.add_argument('--no-cache', action='store_true', help='Always run sqllineage instead of using cached column flows')
     
     args = parser.parse_args()
     
+    if args.no_cache:
+        # Through the environment so the sqllineage pool processes see it too
+        os.environ['SQL_LINEAGE_NO_CACHE'] = '1'
+    
     try:
         # Create and run parser
         parser_instance = FinalSQLLineageParser(args.sql_file, args.metadata, args.schema)
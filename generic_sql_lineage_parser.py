@@ -1,10 +1,161 @@
+import os
 import re
+import sys
+import atexit
+import multiprocessing
+import heapq
+from array import array
 import sqlparse
 from sqllineage.runner import LineageRunner
-from collections import defaultdict
-import argparse
+from collections import defaultdict, namedtuple
+from itertools import chain
+from datetime import datetime
+from types import SimpleNamespace
 import json
 from pathlib import Path
+from functools import lru_cache
+
+try:
+    import re2 as _re_fast  # optional: linear-time RE2 engine for the whole-body scans
+except ImportError:
+    _re_fast = re
+
+# One column-level lineage edge; a namedtuple is smaller than a dict and its fields are C-level lookups
+ColumnMapping = namedtuple(
+    'ColumnMapping',
+    'source_column target_column full_path statement_num transformation_steps'
+)
+
+# Patterns used on every run, compiled once at import instead of per call.
+# Scans over the whole SQL text go through _re_fast and spell their flags inline
+# so they compile under both engines; patterns RE2 can't run (lookarounds) stay on re.
+_PROC_START_RE = _re_fast.compile(r'(?is)CREATE\s+PROCEDURE\s+[^\s]+.*?AS\s*BEGIN')
+_BLOCK_KEYWORD_RE = _re_fast.compile(r'(?i)\b(BEGIN|END)\b')
+_TABLE_REF_PATTERNS = (
+    ('from_tables', _re_fast.compile(r'(?i)FROM\s+([#\w\.\[\]]+)')),
+    ('insert_tables', _re_fast.compile(r'(?i)INSERT\s+(?:INTO\s+)?([#\w\.\[\]]+)')),
+    ('update_tables', _re_fast.compile(r'(?i)UPDATE\s+([#\w\.\[\]]+)')),
+    ('join_tables', _re_fast.compile(r'(?i)(?:INNER\s+|LEFT\s+|RIGHT\s+|FULL\s+|CROSS\s+)?JOIN\s+([#\w\.\[\]]+)')),
+    ('with_tables', _re_fast.compile(r'(?i)WITH\s+([#\w\.\[\]]+)\s+AS')),
+)
+_NOLOCK_RE = re.compile(r'\s+(?:WITH\s*\(NOLOCK\)|NOLOCK)', re.IGNORECASE)
+_DML_KEYWORD_RE = re.compile(r'\b(INSERT|UPDATE|MERGE|DELETE|WITH)\b', re.IGNORECASE)
+_SELECT_INTO_RE = re.compile(r'\b(SELECT)\b.*\b(INTO|FROM)\b', re.IGNORECASE)
+_DML_STATEMENT_RE = re.compile(
+    r'((?:INSERT|UPDATE|MERGE|DELETE|WITH)\s+(?:[^;]|;(?!\s*(?:INSERT|UPDATE|MERGE|DELETE|WITH|$)))*)',
+    re.IGNORECASE | re.DOTALL
+)
+_VARIABLE_RE = _re_fast.compile(r'@[a-zA-Z_]\w*')
+_LINE_COMMENT_RE = _re_fast.compile(r'(?m)--.*?$')
+_BLOCK_COMMENT_RE = _re_fast.compile(r'(?s)/\*.*?\*/')
+_FINAL_TARGET_PATTERNS = (
+    _re_fast.compile(r'(?i)INSERT\s+INTO\s+([A-Za-z_][A-Za-z0-9_]*\.[A-Za-z_][A-Za-z0-9_]*)'),
+    _re_fast.compile(r'(?i)MERGE\s+([A-Za-z_][A-Za-z0-9_]*\.[A-Za-z_][A-Za-z0-9_]*)'),
+    _re_fast.compile(r'(?i)UPDATE\s+([A-Za-z_][A-Za-z0-9_]*\.[A-Za-z_][A-Za-z0-9_]*)'),
+)
+_BRACKETED_TARGET_PATTERNS = (
+    _re_fast.compile(r'(?i)INSERT\s+INTO\s+\[?([A-Za-z_][A-Za-z0-9_]*)\]?\.\[?([A-Za-z_][A-Za-z0-9_]*)\]?'),
+    _re_fast.compile(r'(?i)MERGE\s+\[?([A-Za-z_][A-Za-z0-9_]*)\]?\.\[?([A-Za-z_][A-Za-z0-9_]*)\]?'),
+)
+_INSERT_TARGET_RE = _re_fast.compile(r'(?i)INSERT\s+INTO\s+([^(\s]+)')
+
+# Naming hints for _categorize_table_name; module tuples so they are not rebuilt per table
+# Common source table patterns
+_SOURCE_TABLE_PATTERNS = (
+    'staging', 'stage', 'src', 'source', 'raw', 'input', 'import',
+    'ext', 'external', 'ref', 'reference', 'lookup', 'dim', 'fact'
+)
+
+# Common target table patterns
+_TARGET_TABLE_PATTERNS = (
+    'core', 'final', 'output', 'dest', 'destination', 'prod', 'production',
+    'audit', 'log', 'history', 'archive', 'summary', 'agg', 'aggregate'
+)
+
+# Intermediate/temporary table patterns
+_INTERMEDIATE_TABLE_PATTERNS = (
+    '#', 'temp', 'tmp', 'work', 'staging', 'buffer', 'cache',
+    'intermediate', 'process', 'transform', 'enrich', 'clean'
+)
+
+
+@lru_cache(maxsize=None)
+def _categorize_table_name(table_name):
+    """Categorize a table by naming pattern (cached - the same tables recur in every statement)"""
+    table_lower = table_name.lower()
+    
+    # Check for intermediate first (most specific)
+    if any(pattern in table_lower for pattern in _INTERMEDIATE_TABLE_PATTERNS):
+        return 'intermediate'
+    
+    # Check for source patterns
+    if any(pattern in table_lower for pattern in _SOURCE_TABLE_PATTERNS):
+        return 'source'
+    
+    # Check for target patterns
+    if any(pattern in table_lower for pattern in _TARGET_TABLE_PATTERNS):
+        return 'target'
+    
+    # Default categorization based on context will be done later
+    return 'unknown'
+
+
+USAGE = """usage: generic_sql_lineage_parser.py [-h] [--metadata METADATA] [--schema SCHEMA]
+                                     [--export {json}] [--output OUTPUT] sql_file
+
+Enhanced SQL Lineage Parser with JSON Metadata
+
+positional arguments:
+  sql_file              Path to SQL file to analyze
+
+options:
+  -h, --help            show this help message and exit
+  --metadata, -m        Path to C# metadata JSON file (default: csharp_metadata.json)
+  --schema, -s          Path to schema JSON file (default: schema.json)
+  --export, -e {json}   Export results to file format
+  --output, -o          Output file path"""
+_lineage_pool = None
+
+
+def _get_lineage_pool():
+    """Return the shared LineageRunner process pool, or None when already inside a worker process"""
+    global _lineage_pool
+    if multiprocessing.parent_process() is not None or (os.cpu_count() or 1) < 2:
+        # Batch workers are already one process per file; don't fan out again
+        return None
+    if _lineage_pool is None:
+        from concurrent.futures import ProcessPoolExecutor
+        _lineage_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        atexit.register(_lineage_pool.shutdown)
+    return _lineage_pool
+
+
+def _run_lineage(clean_stmt):
+    """Parse one statement with sqllineage and return picklable results
+    
+    Columns come back as strings (None for empty path slots) together with the
+    parent table of the first and last column, which is all the caller reads.
+    """
+    result = LineageRunner(clean_stmt, dialect="tsql")
+    column_lineage = []
+    for mapping in result.get_column_lineage():
+        if not mapping:
+            column_lineage.append(((), None, None))
+            continue
+        source_col = mapping[0]
+        target_col = mapping[-1]
+        column_lineage.append((
+            tuple(str(m) if m else None for m in mapping),
+            str(source_col.parent) if source_col and hasattr(source_col, 'parent') else None,
+            str(target_col.parent) if target_col and hasattr(target_col, 'parent') else None,
+        ))
+    return (
+        column_lineage,
+        [str(t) for t in result.source_tables],
+        [str(t) for t in result.target_tables],
+        [str(t) for t in getattr(result, 'intermediate_tables', [])],
+    )
+
 
 class GenericSQLLineageParser:
     """
@@ -12,7 +163,7 @@ class GenericSQLLineageParser:
     Uses sqllineage + JSON metadata to discover all lineage relationships
     """
     
-    def __init__(self, sql_file_path, metadata_json_path=None, schema_json_path=None):
+    def __init__(self, sql_file_path, metadata_json_path=None, schema_json_path=None, metadata=None):
         self.sql_file_path = sql_file_path
         self.metadata_json_path = metadata_json_path or "csharp_metadata.json"
         self.schema_json_path = schema_json_path or "schema.json"
@@ -20,8 +171,8 @@ class GenericSQLLineageParser:
         self.sql_content = self._read_sql_file()
         self.procedure_body = self._extract_procedure_body()
         
-        # Load metadata if available
-        self.metadata = self._load_metadata()
+        # Load metadata if available; callers that already hold it pass it in instead of the file
+        self.metadata = metadata if metadata is not None else self._load_metadata()
         self.schema = self._load_schema()
         
         # Dynamic discovery containers
@@ -30,6 +181,11 @@ class GenericSQLLineageParser:
         self.intermediate_tables = {}
         self.column_mappings = []
         self.table_relationships = defaultdict(set)
+        self._frozen_relationships = None  # source -> sorted tuple of targets, built once per analysis
+        self._frozen_tables = None  # per table section: sorted (table, sorted columns, usage count) rows
+        self._cm = None  # column-oriented view of column_mappings, built once per analysis
+        self._last_analysis = None  # results dict from the most recent analyze() call
+        self._export_sections = None  # serialized export sections derived from _last_analysis
         self.processing_stages = []
         self.end_to_end_mappings = []  # Store final source-to-target mappings
         
@@ -69,7 +225,7 @@ class GenericSQLLineageParser:
         # For stored procedures, we need to match balanced BEGIN/END blocks
         
         # First, find the start of the procedure body
-        proc_start_match = re.search(r'CREATE\s+PROCEDURE\s+[^\s]+.*?AS\s*BEGIN', self.sql_content, re.DOTALL | re.IGNORECASE)
+        proc_start_match = _PROC_START_RE.search(self.sql_content)
         if not proc_start_match:
             print(f"ℹ️  Processing as general SQL script ({len(self.sql_content):,} characters)")
             return self.sql_content
@@ -77,30 +233,18 @@ class GenericSQLLineageParser:
         # Find the position after "AS BEGIN"
         start_pos = proc_start_match.end()
         
-        # Find the matching END GO by counting nested BEGIN/END blocks
+        # Find the matching END GO by counting nested BEGIN/END blocks in one forward scan
         begin_count = 1  # We already have one BEGIN from "AS BEGIN"
-        pos = start_pos
         end_pos = None
         
-        while pos < len(self.sql_content) and begin_count > 0:
-            # Look for the next BEGIN or END
-            begin_match = re.search(r'\bBEGIN\b', self.sql_content[pos:], re.IGNORECASE)
-            end_match = re.search(r'\bEND\b', self.sql_content[pos:], re.IGNORECASE)
-            
-            if begin_match and (not end_match or begin_match.start() < end_match.start()):
-                # Found BEGIN before END
+        for keyword in _BLOCK_KEYWORD_RE.finditer(self.sql_content, start_pos):
+            if keyword.group(1).upper() == 'BEGIN':
                 begin_count += 1
-                pos += begin_match.end()
-            elif end_match:
-                # Found END
+            else:
                 begin_count -= 1
-                pos += end_match.end()
                 if begin_count == 0:
-                    end_pos = start_pos + end_match.start()
+                    end_pos = keyword.start()
                     break
-            else:
-                # No more BEGIN or END found
-                break
         
         if end_pos:
             body = self.sql_content[start_pos:end_pos].strip()
@@ -113,40 +257,7 @@ class GenericSQLLineageParser:
     
     def _categorize_table(self, table_name):
         """Dynamically categorize tables based on naming patterns and usage"""
-        table_lower = table_name.lower()
-        
-        # Common source table patterns
-        source_patterns = [
-            'staging', 'stage', 'src', 'source', 'raw', 'input', 'import',
-            'ext', 'external', 'ref', 'reference', 'lookup', 'dim', 'fact'
-        ]
-        
-        # Common target table patterns
-        target_patterns = [
-            'core', 'final', 'output', 'dest', 'destination', 'prod', 'production',
-            'audit', 'log', 'history', 'archive', 'summary', 'agg', 'aggregate'
-        ]
-        
-        # Intermediate/temporary table patterns
-        intermediate_patterns = [
-            '#', 'temp', 'tmp', 'work', 'staging', 'buffer', 'cache',
-            'intermediate', 'process', 'transform', 'enrich', 'clean'
-        ]
-        
-        # Check for intermediate first (most specific)
-        if any(pattern in table_lower for pattern in intermediate_patterns):
-            return 'intermediate'
-        
-        # Check for source patterns
-        if any(pattern in table_lower for pattern in source_patterns):
-            return 'source'
-        
-        # Check for target patterns
-        if any(pattern in table_lower for pattern in target_patterns):
-            return 'target'
-        
-        # Default categorization based on context will be done later
-        return 'unknown'
+        return _categorize_table_name(table_name)
     
     def _extract_table_references(self):
         """Extract all table references from SQL using regex patterns"""
@@ -159,21 +270,13 @@ class GenericSQLLineageParser:
         }
         
         # Extract different types of table references
-        patterns = {
-            'from_tables': r'FROM\s+([#\w\.\[\]]+)',
-            'insert_tables': r'INSERT\s+(?:INTO\s+)?([#\w\.\[\]]+)',
-            'update_tables': r'UPDATE\s+([#\w\.\[\]]+)',
-            'join_tables': r'(?:INNER\s+|LEFT\s+|RIGHT\s+|FULL\s+|CROSS\s+)?JOIN\s+([#\w\.\[\]]+)',
-            'with_tables': r'WITH\s+([#\w\.\[\]]+)\s+AS'
-        }
-        
-        for pattern_type, pattern in patterns.items():
-            matches = re.findall(pattern, self.procedure_body, re.IGNORECASE)
+        for pattern_type, pattern in _TABLE_REF_PATTERNS:
+            matches = pattern.findall(self.procedure_body)
             for match in matches:
                 # Clean up table name
                 table_name = match.strip().replace('[', '').replace(']', '')
                 # Remove common suffixes
-                table_name = re.sub(r'\s+(?:WITH\s*\(NOLOCK\)|NOLOCK)', '', table_name, flags=re.IGNORECASE)
+                table_name = _NOLOCK_RE.sub('', table_name)
                 tables[pattern_type].add(table_name.lower())
         
         return tables
@@ -208,17 +311,16 @@ class GenericSQLLineageParser:
                 stmt_clean = stmt_str.strip()
                 
                 # Check if it's a DML statement by looking at keywords
-                if re.search(r'\b(INSERT|UPDATE|MERGE|DELETE|WITH)\b', stmt_clean, re.IGNORECASE):
+                if _DML_KEYWORD_RE.search(stmt_clean):
                     dml_statements.append(stmt_str)
                 # Also include SELECT statements that seem to be part of INSERT/CREATE
-                elif re.search(r'\b(SELECT)\b.*\b(INTO|FROM)\b', stmt_clean, re.IGNORECASE):
+                elif _SELECT_INTO_RE.search(stmt_clean):
                     dml_statements.append(stmt_str)
         
         # If we still don't have enough statements, try to extract them differently
         if len(dml_statements) < 5:  # Heuristic: complex procedures should have more statements
             # Look for patterns that indicate statement boundaries
-            pattern = r'((?:INSERT|UPDATE|MERGE|DELETE|WITH)\s+(?:[^;]|;(?!\s*(?:INSERT|UPDATE|MERGE|DELETE|WITH|$)))*)'
-            additional_statements = re.findall(pattern, self.procedure_body, re.IGNORECASE | re.DOTALL)
+            additional_statements = _DML_STATEMENT_RE.findall(self.procedure_body)
             dml_statements.extend(additional_statements)
         
         print(f"🔍 Found {len(dml_statements)} DML statements to analyze")
@@ -228,57 +330,67 @@ class GenericSQLLineageParser:
             print("⚠️  Few DML statements detected. Showing first 500 chars of content:")
             print(f"   {self.procedure_body[:500]}...")
         
-        # Analyze each statement
+        # Loop invariants for the per-statement work below
+        table_dicts = (self.source_tables, self.target_tables, self.intermediate_tables)
+        categorize = self._categorize_table
+        
+        # Clean statements for better parsing, skipping very short ones
+        prepared = []
         for i, stmt in enumerate(dml_statements):
+            # Each substitution only runs when its marker is present; most statements need none of them
+            clean_stmt = _VARIABLE_RE.sub("'placeholder_value'", stmt) if '@' in stmt else stmt
+            if '--' in clean_stmt:
+                clean_stmt = _LINE_COMMENT_RE.sub('', clean_stmt)  # Remove comments
+            if '/*' in clean_stmt:
+                clean_stmt = _BLOCK_COMMENT_RE.sub('', clean_stmt)  # Remove block comments
+            if len(clean_stmt.strip()) >= 20:
+                prepared.append((i, stmt, clean_stmt))
+        
+        # Statements are independent, so sqllineage parses them in parallel;
+        # results are still consumed in statement order
+        pool = _get_lineage_pool() if len(prepared) > 1 else None
+        if pool is not None:
+            pending = [pool.submit(_run_lineage, clean_stmt) for _, _, clean_stmt in prepared]
+        
+        # Analyze each statement
+        for n, (i, stmt, clean_stmt) in enumerate(prepared):
             try:
-                # Clean statement for better parsing
-                clean_stmt = re.sub(r'@[a-zA-Z_]\w*', "'placeholder_value'", stmt)
-                clean_stmt = re.sub(r'--.*?$', '', clean_stmt, flags=re.MULTILINE)  # Remove comments
-                clean_stmt = re.sub(r'/\*.*?\*/', '', clean_stmt, flags=re.DOTALL)  # Remove block comments
-                
-                # Skip very short statements
-                if len(clean_stmt.strip()) < 20:
-                    continue
-                
                 # Use sqllineage to get detailed lineage
-                result = LineageRunner(clean_stmt, dialect="tsql")
-                column_lineage = result.get_column_lineage()
-                source_tables = result.source_tables
-                target_tables = result.target_tables
-                intermediate_tables = getattr(result, 'intermediate_tables', [])
+                if pool is not None:
+                    column_lineage, source_tables, target_tables, intermediate_tables = pending[n].result()
+                else:
+                    column_lineage, source_tables, target_tables, intermediate_tables = _run_lineage(clean_stmt)
                 
                 # Record processing stage
                 stage_info = {
                     'statement_num': i + 1,
                     'statement_type': self._get_statement_type(stmt),
-                    'source_tables': [str(t) for t in source_tables],
-                    'target_tables': [str(t) for t in target_tables],
-                    'intermediate_tables': [str(t) for t in intermediate_tables],
+                    'source_tables': source_tables,
+                    'target_tables': target_tables,
+                    'intermediate_tables': intermediate_tables,
                     'column_mappings_count': len(column_lineage)
                 }
                 self.processing_stages.append(stage_info)
                 
-                # Record table relationships
-                for source in source_tables:
-                    for target in target_tables:
-                        self.table_relationships[str(source)].add(str(target))
+                # Record table relationships: every source feeds every target, added one set per source
+                if target_tables:
+                    for source in source_tables:
+                        self.table_relationships[source].update(target_tables)
                 
                 # Record column mappings
-                for mapping in column_lineage:
-                    if mapping and len(mapping) >= 2:
-                        self.column_mappings.append({
-                            'source_column': str(mapping[0]) if mapping[0] else 'unknown',
-                            'target_column': str(mapping[-1]) if mapping[-1] else 'unknown',
-                            'full_path': [str(m) for m in mapping if m],
-                            'statement_num': i + 1,
-                            'transformation_steps': len(mapping) - 1
-                        })
+                for path, _, _ in column_lineage:
+                    if len(path) >= 2:
+                        self.column_mappings.append(ColumnMapping(
+                            source_column=path[0] or 'unknown',
+                            target_column=path[-1] or 'unknown',
+                            full_path=[m for m in path if m],
+                            statement_num=i + 1,
+                            transformation_steps=len(path) - 1
+                        ))
                 
                 # Categorize tables dynamically
-                all_tables = list(source_tables) + list(target_tables) + list(intermediate_tables)
-                for table in all_tables:
-                    table_name = str(table)
-                    category = self._categorize_table(table_name)
+                for table_name in chain(source_tables, target_tables, intermediate_tables):
+                    category = categorize(table_name)
                     
                     if category == 'source':
                         if table_name not in self.source_tables:
@@ -294,26 +406,21 @@ class GenericSQLLineageParser:
                         self.intermediate_tables[table_name]['usage_count'] += 1
                 
                 # Extract column information
-                for mapping in column_lineage:
-                    if mapping and len(mapping) >= 2:
-                        source_col = mapping[0]
-                        target_col = mapping[-1]
-                        
-                        if source_col and hasattr(source_col, 'parent'):
-                            parent_table = str(source_col.parent)
-                            col_name = str(source_col).split('.')[-1] if '.' in str(source_col) else str(source_col)
+                for path, source_parent, target_parent in column_lineage:
+                    if len(path) >= 2:
+                        if source_parent is not None:
+                            col_name = path[0].rpartition('.')[2]
                             
-                            for table_dict in [self.source_tables, self.target_tables, self.intermediate_tables]:
-                                if parent_table in table_dict:
-                                    table_dict[parent_table]['columns'].add(col_name)
+                            for table_dict in table_dicts:
+                                if source_parent in table_dict:
+                                    table_dict[source_parent]['columns'].add(col_name)
                         
-                        if target_col and hasattr(target_col, 'parent'):
-                            parent_table = str(target_col.parent)
-                            col_name = str(target_col).split('.')[-1] if '.' in str(target_col) else str(target_col)
+                        if target_parent is not None:
+                            col_name = path[-1].rpartition('.')[2]
                             
-                            for table_dict in [self.source_tables, self.target_tables, self.intermediate_tables]:
-                                if parent_table in table_dict:
-                                    table_dict[parent_table]['columns'].add(col_name)
+                            for table_dict in table_dicts:
+                                if target_parent in table_dict:
+                                    table_dict[target_parent]['columns'].add(col_name)
                 
             except Exception as e:
                 print(f"   ⚠️ Error processing statement {i+1}: {str(e)}")
@@ -357,8 +464,11 @@ class GenericSQLLineageParser:
             if table not in self.intermediate_tables:
                 self.intermediate_tables[table] = {'columns': set(), 'usage_count': 1}
     
-    def analyze(self):
-        """Main analysis method - Enhanced with JSON metadata integration"""
+    def analyze(self, report=True):
+        """Main analysis method - Enhanced with JSON metadata integration
+        
+        Pass report=False to skip the formatted report and only return the results dict.
+        """
         print("🔍 " + "=" * 100)
         print("   ENHANCED SQL LINEAGE ANALYSIS WITH METADATA")
         print(f"   File: {self.sql_file_path}")
@@ -395,7 +505,39 @@ class GenericSQLLineageParser:
         print("\n🎯 Step 6: Tracing complete end-to-end lineage...")
         self._trace_comprehensive_end_to_end_lineage()
         
-        return self.generate_report()
+        self._freeze_relationships()
+        self._freeze_tables()
+        self._finalize_column_mappings()
+        
+        results = self.generate_report() if report else self._build_results()
+        
+        self._last_analysis = results
+        self._export_sections = None
+        return results
+    
+    def _freeze_relationships(self):
+        """Materialize table relationships as sorted tuples once, for reporting and export"""
+        self._frozen_relationships = {k: tuple(sorted(v)) for k, v in self.table_relationships.items()}
+        return self._frozen_relationships
+    
+    def _freeze_tables(self):
+        """Materialize the source/target/intermediate table sections as sorted rows once, for reporting"""
+        self._frozen_tables = tuple(
+            tuple((table, tuple(sorted(info['columns'])), info['usage_count'])
+                  for table, info in sorted(tables.items()))
+            for tables in (self.source_tables, self.target_tables, self.intermediate_tables)
+        )
+        return self._frozen_tables
+    
+    def _finalize_column_mappings(self):
+        """Build parallel per-field columns over column_mappings for the summary passes"""
+        mappings = self.column_mappings
+        self._cm = {
+            'source_column': [m.source_column for m in mappings],
+            'target_column': [m.target_column for m in mappings],
+            'transformation_steps': array('i', [m.transformation_steps for m in mappings])
+        }
+        return self._cm
     
     def _merge_metadata_with_schema(self):
         """Merge metadata JSON with schema to build comprehensive column mapping"""
@@ -443,6 +585,9 @@ class GenericSQLLineageParser:
         # Process real-to-real column mappings from C# metadata
         real_to_real = self.metadata['column_lineages'].get('real_to_real', [])
         
+        # (source, target) pairs already mapped, so each C# lineage is checked without scanning the list
+        existing = {(cm.source_column, cm.target_column) for cm in self.column_mappings}
+        
         added_mappings = 0
         for mapping in real_to_real:
             # Skip incomplete mappings
@@ -466,19 +611,15 @@ class GenericSQLLineageParser:
             self.column_table_map[target_full] = target_table
             
             # Add to column mappings if not already present
-            existing = any(
-                cm['source_column'] == source_full and cm['target_column'] == target_full
-                for cm in self.column_mappings
-            )
-            
-            if not existing:
-                self.column_mappings.append({
-                    'source_column': source_full,
-                    'target_column': target_full,
-                    'full_path': [source_full, target_full],
-                    'statement_num': 'metadata',
-                    'transformation_steps': 1
-                })
+            if (source_full, target_full) not in existing:
+                existing.add((source_full, target_full))
+                self.column_mappings.append(ColumnMapping(
+                    source_column=source_full,
+                    target_column=target_full,
+                    full_path=[source_full, target_full],
+                    statement_num='metadata',
+                    transformation_steps=1
+                ))
                 added_mappings += 1
         
         print(f"   ✅ Added {added_mappings} column mappings from C# metadata")
@@ -489,65 +630,61 @@ class GenericSQLLineageParser:
         
         # First, add all sqllineage discovered flows to our comprehensive flow graph
         for mapping in self.column_mappings:
-            source_col = mapping['source_column'].lower()
-            target_col = mapping['target_column'].lower()
+            source_col = mapping.source_column.lower()
+            target_col = mapping.target_column.lower()
             self.complete_column_flows[source_col].add(target_col)
         
         # Identify true source tables (staging, ref, etc.)
-        true_source_tables = set()
         source_patterns = ['staging', 'ref', 'source', 'raw', 'input', 'external']
-        
-        for table in self.table_column_map.keys():
-            if any(pattern in table for pattern in source_patterns):
-                true_source_tables.add(table)
+        true_source_tables = {table for table in self.table_column_map
+                              if any(pattern in table for pattern in source_patterns)}
         
         # Add from metadata if available
         if self.metadata and 'source_tables' in self.metadata:
-            for table in self.metadata['source_tables'].get('real_tables', []):
-                true_source_tables.add(table.lower())
+            true_source_tables.update(map(str.lower, self.metadata['source_tables'].get('real_tables', [])))
         
         # Identify true target tables (core, audit, ops, etc.)
-        true_target_tables = set()
         target_patterns = ['core', 'audit', 'ops', 'final', 'prod', 'output']
-        
-        for table in self.table_column_map.keys():
-            if any(pattern in table for pattern in target_patterns):
-                true_target_tables.add(table)
+        true_target_tables = {table for table in self.table_column_map
+                              if any(pattern in table for pattern in target_patterns)}
         
         # Add from metadata if available
         if self.metadata and 'target_tables' in self.metadata:
-            for table in self.metadata['target_tables'].get('real_tables', []):
-                true_target_tables.add(table.lower())
+            true_target_tables.update(map(str.lower, self.metadata['target_tables'].get('real_tables', [])))
         
         print(f"   📊 Identified {len(true_source_tables)} source tables")
         print(f"   📊 Identified {len(true_target_tables)} target tables")
         
-        # Build end-to-end paths using recursive path finding
-        def find_all_paths_to_targets(start_col, visited=None, path=None):
+        # Build end-to-end paths with an iterative depth-first search
+        column_table_map = self.column_table_map
+        complete_column_flows = self.complete_column_flows
+        
+        def find_all_paths_to_targets(start_col):
             """Find all paths from a source column to target table columns"""
-            if visited is None:
-                visited = set()
-            if path is None:
-                path = []
-            
-            if start_col in visited:
-                return []
+            if column_table_map.get(start_col) in true_target_tables:
+                return [[start_col]]
             
-            visited.add(start_col)
-            current_path = path + [start_col]
+            # One shared path/on_path pair is extended and popped as the search backtracks,
+            # instead of copying the visited set and path for every edge
             all_paths = []
-            
-            # Check if this column is in a target table
-            if start_col in self.column_table_map:
-                table = self.column_table_map[start_col]
-                if table in true_target_tables:
-                    return [current_path]
-            
-            # Continue tracing through flows
-            for next_col in self.complete_column_flows.get(start_col, []):
-                if next_col not in visited:
-                    sub_paths = find_all_paths_to_targets(next_col, visited.copy(), current_path)
-                    all_paths.extend(sub_paths)
+            path = [start_col]
+            on_path = {start_col}
+            stack = [iter(complete_column_flows.get(start_col, ()))]
+            while stack:
+                for next_col in stack[-1]:
+                    if next_col in on_path:
+                        continue
+                    # A column in a target table ends the path
+                    if column_table_map.get(next_col) in true_target_tables:
+                        all_paths.append(path + [next_col])
+                        continue
+                    path.append(next_col)
+                    on_path.add(next_col)
+                    stack.append(iter(complete_column_flows.get(next_col, ())))
+                    break
+                else:
+                    stack.pop()
+                    on_path.discard(path.pop())
             
             return all_paths
         
@@ -574,7 +711,7 @@ class GenericSQLLineageParser:
                             
                             # Parse column names
                             source_col_name = source_column
-                            final_col_name = final_column.split('.')[-1]
+                            final_col_name = final_column.rpartition('.')[2]
                             
                             end_to_end_mappings.append({
                                 'source_table': source_table.title(),
@@ -646,30 +783,24 @@ class GenericSQLLineageParser:
         
         # Build complete flow graph and column-table mapping
         for mapping in self.column_mappings:
-            source_col = mapping['source_column'].lower()
-            target_col = mapping['target_column'].lower()
+            source_col = mapping.source_column.lower()
+            target_col = mapping.target_column.lower()
             all_flows[source_col].add(target_col)
             
             # Map columns to their tables
-            if '.' in source_col:
-                source_table = '.'.join(source_col.split('.')[:-1])
+            source_table = source_col.rpartition('.')[0]
+            if source_table:
                 column_to_table[source_col] = source_table
-            if '.' in target_col:
-                target_table = '.'.join(target_col.split('.')[:-1])
+            target_table = target_col.rpartition('.')[0]
+            if target_table:
                 column_to_table[target_col] = target_table
         
         # Identify true final target tables by looking for actual INSERT statements in SQL
         final_target_tables = set()
         
         # Look for INSERT INTO statements to find real final tables
-        insert_patterns = [
-            r'INSERT\s+INTO\s+([A-Za-z_][A-Za-z0-9_]*\.[A-Za-z_][A-Za-z0-9_]*)',
-            r'MERGE\s+([A-Za-z_][A-Za-z0-9_]*\.[A-Za-z_][A-Za-z0-9_]*)',
-            r'UPDATE\s+([A-Za-z_][A-Za-z0-9_]*\.[A-Za-z_][A-Za-z0-9_]*)',
-        ]
-        
-        for pattern in insert_patterns:
-            matches = re.findall(pattern, self.procedure_body, re.IGNORECASE)
+        for pattern in _FINAL_TARGET_PATTERNS:
+            matches = pattern.findall(self.procedure_body)
             for match in matches:
                 table_name = match.lower()
                 # Exclude temp tables from final targets
@@ -677,13 +808,8 @@ class GenericSQLLineageParser:
                     final_target_tables.add(table_name)
         
         # Also look for variations with brackets and schema prefixes
-        additional_patterns = [
-            r'INSERT\s+INTO\s+\[?([A-Za-z_][A-Za-z0-9_]*)\]?\.\[?([A-Za-z_][A-Za-z0-9_]*)\]?',
-            r'MERGE\s+\[?([A-Za-z_][A-Za-z0-9_]*)\]?\.\[?([A-Za-z_][A-Za-z0-9_]*)\]?',
-        ]
-        
-        for pattern in additional_patterns:
-            matches = re.findall(pattern, self.procedure_body, re.IGNORECASE)
+        for pattern in _BRACKETED_TARGET_PATTERNS:
+            matches = pattern.findall(self.procedure_body)
             for match in matches:
                 if isinstance(match, tuple) and len(match) == 2:
                     schema, table = match
@@ -696,8 +822,7 @@ class GenericSQLLineageParser:
         if len(final_target_tables) < 5:
             print(f"🐛 DEBUG: Only found {len(final_target_tables)} final tables, let me check the SQL...")
             # Look for any INSERT statement patterns
-            debug_pattern = r'INSERT\s+INTO\s+([^(\s]+)'
-            debug_matches = re.findall(debug_pattern, self.procedure_body, re.IGNORECASE)
+            debug_matches = _INSERT_TARGET_RE.findall(self.procedure_body)
             print(f"🐛 DEBUG: All INSERT targets found: {debug_matches[:10]}")
             
             # Add them to final targets if they look valid
@@ -712,44 +837,44 @@ class GenericSQLLineageParser:
         
         # Identify source tables (non-temp, non-intermediate tables that provide data)
         source_table_patterns = ['staging', 'ref', 'source', 'raw', 'input', 'external']
-        source_tables = set()
-        
-        for col, table in column_to_table.items():
-            if (any(pattern in table for pattern in source_table_patterns) and 
-                not ('#' in table or 'temp' in table)):
-                source_tables.add(table)
+        # Many columns share a table, so test each distinct table once
+        source_tables = {table for table in set(column_to_table.values())
+                         if any(pattern in table for pattern in source_table_patterns) and
+                         not ('#' in table or 'temp' in table)}
         
         print(f"📊 Detected source tables: {sorted(source_tables)}")
         
-        def find_all_paths_to_finals(start_col, visited=None, path=None):
-            """Recursively find all paths from a column to final target tables"""
-            if visited is None:
-                visited = set()
-            if path is None:
-                path = []
+        def find_all_paths_to_finals(start_col):
+            """Find all paths from a column to final target tables (iterative depth-first search)"""
+            if column_to_table.get(start_col) in final_target_tables:
+                return [[start_col]]
             
-            if start_col in visited:
-                return []
-            
-            visited.add(start_col)
-            current_path = path + [start_col]
+            # Explicit stack of neighbour iterators over one shared path, popped on backtrack
             all_paths = []
-            
-            # Check if this column is in a final target table
-            if start_col in column_to_table:
-                table = column_to_table[start_col]
-                if table in final_target_tables:
-                    return [current_path]
-            
-            # Continue tracing through all connections
-            for next_col in all_flows.get(start_col, []):
-                sub_paths = find_all_paths_to_finals(next_col, visited.copy(), current_path)
-                all_paths.extend(sub_paths)
+            path = [start_col]
+            on_path = {start_col}
+            stack = [iter(all_flows.get(start_col, ()))]
+            while stack:
+                for next_col in stack[-1]:
+                    if next_col in on_path:
+                        continue
+                    # A column in a final target table ends the path
+                    if column_to_table.get(next_col) in final_target_tables:
+                        all_paths.append(path + [next_col])
+                        continue
+                    path.append(next_col)
+                    on_path.add(next_col)
+                    stack.append(iter(all_flows.get(next_col, ())))
+                    break
+                else:
+                    stack.pop()
+                    on_path.discard(path.pop())
             
             return all_paths
         
         # Find end-to-end paths from all source columns to final targets
         end_to_end_mappings = []
+        paths_by_source = {}  # kept for the pattern-matching fallback below
         
         print("🔍 Tracing paths from source tables to final targets...")
         
@@ -759,7 +884,7 @@ class GenericSQLLineageParser:
                 
                 # Check if this is a source table
                 if source_table in source_tables:
-                    paths = find_all_paths_to_finals(source_col)
+                    paths = paths_by_source[source_col] = find_all_paths_to_finals(source_col)
                     
                     for path in paths:
                         if len(path) >= 2:  # Must have at least source and target
@@ -767,14 +892,10 @@ class GenericSQLLineageParser:
                             target_full = path[-1]
                             
                             # Parse source and target
-                            source_parts = source_full.split('.')
-                            target_parts = target_full.split('.')
+                            source_table, source_dot, source_column = source_full.rpartition('.')
+                            target_table, target_dot, target_column = target_full.rpartition('.')
                             
-                            if len(source_parts) >= 2 and len(target_parts) >= 2:
-                                source_table = '.'.join(source_parts[:-1])
-                                source_column = source_parts[-1]
-                                target_table = '.'.join(target_parts[:-1])
-                                target_column = target_parts[-1]
+                            if source_dot and target_dot:
                                 
                                 # Only include if target is truly a final table
                                 if target_table in final_target_tables:
@@ -793,44 +914,40 @@ class GenericSQLLineageParser:
         if len(end_to_end_mappings) == 0:
             print("🔍 No direct paths found, using enhanced pattern matching...")
             
+            # Columns of final tables, collected once instead of rescanning every column per source
+            final_columns = [(target_col, target_col.rpartition('.')[2])
+                             for target_col, target_table in column_to_table.items()
+                             if target_table in final_target_tables]
+            
             # Look for any columns that could be related by name similarity
-            for source_col in all_flows.keys():
-                if source_col in column_to_table:
-                    source_table = column_to_table[source_col]
-                    
-                    if source_table in source_tables:
-                        source_column_name = source_col.split('.')[-1]
+            for source_col, paths in paths_by_source.items():
+                source_column_name = source_col.rpartition('.')[2]
+                
+                # Look for columns with similar names in final tables
+                for target_col, target_column_name in final_columns:
+                    # Check for name similarity or exact match
+                    if (source_column_name == target_column_name or
+                        source_column_name in target_column_name or
+                        target_column_name in source_column_name):
                         
-                        # Look for columns with similar names in final tables
-                        for target_col, target_table in column_to_table.items():
-                            if target_table in final_target_tables:
-                                target_column_name = target_col.split('.')[-1]
+                        # Any path between these columns was already found above
+                        for path in paths:
+                            if target_col in path:
+                                source_table_name, source_dot, source_column = source_col.rpartition('.')
+                                target_table_name, target_dot, target_column = target_col.rpartition('.')
                                 
-                                # Check for name similarity or exact match
-                                if (source_column_name == target_column_name or
-                                    source_column_name in target_column_name or
-                                    target_column_name in source_column_name):
-                                    
-                                    # Try to find any path between these columns
-                                    paths = find_all_paths_to_finals(source_col)
-                                    
-                                    for path in paths:
-                                        if target_col in path:
-                                            source_parts = source_col.split('.')
-                                            target_parts = target_col.split('.')
-                                            
-                                            if len(source_parts) >= 2 and len(target_parts) >= 2:
-                                                end_to_end_mappings.append({
-                                                    'source_table': '.'.join(source_parts[:-1]),
-                                                    'source_column': source_parts[-1],
-                                                    'target_table': '.'.join(target_parts[:-1]),
-                                                    'target_column': target_parts[-1],
-                                                    'path_length': len(path) - 1,
-                                                    'transformation_type': 'pattern-matched',
-                                                    'full_path': path,
-                                                    'intermediate_count': len(path) - 2
-                                                })
-                                            break
+                                if source_dot and target_dot:
+                                    end_to_end_mappings.append({
+                                        'source_table': source_table_name,
+                                        'source_column': source_column,
+                                        'target_table': target_table_name,
+                                        'target_column': target_column,
+                                        'path_length': len(path) - 1,
+                                        'transformation_type': 'pattern-matched',
+                                        'full_path': path,
+                                        'intermediate_count': len(path) - 2
+                                    })
+                                break
         
         # Remove duplicates based on source and target combinations
         seen_mappings = set()
@@ -848,141 +965,153 @@ class GenericSQLLineageParser:
     
     def generate_report(self):
         """Generate comprehensive lineage report"""
-        print("\n📋 " + "=" * 100)
-        print("   SOURCE TABLES DISCOVERED")
-        print("=" * 102)
+        _print = print  # local binding - this report makes 100+ print calls
+        
+        frozen_tables = self._frozen_tables
+        if frozen_tables is None:
+            frozen_tables = self._freeze_tables()
+        source_rows, target_rows, intermediate_rows = frozen_tables
+        
+        _print("\n📋 " + "=" * 100)
+        _print("   SOURCE TABLES DISCOVERED")
+        _print("=" * 102)
         
         if self.source_tables:
-            print(f"{'Table Name':<40} {'Columns Found':<30} {'Usage Count'}")
-            print("-" * 102)
+            _print(f"{'Table Name':<40} {'Columns Found':<30} {'Usage Count'}")
+            _print("-" * 102)
             
-            for table, info in sorted(self.source_tables.items()):
-                columns_str = ", ".join(sorted(list(info['columns']))[:8])
-                if len(info['columns']) > 8:
-                    columns_str += f" (+{len(info['columns'])-8} more)"
+            for table, columns, usage_count in source_rows:
+                columns_str = ", ".join(columns[:8])
+                if len(columns) > 8:
+                    columns_str += f" (+{len(columns)-8} more)"
                 if not columns_str:
                     columns_str = "(columns not detected)"
                 
-                print(f"{table:<40} {columns_str:<30} {info['usage_count']}")
+                _print(f"{table:<40} {columns_str:<30} {usage_count}")
         else:
-            print("No source tables detected")
+            _print("No source tables detected")
         
-        print("\n🎯 " + "=" * 100)
-        print("   TARGET TABLES DISCOVERED")
-        print("=" * 102)
+        _print("\n🎯 " + "=" * 100)
+        _print("   TARGET TABLES DISCOVERED")
+        _print("=" * 102)
         
         if self.target_tables:
-            print(f"{'Table Name':<40} {'Columns Found':<30} {'Usage Count'}")
-            print("-" * 102)
+            _print(f"{'Table Name':<40} {'Columns Found':<30} {'Usage Count'}")
+            _print("-" * 102)
             
-            for table, info in sorted(self.target_tables.items()):
-                columns_str = ", ".join(sorted(list(info['columns']))[:8])
-                if len(info['columns']) > 8:
-                    columns_str += f" (+{len(info['columns'])-8} more)"
+            for table, columns, usage_count in target_rows:
+                columns_str = ", ".join(columns[:8])
+                if len(columns) > 8:
+                    columns_str += f" (+{len(columns)-8} more)"
                 if not columns_str:
                     columns_str = "(columns not detected)"
                 
-                print(f"{table:<40} {columns_str:<30} {info['usage_count']}")
+                _print(f"{table:<40} {columns_str:<30} {usage_count}")
         else:
-            print("No target tables detected")
+            _print("No target tables detected")
         
-        print("\n🔄 " + "=" * 100)
-        print("   INTERMEDIATE/PROCESSING TABLES")
-        print("=" * 102)
+        _print("\n🔄 " + "=" * 100)
+        _print("   INTERMEDIATE/PROCESSING TABLES")
+        _print("=" * 102)
         
         if self.intermediate_tables:
-            print(f"{'Table Name':<40} {'Columns Found':<30} {'Usage Count'}")
-            print("-" * 102)
+            _print(f"{'Table Name':<40} {'Columns Found':<30} {'Usage Count'}")
+            _print("-" * 102)
             
-            for table, info in sorted(self.intermediate_tables.items()):
-                columns_str = ", ".join(sorted(list(info['columns']))[:8])
-                if len(info['columns']) > 8:
-                    columns_str += f" (+{len(info['columns'])-8} more)"
+            for table, columns, usage_count in intermediate_rows:
+                columns_str = ", ".join(columns[:8])
+                if len(columns) > 8:
+                    columns_str += f" (+{len(columns)-8} more)"
                 if not columns_str:
                     columns_str = "(columns not detected)"
                 
-                print(f"{table:<40} {columns_str:<30} {info['usage_count']}")
+                _print(f"{table:<40} {columns_str:<30} {usage_count}")
         else:
-            print("No intermediate tables detected")
+            _print("No intermediate tables detected")
         
-        print("\n📊 " + "=" * 100)
-        print("   COLUMN LINEAGE MAPPINGS")
-        print("=" * 102)
+        _print("\n📊 " + "=" * 100)
+        _print("   COLUMN LINEAGE MAPPINGS")
+        _print("=" * 102)
         
         if self.column_mappings:
-            print(f"{'Source Column':<50} {'Target Column':<50} {'Steps'}")
-            print("-" * 102)
+            _print(f"{'Source Column':<50} {'Target Column':<50} {'Steps'}")
+            _print("-" * 102)
+            
+            cm = self._cm
+            if cm is None or len(cm['transformation_steps']) != len(self.column_mappings):
+                cm = self._finalize_column_mappings()
+            sources, targets, step_counts = cm['source_column'], cm['target_column'], cm['transformation_steps']
             
-            # Group mappings by transformation complexity
-            simple_mappings = [m for m in self.column_mappings if m['transformation_steps'] <= 1]
-            complex_mappings = [m for m in self.column_mappings if m['transformation_steps'] > 1]
+            # Group mappings by transformation complexity (indexes into the columns above)
+            simple_mappings = [i for i, n in enumerate(step_counts) if n <= 1]
+            complex_mappings = [i for i, n in enumerate(step_counts) if n > 1]
             
-            print(f"\n📈 DIRECT MAPPINGS ({len(simple_mappings)}):")
-            for mapping in sorted(simple_mappings, key=lambda x: x['source_column'])[:20]:
-                source = mapping['source_column']
-                target = mapping['target_column']
-                steps = mapping['transformation_steps']
+            _print(f"\n📈 DIRECT MAPPINGS ({len(simple_mappings)}):")
+            for i in heapq.nsmallest(20, simple_mappings, key=sources.__getitem__):
+                source, target, steps = sources[i], targets[i], step_counts[i]
                 
                 if len(source) > 48:
                     source = source[:45] + "..."
                 if len(target) > 48:
                     target = target[:45] + "..."
                 
-                print(f"{source:<50} {target:<50} {steps}")
+                _print(f"{source:<50} {target:<50} {steps}")
             
             if len(simple_mappings) > 20:
-                print(f"... and {len(simple_mappings) - 20} more direct mappings")
+                _print(f"... and {len(simple_mappings) - 20} more direct mappings")
             
             if complex_mappings:
-                print(f"\n🔄 COMPLEX TRANSFORMATIONS ({len(complex_mappings)}):")
-                for mapping in sorted(complex_mappings, key=lambda x: x['transformation_steps'], reverse=True)[:10]:
-                    source = mapping['source_column']
-                    target = mapping['target_column']
-                    steps = mapping['transformation_steps']
+                _print(f"\n🔄 COMPLEX TRANSFORMATIONS ({len(complex_mappings)}):")
+                for i in heapq.nlargest(10, complex_mappings, key=step_counts.__getitem__):
+                    source, target, steps = sources[i], targets[i], step_counts[i]
                     
                     if len(source) > 48:
                         source = source[:45] + "..."
                     if len(target) > 48:
                         target = target[:45] + "..."
                     
-                    print(f"{source:<50} {target:<50} {steps}")
+                    _print(f"{source:<50} {target:<50} {steps}")
                 
                 if len(complex_mappings) > 10:
-                    print(f"... and {len(complex_mappings) - 10} more complex transformations")
+                    _print(f"... and {len(complex_mappings) - 10} more complex transformations")
         else:
-            print("No column mappings detected")
+            _print("No column mappings detected")
         
-        print("\n🔗 " + "=" * 100)
-        print("   TABLE RELATIONSHIPS")
-        print("=" * 102)
+        _print("\n🔗 " + "=" * 100)
+        _print("   TABLE RELATIONSHIPS")
+        _print("=" * 102)
         
         if self.table_relationships:
-            print(f"{'Source Table':<50} {'Target Table(s)'}")
-            print("-" * 102)
+            _print(f"{'Source Table':<50} {'Target Table(s)'}")
+            _print("-" * 102)
+            
+            relationships = self._frozen_relationships
+            if relationships is None:
+                relationships = self._freeze_relationships()
             
-            for source, targets in sorted(self.table_relationships.items())[:20]:
-                targets_str = ", ".join(sorted(list(targets))[:3])
+            for source, targets in sorted(relationships.items())[:20]:
+                targets_str = ", ".join(targets[:3])
                 if len(targets) > 3:
                     targets_str += f" (+{len(targets)-3} more)"
                 
                 if len(source) > 48:
                     source = source[:45] + "..."
                 
-                print(f"{source:<50} {targets_str}")
+                _print(f"{source:<50} {targets_str}")
             
             if len(self.table_relationships) > 20:
-                print(f"... and {len(self.table_relationships) - 20} more relationships")
+                _print(f"... and {len(self.table_relationships) - 20} more relationships")
         else:
-            print("No table relationships detected")
+            _print("No table relationships detected")
         
         # Display end-to-end lineage mappings in the requested format
         if self.end_to_end_mappings:
-            print("\n🎯 " + "=" * 100)
-            print("   END-TO-END COLUMN LINEAGE (Source → Final Target)")
-            print("=" * 102)
+            _print("\n🎯 " + "=" * 100)
+            _print("   END-TO-END COLUMN LINEAGE (Source → Final Target)")
+            _print("=" * 102)
             
-            print(f"| {'Source Column':<36} | {'Final Column':<33} | {'Final Table':<18} |")
-            print(f"|{'-'*38}|{'-'*35}|{'-'*20}|")
+            _print(f"| {'Source Column':<36} | {'Final Column':<33} | {'Final Table':<18} |")
+            _print(f"|{'-'*38}|{'-'*35}|{'-'*20}|")
             
             # Sort by target table, then by source table for better readability
             sorted_mappings = sorted(self.end_to_end_mappings, 
@@ -1006,14 +1135,14 @@ class GenericSQLLineageParser:
                 if len(target_table_display) > 18:
                     target_table_display = target_table_display[:15] + "..."
                 
-                print(f"| {source_full:<36} | {target_full:<33} | {target_table_display:<18} |")
+                _print(f"| {source_full:<36} | {target_full:<33} | {target_table_display:<18} |")
             
-            print(f"\n✅ Total end-to-end mappings found: {len(self.end_to_end_mappings)}")
+            _print(f"\n✅ Total end-to-end mappings found: {len(self.end_to_end_mappings)}")
             
             # Also create a markdown table for easy copying
-            print("\n📋 MARKDOWN TABLE FORMAT:")
-            print("| Source Column                        | Final Column                      | Final Table        |")
-            print("| ------------------------------------ | --------------------------------- | ------------------ |")
+            _print("\n📋 MARKDOWN TABLE FORMAT:")
+            _print("| Source Column                        | Final Column                      | Final Table        |")
+            _print("| ------------------------------------ | --------------------------------- | ------------------ |")
             
             for mapping in sorted_mappings:
                 source_table = mapping['source_table']
@@ -1025,56 +1154,68 @@ class GenericSQLLineageParser:
                 target_full = f"`{target_table}.{target_column}`"
                 target_table_display = f"`{target_table}`"
                 
-                print(f"| {source_full:<36} | {target_full:<33} | {target_table_display:<18} |")
+                _print(f"| {source_full:<36} | {target_full:<33} | {target_table_display:<18} |")
         else:
-            print("\n🎯 " + "=" * 100)
-            print("   END-TO-END COLUMN LINEAGE")
-            print("=" * 102)
-            print("No end-to-end column mappings detected")
+            _print("\n🎯 " + "=" * 100)
+            _print("   END-TO-END COLUMN LINEAGE")
+            _print("=" * 102)
+            _print("No end-to-end column mappings detected")
         
-        print("\n📈 " + "=" * 100)
-        print("   ANALYSIS SUMMARY")
-        print("=" * 102)
+        _print("\n📈 " + "=" * 100)
+        _print("   ANALYSIS SUMMARY")
+        _print("=" * 102)
         
         total_tables = len(self.source_tables) + len(self.target_tables) + len(self.intermediate_tables)
         
-        print(f"📊 TABLES DISCOVERED:")
-        print(f"   • Total tables: {total_tables}")
-        print(f"   • Source tables: {len(self.source_tables)}")
-        print(f"   • Target tables: {len(self.target_tables)}")
-        print(f"   • Intermediate/processing tables: {len(self.intermediate_tables)}")
+        _print(f"📊 TABLES DISCOVERED:")
+        _print(f"   • Total tables: {total_tables}")
+        _print(f"   • Source tables: {len(self.source_tables)}")
+        _print(f"   • Target tables: {len(self.target_tables)}")
+        _print(f"   • Intermediate/processing tables: {len(self.intermediate_tables)}")
         
-        print(f"\n🔗 LINEAGE MAPPINGS:")
-        print(f"   • Column mappings: {len(self.column_mappings)}")
-        print(f"   • Table relationships: {len(self.table_relationships)}")
-        print(f"   • Processing stages: {len(self.processing_stages)}")
+        _print(f"\n🔗 LINEAGE MAPPINGS:")
+        _print(f"   • Column mappings: {len(self.column_mappings)}")
+        _print(f"   • Table relationships: {len(self.table_relationships)}")
+        _print(f"   • Processing stages: {len(self.processing_stages)}")
         
-        # Calculate complexity score
-        complexity_score = 0
-        if self.column_mappings:
-            avg_transformation_steps = sum(m['transformation_steps'] for m in self.column_mappings) / len(self.column_mappings)
-            complexity_score = min(100, avg_transformation_steps * 20)
+        complexity_score = self._complexity_score()
         
-        print(f"\n🎯 COMPLEXITY ANALYSIS:")
-        print(f"   • Transformation complexity: {complexity_score:.1f}%")
+        _print(f"\n🎯 COMPLEXITY ANALYSIS:")
+        _print(f"   • Transformation complexity: {complexity_score:.1f}%")
         
         if complexity_score < 30:
-            print("   • Assessment: Simple data flow with mostly direct mappings")
+            _print("   • Assessment: Simple data flow with mostly direct mappings")
         elif complexity_score < 60:
-            print("   • Assessment: Moderate complexity with some multi-step transformations")
+            _print("   • Assessment: Moderate complexity with some multi-step transformations")
         else:
-            print("   • Assessment: Complex data processing with extensive transformations")
+            _print("   • Assessment: Complex data processing with extensive transformations")
         
-        print("\n" + "=" * 102)
-        print("✅ GENERIC SQL LINEAGE ANALYSIS COMPLETE!")
-        print("🎯 Ready for data governance, impact analysis, and documentation")
-        print("=" * 102)
+        _print("\n" + "=" * 102)
+        _print("✅ GENERIC SQL LINEAGE ANALYSIS COMPLETE!")
+        _print("🎯 Ready for data governance, impact analysis, and documentation")
+        _print("=" * 102)
+        
+        return self._build_results(complexity_score)
+    
+    def _complexity_score(self):
+        """Score transformation complexity from the average number of steps per mapping"""
+        if not self.column_mappings:
+            return 0
+        step_counts = self._cm['transformation_steps'] if self._cm is not None else [m.transformation_steps for m in self.column_mappings]
+        avg_transformation_steps = sum(step_counts) / len(step_counts)
+        return min(100, avg_transformation_steps * 20)
+    
+    def _build_results(self, complexity_score=None):
+        """Assemble the analysis results dict returned by analyze()"""
+        if complexity_score is None:
+            complexity_score = self._complexity_score()
         
         return {
             'source_tables': dict(self.source_tables),
             'target_tables': dict(self.target_tables),
             'intermediate_tables': dict(self.intermediate_tables),
-            'column_mappings': self.column_mappings,
+            # Mappings are ColumnMapping tuples internally but dicts for callers, as they always were
+            'column_mappings': [m._asdict() for m in self.column_mappings],
             'end_to_end_mappings': self.end_to_end_mappings,
             'table_relationships': dict(self.table_relationships),
             'processing_stages': self.processing_stages,
@@ -1083,53 +1224,118 @@ class GenericSQLLineageParser:
     
     def export_results(self, output_format='json', output_file=None):
         """Export analysis results in various formats"""
-        results = {
-            'sql_file': self.sql_file_path,
-            'analysis_timestamp': self._get_timestamp(),
-            'source_tables': {k: {'columns': list(v['columns']), 'usage_count': v['usage_count']} 
-                            for k, v in self.source_tables.items()},
-            'target_tables': {k: {'columns': list(v['columns']), 'usage_count': v['usage_count']} 
-                            for k, v in self.target_tables.items()},
-            'intermediate_tables': {k: {'columns': list(v['columns']), 'usage_count': v['usage_count']} 
-                                  for k, v in self.intermediate_tables.items()},
-            'column_mappings': self.column_mappings,
-            'end_to_end_mappings': self.end_to_end_mappings,
-            'table_relationships': {k: list(v) for k, v in self.table_relationships.items()},
-            'processing_stages': self.processing_stages
-        }
+        relationships = self._frozen_relationships
+        if relationships is None:
+            relationships = self._freeze_relationships()
+        
+        # Reuse the serialized sections from the last analysis instead of rebuilding them per export
+        cached = self._export_sections
+        if cached is None:
+            analysis = self._last_analysis
+            if analysis is None:
+                analysis = self._build_results()
+            cached = {
+                'source_tables': self._serialize_tables(analysis['source_tables']),
+                'target_tables': self._serialize_tables(analysis['target_tables']),
+                'intermediate_tables': self._serialize_tables(analysis['intermediate_tables']),
+                'column_mappings': analysis['column_mappings']
+            }
+            if self._last_analysis is not None:
+                self._export_sections = cached
+        
+        sections = [
+            ('sql_file', self.sql_file_path),
+            ('analysis_timestamp', self._get_timestamp()),
+            ('source_tables', cached['source_tables']),
+            ('target_tables', cached['target_tables']),
+            ('intermediate_tables', cached['intermediate_tables']),
+            ('column_mappings', cached['column_mappings']),
+            ('end_to_end_mappings', self.end_to_end_mappings),
+            ('table_relationships', relationships),
+            ('processing_stages', self.processing_stages)
+        ]
         
         if output_file is None:
             output_file = f"{Path(self.sql_file_path).stem}_lineage.{output_format}"
         
         if output_format.lower() == 'json':
-            with open(output_file, 'w') as f:
-                json.dump(results, f, indent=2)
+            self._write_json_sections(output_file, sections)
             print(f"📄 Results exported to {output_file}")
         
-        return results
+        return dict(sections)
+    
+    @staticmethod
+    def _write_json_sections(output_file, sections):
+        """Write top-level sections one at a time instead of encoding one combined dict"""
+        with open(output_file, 'w') as f:
+            f.write('{\n')
+            first = True
+            for key, value in sections:
+                if not first:
+                    f.write(',\n')
+                f.write(json.dumps(key) + ': ')
+                json.dump(value, f, indent=2, default=list)
+                first = False
+            f.write('\n}\n')
+    
+    @staticmethod
+    def _serialize_tables(tables):
+        """Convert a table-info dict into a JSON-friendly form (column sets become lists)"""
+        return {k: {'columns': list(v['columns']), 'usage_count': v['usage_count']}
+                for k, v in tables.items()}
     
     def _get_timestamp(self):
         """Get current timestamp"""
-        from datetime import datetime
         return datetime.now().isoformat()
 
 
+def _parse_args(argv):
+    """Minimal command line parser - avoids the argparse import cost for this small flag set"""
+    options = {'--metadata': 'metadata', '-m': 'metadata', '--schema': 'schema', '-s': 'schema',
+               '--export': 'export', '-e': 'export', '--output': 'output', '-o': 'output'}
+    args = SimpleNamespace(sql_file=None, metadata='csharp_metadata.json', schema='schema.json',
+                           export=None, output=None)
+    
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ('-h', '--help'):
+            print(USAGE)
+            sys.exit(0)
+        
+        # Support both "--flag value" and "--flag=value"
+        flag, eq, value = arg.partition('=')
+        if flag in options:
+            if not eq:
+                i += 1
+                if i >= len(argv):
+                    sys.exit(f"{USAGE.splitlines()[0]}\nerror: argument {flag} expected one argument")
+                value = argv[i]
+            setattr(args, options[flag], value)
+        elif arg.startswith('-') and arg != '-':
+            sys.exit(f"{USAGE.splitlines()[0]}\nerror: unrecognized arguments: {arg}")
+        elif args.sql_file is None:
+            args.sql_file = arg
+        else:
+            sys.exit(f"{USAGE.splitlines()[0]}\nerror: unrecognized arguments: {arg}")
+        i += 1
+    
+    if args.sql_file is None:
+        sys.exit(f"{USAGE.splitlines()[0]}\nerror: the following arguments are required: sql_file")
+    if args.export is not None and args.export != 'json':
+        sys.exit(f"{USAGE.splitlines()[0]}\nerror: argument --export/-e: invalid choice: '{args.export}' (choose from 'json')")
+    
+    return args
+
+
 def main():
     """Command line interface for the enhanced lineage parser"""
-    parser = argparse.ArgumentParser(description='Enhanced SQL Lineage Parser with JSON Metadata')
-    parser.add_argument('sql_file', help='Path to SQL file to analyze')
-    parser.add_argument('--metadata', '-m', help='Path to C# metadata JSON file', default='csharp_metadata.json')
-    parser.add_argument('--schema', '-s', help='Path to schema JSON file', default='schema.json')
-    parser.add_argument('--export', '-e', choices=['json'], default=None,
-                       help='Export results to file format')
-    parser.add_argument('--output', '-o', help='Output file path')
-    
-    args = parser.parse_args()
+    args = _parse_args(sys.argv[1:])
     
     try:
         # Create parser instance and analyze
         lineage_parser = GenericSQLLineageParser(args.sql_file, args.metadata, args.schema)
-        results = lineage_parser.analyze()
+        results = lineage_parser.analyze(report=not args.export)
         
         # Export if requested
         if args.export:
@@ -1144,7 +1350,6 @@ def main():
 
 if __name__ == "__main__":
     # If called directly without command line args, use the test file
-    import sys
     if len(sys.argv) == 1:
         lineage_parser = GenericSQLLineageParser("test.sql", "csharp_metadata.json", "schema.json")
         lineage_parser.analyze()
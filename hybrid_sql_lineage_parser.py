@@ -4,58 +4,378 @@ Hybrid SQL Lineage Parser
 Combines C# ScriptDom for table extraction with Python sqllineage for column lineage
 """
 
+import os
+import copy
 import subprocess
 import re
 import sys
+import json
+import atexit
+import logging
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
 from pathlib import Path
 from generic_sql_lineage_parser import GenericSQLLineageParser
 
+# orjson parses the (often multi-MB) C# metadata straight from bytes; fall back to the stdlib
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# Per-edge / per-path tracing goes through this logger at DEBUG level instead of print()
+log = logging.getLogger(__name__)
+
+# Persistent cache of C# parser metadata, keyed by the SQL file contents, the schema and the
+# parser build. Set HYBRID_SQL_NO_CACHE=1 (or pass --no-cache) to bypass it
+_CSHARP_CACHE = Path('~/.cache/hybrid_sql/csharp.sqlite').expanduser()
+
+# The C# project lives next to this file; it is published (again whenever its sources change)
+# and then run as a long-lived worker. schema.json is resolved next to it as well
+_CSHARP_PROJECT_DIR = Path(__file__).resolve().parent
+_CSHARP_SOURCES = (_CSHARP_PROJECT_DIR / 'Program.cs', _CSHARP_PROJECT_DIR / 'parser.csproj')
+_CSHARP_PUBLISH_DIR = _CSHARP_PROJECT_DIR / 'bin' / 'Release' / 'publish'
+_CSHARP_DLL = _CSHARP_PUBLISH_DIR / 'parser.dll'
+_CSHARP_SCHEMA = _CSHARP_PROJECT_DIR / 'schema.json'
+
+# The metadata of the last analyzed file is also written here, as `dotnet run` used to do, as a side
+# output for lineage_analyzer.py and openlineage_generator.py. The hybrid analysis itself never reads
+# it back: in --batch mode pool processes overwrite it concurrently.
+_CSHARP_METADATA_FILE = _CSHARP_PROJECT_DIR / 'csharp_metadata.json'
+
+# Seconds the C# worker gets to answer one request before it is killed (and restarted on the next one)
+_CSHARP_TIMEOUT = 30
+
+# In-process LRU cache of finished hybrid analyses: _analyze_cache_key() -> (csharp_metadata, python_parser, results)
+_ANALYZE_CACHE = OrderedDict()
+_ANALYZE_CACHE_SIZE = 16
+
+# Short alias names that sqllineage sometimes reports as tables, and the prefixes of temp tables
+_ALIAS_DENYLIST = frozenset({'x', 'r', 'a', 'j', 'joinmap'})
+_TEMP_PREFIXES = ('#', '<default>.#')
+
+
+def _any_of(*terms):
+    """Compile substrings into one alternation, so 'does any term occur' is a single regex search"""
+    return re.compile('|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)))
+
+
+# Name fragments that mark reference / calculation tables and the target columns they can resolve to
+_REFERENCE_TABLE_RE = _any_of('ref.', 'reference', 'lookup', 'dim')
+_CALC_TABLE_RE = _any_of('fx', 'rate', 'currency')
+_ACCOUNT_TARGET_RE = _any_of('account', 'acct', 'customer', 'branch')
+_CURRENCY_TARGET_RE = _any_of('amount', 'currency', 'rate', 'fee', 'base')
+_RATE_TARGET_RE = _any_of('amount', 'fee', 'base')
+
+# Semantic groups of column-name terms (date/time, id/key, amount, account, transaction, status)
+_SEMANTIC_GROUP_RES = (
+    _any_of('date', 'time', 'posting', 'created', 'batch', 'value', 'txn', 'transaction'),
+    _any_of('id', 'key', 'hash', 'src', 'external', 'batch', 'idem', 'potency'),
+    _any_of('amount', 'currency', 'base', 'rate', 'fx', 'fee', 'money', 'value'),
+    _any_of('account', 'acct', 'no', 'number', 'customer', 'branch'),
+    _any_of('txn', 'transaction', 'narrative', 'desc', 'channel', 'type'),
+    _any_of('status', 'direction', 'state', 'active', 'inactive'),
+)
+
+
+# Lower-cased, interned copies of identifiers; the same few column and table names repeat across many mappings.
+# Bounded so a long-running process (e.g. --batch over many files) doesn't keep every identifier it has seen.
+@lru_cache(maxsize=65536)
+def _lnorm(name):
+    """Return the interned lower-case form of an identifier"""
+    return sys.intern(name.lower())
+
+
+def _split_col(col):
+    """Split 'schema.table.column' into ('schema.table', 'column') without building a list"""
+    table, _, name = col.rpartition('.')
+    return table, name
+
+
+def _map_column(col, column_to_table, column_names):
+    """Record a column's bare name and (interned) table name the first time it is seen"""
+    if col in column_names:
+        return
+    table, name = _split_col(col)
+    column_names[col] = name
+    if table:
+        column_to_table[col] = sys.intern(table)
+
+
+def _build_column_maps(flows):
+    """Map every column in a flow graph to its (interned) table name and to its bare column name"""
+    column_to_table = {}
+    column_names = {}
+    for col, targets in flows.items():
+        _map_column(col, column_to_table, column_names)
+        for target in targets:
+            _map_column(target, column_to_table, column_names)
+    
+    return column_to_table, column_names
+
+
+def _csharp_cache_enabled():
+    """Whether the persistent C# metadata cache is in use (read from the environment so pool processes agree)"""
+    return os.environ.get('HYBRID_SQL_NO_CACHE', '') in ('', '0')
+
+
+def _published_csharp_stat():
+    """Stat of the published C# parser, or None when it is missing or older than its sources"""
+    try:
+        dll_stat = _CSHARP_DLL.stat()
+    except OSError:
+        return None
+    for source in _CSHARP_SOURCES:
+        try:
+            if source.stat().st_mtime > dll_stat.st_mtime:
+                return None
+        except OSError:
+            continue
+    return dll_stat
+
+
+def _csharp_cache_key(sql_digest):
+    """Cache key for the C# metadata of a SQL file digest
+    
+    Also covers the schema the parser resolves columns against and the published parser
+    build (its mtime and size), so editing schema.json or rebuilding the parser expires
+    every entry. Returns None while the parser is unpublished or out of date, since the
+    next request will publish a new build anyway.
+    """
+    dll_stat = _published_csharp_stat()
+    if dll_stat is None:
+        return None
+    key = hashlib.sha256(sql_digest)
+    try:
+        key.update(hashlib.sha256(_CSHARP_SCHEMA.read_bytes()).digest())
+    except OSError:
+        key.update(b'no schema')
+    key.update(f"{dll_stat.st_mtime_ns}:{dll_stat.st_size}".encode())
+    return key.digest()
+
+
+def _analyze_cache_key(sql_digest, all_paths=False):
+    """Key for a finished hybrid analysis of a SQL file digest
+    
+    Built on the C# cache key (SQL, schema.json and parser build, which together determine
+    the C# metadata) plus the schema.json the Python parser loads from the working directory
+    and the --all-paths mode. Returns None while the C# parser is unpublished or out of date.
+    """
+    csharp_key = _csharp_cache_key(sql_digest)
+    if csharp_key is None:
+        return None
+    key = hashlib.sha256(csharp_key)
+    key.update(b'all paths' if all_paths else b'one path')
+    try:
+        key.update(hashlib.sha256(Path('schema.json').read_bytes()).digest())
+    except OSError:
+        key.update(b'no schema')
+    return key.digest()
+
+
+def _write_metadata_file(metadata):
+    """Write C# metadata to csharp_metadata.json (atomically, since batch processes may race)"""
+    tmp_path = _CSHARP_METADATA_FILE.with_name(f"{_CSHARP_METADATA_FILE.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(tmp_path, _CSHARP_METADATA_FILE)
+    except OSError as e:
+        print(f"ℹ️  Could not write {_CSHARP_METADATA_FILE}: {e}")
+
+
+def _open_csharp_cache():
+    """Open (creating if needed) the C# metadata cache database"""
+    _CSHARP_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(_CSHARP_CACHE)
+    conn.execute('CREATE TABLE IF NOT EXISTS csharp (sha BLOB PRIMARY KEY, json TEXT)')
+    return conn
+
+
+def _load_cached_metadata(digest):
+    """Return cached C# metadata for a cache key, or None on a miss"""
+    try:
+        conn = _open_csharp_cache()
+        try:
+            row = conn.execute('SELECT json FROM csharp WHERE sha = ?', (digest,)).fetchone()
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError) as e:
+        print(f"ℹ️  C# metadata cache unavailable: {e}")
+        return None
+    return _json_loads(row[0]) if row else None
+
+
+def _store_cached_metadata(digest, metadata):
+    """Store C# metadata under a cache key"""
+    try:
+        conn = _open_csharp_cache()
+        try:
+            with conn:
+                conn.execute('INSERT OR REPLACE INTO csharp (sha, json) VALUES (?, ?)',
+                             (digest, json.dumps(metadata)))
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError) as e:
+        print(f"ℹ️  Could not update C# metadata cache: {e}")
+
+
 class HybridSQLLineageParser:
     """
     Hybrid parser that uses C# ScriptDom to extract accurate table information
     then uses Python sqllineage for detailed column lineage analysis
     """
     
-    def __init__(self, sql_file_path):
+    # One C# worker process shared by every parser instance in this Python process
+    _worker = None
+    _worker_lock = threading.Lock()
+    # Cleared in --batch pool processes when the up-front publish failed, so they don't retry it
+    _csharp_available = True
+    
+    def __init__(self, sql_file_path, all_paths=False):
         self.sql_file_path = sql_file_path
+        self.all_paths = all_paths  # Trace every path per column pair, not just one (--all-paths)
         self.csharp_metadata = None
         self.python_parser = None
-        
-    def run_csharp_parser(self):
+    
+    @staticmethod
+    def _publish_csharp():
+        """Publish the C# parser so workers can start it with a plain `dotnet parser.dll`
+        
+        Only runs when there is no published build or its sources are newer than it.
+        """
+        if _published_csharp_stat() is not None:
+            return
+        
+        print("🔧 Publishing C# parser...")
+        result = subprocess.run(
+            ['dotnet', 'publish', '-c', 'Release', '--self-contained', 'false', '-o', str(_CSHARP_PUBLISH_DIR)],
+            cwd=_CSHARP_PROJECT_DIR,
+            capture_output=True,
+            text=True,
+            timeout=300
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"dotnet publish failed: {result.stderr or result.stdout}")
+    
+    @classmethod
+    def _get_worker(cls):
+        """Return the running C# worker, publishing and starting it on first use"""
+        if cls._worker is not None and cls._worker.poll() is None:
+            return cls._worker
+        
+        cls._publish_csharp()
+        
+        # Always pass the schema next to this module; if it is missing the worker reports that
+        # on each request rather than falling back to a machine-specific default path
+        command = ['dotnet', str(_CSHARP_DLL), '--serve', str(_CSHARP_SCHEMA)]
+        
+        # Diagnostics from the worker go to stderr, which is discarded so the pipe never fills up
+        cls._worker = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                       stderr=subprocess.DEVNULL)
+        return cls._worker
+    
+    @classmethod
+    def _close_worker(cls):
+        """Shut down the C# worker by closing its stdin"""
+        with cls._worker_lock:
+            worker, cls._worker = cls._worker, None
+        if worker is None:
+            return
+        try:
+            worker.stdin.close()
+            worker.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            worker.kill()
+    
+    @classmethod
+    def _request_metadata(cls, sql_path):
+        """Send one SQL path to the C# worker and read back its length-prefixed JSON response
+        
+        A worker that doesn't answer within _CSHARP_TIMEOUT seconds is killed, which unblocks
+        the read, and the request raises subprocess.TimeoutExpired.
+        """
+        with cls._worker_lock:
+            worker = cls._get_worker()
+            deadline = threading.Timer(_CSHARP_TIMEOUT, worker.kill)
+            deadline.daemon = True
+            deadline.start()
+            try:
+                worker.stdin.write(f"{sql_path}\n".encode('utf-8'))
+                worker.stdin.flush()
+                
+                header = worker.stdout.readline()
+                if not header:
+                    raise RuntimeError("C# worker exited unexpectedly")
+                length = int(header)
+                payload = worker.stdout.read(length)
+                if len(payload) != length:
+                    raise RuntimeError("C# worker response cut short")
+            except Exception as e:
+                # Drop a broken (or hung) worker so the next request starts a fresh one
+                worker.kill()
+                cls._worker = None
+                if deadline.finished.is_set():
+                    raise subprocess.TimeoutExpired(worker.args, _CSHARP_TIMEOUT) from e
+                raise
+            finally:
+                deadline.cancel()
+        
+        return _json_loads(payload)
+        
+    def run_csharp_parser(self, digest=None):
         """Run the C# ScriptDom parser to extract table metadata"""
+        if not self._csharp_available:
+            return None
+        
+        # Skip the dotnet process entirely when this exact SQL has been parsed before
+        sql_path = Path(self.sql_file_path).resolve()
+        if digest is None:
+            try:
+                digest = hashlib.sha256(sql_path.read_bytes()).digest()
+            except OSError as e:
+                print(f"❌ Error reading SQL file for C# parser: {e}")
+                return None
+        
+        use_cache = _csharp_cache_enabled()
+        cache_key = _csharp_cache_key(digest) if use_cache else None
+        metadata = _load_cached_metadata(cache_key) if cache_key is not None else None
+        if metadata is not None:
+            print(f"⚡ Using cached C# metadata for {self.sql_file_path}")
+            _write_metadata_file(metadata)
+            return metadata
+        
         try:
-            # Run the C# parser
-            result = subprocess.run(
-                ['dotnet', 'run'],
-                cwd='/Users/jamesglasgow/Projects/parser',
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            # Ask the long-lived C# worker to parse this SQL file
+            metadata = self._request_metadata(sql_path)
             
-            if result.returncode != 0:
-                print(f"❌ C# parser error: {result.stderr}")
+            if metadata is None:
+                print(f"❌ C# parser could not analyze {self.sql_file_path}")
                 return None
-            
-            # Read metadata from the JSON file created by C#
-            metadata_path = '/Users/jamesglasgow/Projects/parser/csharp_metadata.json'
-            if Path(metadata_path).exists():
-                import json
-                with open(metadata_path, 'r') as f:
-                    metadata = json.load(f)
-                
-                print(f"🔍 DEBUG: Loaded C# metadata from file:")
-                print(f"   Procedure: {metadata.get('procedure_name')}")
-                print(f"   Source tables: {metadata.get('source_tables', [])}")
-                print(f"   Target tables: {metadata.get('target_tables', [])}")
-                
-                return metadata
-            else:
-                print(f"❌ Metadata file not found: {metadata_path}")
+            if 'error' in metadata:
+                print(f"❌ C# parser error: {metadata['error']}")
                 return None
+            
+            _write_metadata_file(metadata)
+            if use_cache:
+                # The parser may have been (re)published by this request, so key on the build now in use
+                cache_key = _csharp_cache_key(digest)
+                if cache_key is not None:
+                    _store_cached_metadata(cache_key, metadata)
+            
+            print(f"🔍 DEBUG: Loaded C# metadata from worker:")
+            print(f"   Procedure: {metadata.get('procedure_name')}")
+            print(f"   Source tables: {metadata.get('source_tables', [])}")
+            print(f"   Target tables: {metadata.get('target_tables', [])}")
+            
+            return metadata
                 
-        except subprocess.TimeoutExpired:
-            print("❌ C# parser timed out")
+        except subprocess.TimeoutExpired as e:
+            stage = 'publish' if 'publish' in e.cmd else 'analysis'
+            print(f"❌ C# parser {stage} timed out after {e.timeout}s")
             return None
         except Exception as e:
             print(f"❌ Error running C# parser: {e}")
@@ -109,21 +429,44 @@ class HybridSQLLineageParser:
         
         return metadata
     
-    def analyze(self):
-        """Main analysis method combining C# and Python parsers"""
+    def analyze(self, report=True):
+        """Main analysis method combining C# and Python parsers.
+        
+        The last few analyses are cached for the life of the process; a repeated analysis
+        of unchanged SQL (with the same schema and C# parser build) returns a copy of them.
+        """
         print("🔧 " + "=" * 100)
         print("   HYBRID SQL LINEAGE ANALYSIS")
         print(f"   File: {self.sql_file_path}")
         print("=" * 102)
         
+        try:
+            digest = hashlib.sha256(Path(self.sql_file_path).read_bytes()).digest()
+        except OSError:
+            digest = None
+        
+        cache_key = _analyze_cache_key(digest, self.all_paths) if digest is not None else None
+        cached = _ANALYZE_CACHE.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            print(f"⚡ Reusing previous analysis of {self.sql_file_path} (file unchanged)")
+            _ANALYZE_CACHE.move_to_end(cache_key)
+            # Copy so the caller can't modify the cached analysis
+            self.csharp_metadata, self.python_parser, results = copy.deepcopy(cached)
+            self.python_parser.sql_file_path = self.sql_file_path
+            if report:
+                self.python_parser.generate_report()
+                self.python_parser._display_hybrid_end_to_end_lineage(self.python_parser.end_to_end_mappings)
+            return results
+        
         # Step 1: Run C# ScriptDom parser
         print("🔍 Step 1: Running C# ScriptDom parser for table extraction...")
-        self.csharp_metadata = self.run_csharp_parser()
+        self.csharp_metadata = self.run_csharp_parser(digest)
         
         if not self.csharp_metadata:
             print("❌ Failed to get C# metadata, falling back to Python-only analysis")
-            self.python_parser = GenericSQLLineageParser(self.sql_file_path)
-            return self.python_parser.analyze()
+            # No metadata for this file; any csharp_metadata.json on disk belongs to another analysis
+            self.python_parser = GenericSQLLineageParser(self.sql_file_path, metadata={})
+            return self.python_parser.analyze(report)
         
         source_tables = self.csharp_metadata.get('source_tables', [])
         target_tables = self.csharp_metadata.get('target_tables', [])
@@ -135,10 +478,122 @@ class HybridSQLLineageParser:
         print("\n🐍 Step 2: Running Python parser for column lineage...")
         self.python_parser = EnhancedGenericSQLLineageParser(
             self.sql_file_path, 
-            self.csharp_metadata
+            self.csharp_metadata,
+            all_paths=self.all_paths
         )
         
-        return self.python_parser.analyze()
+        results = self.python_parser.analyze(report)
+        # The C# parser may have been published during this analysis, so compute the key afresh
+        cache_key = _analyze_cache_key(digest, self.all_paths) if digest is not None else None
+        if cache_key is not None:
+            _ANALYZE_CACHE[cache_key] = copy.deepcopy((self.csharp_metadata, self.python_parser, results))
+            if len(_ANALYZE_CACHE) > _ANALYZE_CACHE_SIZE:
+                _ANALYZE_CACHE.popitem(last=False)
+        return results
+
+
+atexit.register(HybridSQLLineageParser._close_worker)
+
+
+# Process pool for --batch mode, created on first use and shared for the rest of the run.
+# Each pool process lazily starts (and keeps) its own C# worker via HybridSQLLineageParser._get_worker.
+_batch_pool = None
+
+
+_batch_pool_csharp = None
+
+
+def _get_batch_pool(csharp_available):
+    """Return the shared batch process pool, (re)creating it if the C# publish result changed"""
+    global _batch_pool, _batch_pool_csharp
+    if _batch_pool is not None and _batch_pool_csharp != csharp_available:
+        _batch_pool.shutdown()
+        _batch_pool = None
+    if _batch_pool is None:
+        from concurrent.futures import ProcessPoolExecutor
+        _batch_pool = ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_batch_worker,
+                                          initargs=(csharp_available,))
+        _batch_pool_csharp = csharp_available
+    return _batch_pool
+
+
+def _shutdown_batch_pool():
+    """Shut down the batch process pool if one is running"""
+    if _batch_pool is not None:
+        _batch_pool.shutdown()
+
+
+atexit.register(_shutdown_batch_pool)
+
+
+def _init_batch_worker(csharp_available):
+    """Set up a pool process: skip C# if publishing failed, and silence per-file progress output"""
+    from multiprocessing.util import Finalize
+    
+    HybridSQLLineageParser._csharp_available = csharp_available
+    devnull = open(os.devnull, 'w')
+    sys.stdout = devnull
+    # Pool processes exit without running atexit handlers, but multiprocessing finalizers do run
+    Finalize(None, _close_batch_stdout, args=(devnull,), exitpriority=10)
+    logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+
+def _close_batch_stdout(devnull):
+    """Restore stdout in a pool process and close the devnull handle it was redirected to"""
+    sys.stdout = sys.__stdout__
+    devnull.close()
+
+
+def _analyze_batch_file(sql_file, export=None, all_paths=False):
+    """Analyze one SQL file inside a pool process and return a short summary"""
+    hybrid_parser = HybridSQLLineageParser(sql_file, all_paths)
+    hybrid_parser.analyze(report=False)
+    
+    parser = hybrid_parser.python_parser
+    if export and parser:
+        parser.export_results(export)
+    
+    return {
+        'sql_file': sql_file,
+        'hybrid': hybrid_parser.csharp_metadata is not None,
+        'column_mappings': len(parser.column_mappings),
+        'end_to_end_mappings': len(parser.end_to_end_mappings)
+    }
+
+
+def analyze_batch(directory, export=None, all_paths=False):
+    """Analyze every .sql file in a directory in parallel"""
+    sql_files = sorted(str(path) for path in Path(directory).glob('*.sql'))
+    if not sql_files:
+        print(f"❌ No .sql files found in {directory}")
+        return []
+    
+    # Publish up front so pool processes don't race to run dotnet publish; if it fails,
+    # pool processes are told to skip C# rather than each retrying the publish
+    csharp_available = True
+    try:
+        HybridSQLLineageParser._publish_csharp()
+    except Exception as e:
+        csharp_available = False
+        print(f"⚠️  C# parser unavailable, files will use Python-only analysis: {e}")
+    
+    print(f"🔧 Analyzing {len(sql_files)} SQL files from {directory}...")
+    pool = _get_batch_pool(csharp_available)
+    futures = {pool.submit(_analyze_batch_file, sql_file, export, all_paths): sql_file for sql_file in sql_files}
+    
+    summaries = []
+    for future, sql_file in futures.items():
+        try:
+            summary = future.result()
+        except Exception as e:
+            print(f"❌ {sql_file}: {e}")
+            continue
+        mode = 'C# + Python' if summary['hybrid'] else 'Python only'
+        print(f"✅ {sql_file}: {summary['end_to_end_mappings']} end-to-end lineages, "
+              f"{summary['column_mappings']} column mappings ({mode})")
+        summaries.append(summary)
+    
+    return summaries
 
 
 class EnhancedGenericSQLLineageParser(GenericSQLLineageParser):
@@ -147,48 +602,54 @@ class EnhancedGenericSQLLineageParser(GenericSQLLineageParser):
     to improve table categorization and end-to-end lineage tracing
     """
     
-    def __init__(self, sql_file_path, csharp_metadata):
-        super().__init__(sql_file_path)
+    def __init__(self, sql_file_path, csharp_metadata, all_paths=False):
+        # Hand the metadata over in memory rather than reading back the shared csharp_metadata.json
+        super().__init__(sql_file_path, metadata=csharp_metadata)
         self.csharp_metadata = csharp_metadata
+        self.all_paths = all_paths
         
         # Pre-populate table categories based on C# analysis
         self._initialize_from_csharp_metadata()
     
-    def analyze(self):
+    def analyze(self, report=True):
         """Enhanced analyze method that includes hybrid end-to-end lineage"""
         # Run the base analysis first
-        result = super().analyze()
+        result = super().analyze(report)
         
         # Add hybrid end-to-end lineage tracing
         end_to_end_mappings = self._trace_end_to_end_lineage()
         
         # Display enhanced end-to-end lineage results
-        self._display_hybrid_end_to_end_lineage(end_to_end_mappings)
+        if report:
+            self._display_hybrid_end_to_end_lineage(end_to_end_mappings)
         
         return result
     
     def _display_hybrid_end_to_end_lineage(self, end_to_end_mappings):
         """Display the hybrid end-to-end lineage results"""
-        print("🎯 " + "=" * 100)
-        print("   HYBRID END-TO-END COLUMN LINEAGE (C# + Python)")
-        print("=" * 102)
+        # Collect the whole block and write it once instead of one write per line
+        lines = []
+        out = lines.append
+        
+        out("🎯 " + "=" * 100)
+        out("   HYBRID END-TO-END COLUMN LINEAGE (C# + Python)")
+        out("=" * 102)
         
         if end_to_end_mappings:
-            print(f"🎉 Successfully traced {len(end_to_end_mappings)} complete end-to-end column lineages!")
-            print("")
+            out(f"🎉 Successfully traced {len(end_to_end_mappings)} complete end-to-end column lineages!")
+            out("")
             
-            # Group by source table for better organization
-            by_source_table = {}
+            # Group by source table for better organization (and by target table for the summary) in one pass
+            by_source_table = defaultdict(list)
+            by_target_table = defaultdict(list)
             for mapping in end_to_end_mappings:
-                source_table = mapping['source_table']
-                if source_table not in by_source_table:
-                    by_source_table[source_table] = []
-                by_source_table[source_table].append(mapping)
+                by_source_table[mapping['source_table']].append(mapping)
+                by_target_table[mapping['target_table']].append(mapping)
             
-            for source_table in sorted(by_source_table.keys()):
+            for source_table in sorted(by_source_table):
                 mappings = by_source_table[source_table]
-                print(f"📋 FROM SOURCE TABLE: {source_table}")
-                print("─" * 90)
+                out(f"📋 FROM SOURCE TABLE: {source_table}")
+                out("─" * 90)
                 
                 for mapping in mappings:
                     source_col = mapping['source_column']
@@ -197,96 +658,101 @@ class EnhancedGenericSQLLineageParser(GenericSQLLineageParser):
                     steps = mapping['steps']
                     intermediate_tables = mapping.get('intermediate_tables', [])
                     
-                    print(f"   {source_col:25} → {target_table}.{target_col}")
+                    out(f"   {source_col:25} → {target_table}.{target_col}")
                     if intermediate_tables:
                         intermediate_str = ' → '.join(intermediate_tables)
-                        print(f"   {'':25}   Via: {intermediate_str}")
-                    print(f"   {'':25}   Steps: {steps}")
-                    print("")
+                        out(f"   {'':25}   Via: {intermediate_str}")
+                    out(f"   {'':25}   Steps: {steps}")
+                    if 'all_paths' in mapping:
+                        out(f"   {'':25}   Paths: {len(mapping['all_paths'])}")
+                    out("")
                 
-                print("")
+                out("")
             
             # Summary by target table
-            by_target_table = {}
-            for mapping in end_to_end_mappings:
-                target_table = mapping['target_table']
-                if target_table not in by_target_table:
-                    by_target_table[target_table] = []
-                by_target_table[target_table].append(mapping)
-            
-            print("📊 SUMMARY BY TARGET TABLE:")
-            print("─" * 90)
-            for target_table in sorted(by_target_table.keys()):
+            out("📊 SUMMARY BY TARGET TABLE:")
+            out("─" * 90)
+            for target_table in sorted(by_target_table):
                 mappings = by_target_table[target_table]
-                source_tables = set(m['source_table'] for m in mappings)
-                print(f"   {target_table:30} ← {len(mappings):2} columns from {len(source_tables)} source tables")
-                source_list = ', '.join(sorted(source_tables))
-                print(f"   {'':30}   Sources: {source_list}")
-                print("")
+                source_tables = sorted({m['source_table'] for m in mappings})
+                out(f"   {target_table:30} ← {len(mappings):2} columns from {len(source_tables)} source tables")
+                out(f"   {'':30}   Sources: {', '.join(source_tables)}")
+                out("")
         
         else:
-            print("❌ No complete end-to-end column lineages found")
-            print("   This might indicate:")
-            print("   • Missing intermediate transformations (e.g., MERGE statements)")
-            print("   • Complex CTEs or derived tables not fully parsed")
-            print("   • Disconnected data flows between source and target systems")
+            out("❌ No complete end-to-end column lineages found")
+            out("   This might indicate:")
+            out("   • Missing intermediate transformations (e.g., MERGE statements)")
+            out("   • Complex CTEs or derived tables not fully parsed")
+            out("   • Disconnected data flows between source and target systems")
         
-        print("=" * 102)
+        out("=" * 102)
+        
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def _initialize_from_csharp_metadata(self):
         """Initialize table categorization using C# ScriptDom results"""
         # Mark source tables
         source_tables = self.csharp_metadata.get('source_tables', [])
         for table in source_tables:
-            table_lower = table.lower()
+            table_lower = _lnorm(table)
             if table_lower not in self.source_tables:
                 self.source_tables[table_lower] = {'columns': set(), 'usage_count': 1}
         
         # Mark target tables  
         target_tables = self.csharp_metadata.get('target_tables', [])
         for table in target_tables:
-            table_lower = table.lower()
+            table_lower = _lnorm(table)
             if table_lower not in self.target_tables:
                 self.target_tables[table_lower] = {'columns': set(), 'usage_count': 1}
     
-    def _discover_dynamic_bridges(self, comprehensive_flows, comprehensive_column_to_table, source_tables, final_target_tables):
-        """Dynamically discover bridge connections based on naming patterns and intermediate tables"""
-        bridges = {}
+    def _discover_dynamic_bridges(self, comprehensive_flows, comprehensive_column_to_table, column_names, source_tables, final_target_tables):
+        """Dynamically discover bridge connections based on naming patterns and intermediate tables
+        
+        Returns a mapping of bridge source -> list of target columns, so a column that bridges to
+        several targets keeps every edge instead of only the last one assigned.
+        """
+        bridges = defaultdict(list)
+        debug = log.isEnabledFor(logging.DEBUG)
         
         # Find intermediate temp tables that might need bridging
-        intermediate_tables = set()
-        for col, table in comprehensive_column_to_table.items():
-            if (table.startswith('#') or table.startswith('<default>.#')) and table not in source_tables and table not in final_target_tables:
-                intermediate_tables.add(table)
+        # Many columns share a table, so each filter below tests the distinct tables once
+        all_tables = set(comprehensive_column_to_table.values())
+        intermediate_tables = {table for table in all_tables
+                               if table.startswith(_TEMP_PREFIXES) and table not in source_tables and
+                               table not in final_target_tables}
+        
+        log.info(f"🔍 Found {len(intermediate_tables)} intermediate temp tables: {sorted(intermediate_tables)}")
         
-        print(f"🔍 Found {len(intermediate_tables)} intermediate temp tables: {sorted(intermediate_tables)}")
+        # Every existing edge, so "is there already a direct path" is one hash lookup
+        existing_edges = {(source, target) for source, targets in comprehensive_flows.items() for target in targets}
         
         # Strategy 1: Bridge columns with similar names between intermediate and target tables
-        target_columns = {}
+        target_columns = defaultdict(list)
         for col, table in comprehensive_column_to_table.items():
             if table in final_target_tables:
-                column_name = col.split('.')[-1]
-                if column_name not in target_columns:
-                    target_columns[column_name] = []
-                target_columns[column_name].append(col)
+                target_columns[column_names[col]].append(col)
         
-        intermediate_columns = {}
+        # Only names that also appear in a target table can bridge, so the rest are never collected
+        intermediate_columns = defaultdict(list)
         for col, table in comprehensive_column_to_table.items():
             if table in intermediate_tables:
-                column_name = col.split('.')[-1]
-                if column_name not in intermediate_columns:
-                    intermediate_columns[column_name] = []
-                intermediate_columns[column_name].append(col)
+                column_name = column_names[col]
+                if column_name in target_columns:
+                    intermediate_columns[column_name].append(col)
         
         # Bridge matching column names
-        for column_name in intermediate_columns:
-            if column_name in target_columns:
-                for intermediate_col in intermediate_columns[column_name]:
-                    for target_col in target_columns[column_name]:
-                        # Only bridge if there's no existing direct path
-                        if intermediate_col not in comprehensive_flows or target_col not in comprehensive_flows.get(intermediate_col, []):
-                            bridges[intermediate_col] = target_col
-                            print(f"   🔗 Bridge: {intermediate_col} → {target_col} (matching column name)")
+        for column_name, intermediate_cols in intermediate_columns.items():
+            matching_targets = target_columns[column_name]
+            for intermediate_col in intermediate_cols:
+                # Only bridge if there's no existing direct path
+                new_targets = [target_col for target_col in matching_targets
+                               if (intermediate_col, target_col) not in existing_edges]
+                if new_targets:
+                    bridges[intermediate_col].extend(new_targets)
+                    if debug:
+                        for target_col in new_targets:
+                            log.debug(f"   🔗 Bridge: {intermediate_col} → {target_col} (matching column name)")
         
         # Strategy 2: Bridge based on C# metadata MERGE patterns
         if self.csharp_metadata and 'merge_patterns' in self.csharp_metadata:
@@ -299,11 +765,14 @@ class EnhancedGenericSQLLineageParser(GenericSQLLineageParser):
                     target_cols = [col for col, table in comprehensive_column_to_table.items() if table == target_table]
                     
                     for source_col in source_cols:
-                        column_name = source_col.split('.')[-1]
-                        matching_targets = [tc for tc in target_cols if tc.split('.')[-1] == column_name]
+                        column_name = column_names[source_col]
+                        matching_targets = [tc for tc in target_cols if column_names[tc] == column_name]
                         for target_col in matching_targets:
-                            bridges[source_col] = target_col
-                            print(f"   🔗 Bridge: {source_col} → {target_col} (C# MERGE pattern)")
+                            if target_col in bridges.get(source_col, ()):
+                                continue
+                            bridges[source_col].append(target_col)
+                            if debug:
+                                log.debug(f"   🔗 Bridge: {source_col} → {target_col} (C# MERGE pattern)")
         
         # Strategy 3: Dynamic pattern-based bridges (no hardcoded mappings)
         # Look for common transformation patterns in intermediate tables that connect to targets
@@ -315,73 +784,70 @@ class EnhancedGenericSQLLineageParser(GenericSQLLineageParser):
             
             # For each intermediate column, try to find target columns with related names
             for intermediate_col in intermediate_cols:
-                intermediate_col_name = intermediate_col.split('.')[-1]
+                intermediate_col_name = column_names[intermediate_col]
                 
                 # Look for target columns that might be related (same root name, variations)
                 for target_col, target_table in comprehensive_column_to_table.items():
                     if target_table in final_target_tables:
-                        target_col_name = target_col.split('.')[-1]
+                        target_col_name = column_names[target_col]
                         
                         # Check for name similarity patterns (dynamic detection)
                         if self._are_columns_related(intermediate_col_name, target_col_name):
                             bridge_key = f"pattern_bridge_{intermediate_col}_{target_col}"
                             if bridge_key not in bridges:
-                                bridges[bridge_key] = target_col
-                                print(f"   🔗 Bridge: {intermediate_col} → {target_col} (pattern similarity: {intermediate_col_name} ↔ {target_col_name})")
+                                bridges[bridge_key] = [target_col]
+                                if debug:
+                                    log.debug(f"   🔗 Bridge: {intermediate_col} → {target_col} (pattern similarity: {intermediate_col_name} ↔ {target_col_name})")
         
         # Strategy 5: Dynamic reference table analysis
         # Find patterns where reference tables provide lookup data to targets
         
-        reference_tables = set()
-        for col, table in comprehensive_column_to_table.items():
-            if any(ref_pattern in table for ref_pattern in ['ref.', 'reference', 'lookup', 'dim']):
-                reference_tables.add(table)
+        reference_tables = {table for table in all_tables if _REFERENCE_TABLE_RE.search(table)}
         
         # For each reference table, find columns that might resolve to target columns
         for ref_table in reference_tables:
             ref_cols = [col for col, table in comprehensive_column_to_table.items() if table == ref_table]
             
             for ref_col in ref_cols:
-                ref_col_name = ref_col.split('.')[-1]
+                ref_col_name = column_names[ref_col]
                 
                 # Look for target columns that this reference might resolve to
                 for target_col, target_table in comprehensive_column_to_table.items():
                     if target_table in final_target_tables:
-                        target_col_name = target_col.split('.')[-1]
+                        target_col_name = column_names[target_col]
                         
                         # Check if this looks like a reference resolution
                         if self._is_reference_resolution(ref_col_name, target_col_name, ref_table):
                             bridge_key = f"ref_bridge_{ref_col}_{target_col}"
                             if bridge_key not in bridges:
-                                bridges[bridge_key] = target_col
-                                print(f"   🔗 Bridge: {ref_col} → {target_col} (reference resolution: {ref_table})")
+                                bridges[bridge_key] = [target_col]
+                                if debug:
+                                    log.debug(f"   🔗 Bridge: {ref_col} → {target_col} (reference resolution: {ref_table})")
         
         # Strategy 6: Dynamic FX/calculation bridges
         # Find rate/calculation columns that affect amount columns
         
-        calc_tables = set()
-        for col, table in comprehensive_column_to_table.items():
-            if any(calc_pattern in table for calc_pattern in ['fx', 'rate', 'currency']):
-                calc_tables.add(table)
+        calc_tables = {table for table in all_tables if _CALC_TABLE_RE.search(table)}
         
         for calc_table in calc_tables:
             calc_cols = [col for col, table in comprehensive_column_to_table.items() if table == calc_table]
             
             for calc_col in calc_cols:
-                calc_col_name = calc_col.split('.')[-1]
+                calc_col_name = column_names[calc_col]
                 
                 # Rate/currency columns often affect amount calculations
-                if any(pattern in calc_col_name for pattern in ['rate', 'currency', 'fx']):
+                if _CALC_TABLE_RE.search(calc_col_name):
                     # Find amount-related target columns
                     for target_col, target_table in comprehensive_column_to_table.items():
                         if target_table in final_target_tables:
-                            target_col_name = target_col.split('.')[-1]
+                            target_col_name = column_names[target_col]
                             
                             if 'amount' in target_col_name:
                                 bridge_key = f"calc_bridge_{calc_col}_{target_col}"
                                 if bridge_key not in bridges:
-                                    bridges[bridge_key] = target_col
-                                    print(f"   🔗 Bridge: {calc_col} → {target_col} (calculation: {calc_col_name} affects {target_col_name})")
+                                    bridges[bridge_key] = [target_col]
+                                    if debug:
+                                        log.debug(f"   🔗 Bridge: {calc_col} → {target_col} (calculation: {calc_col_name} affects {target_col_name})")
         
         return bridges
 
@@ -392,12 +858,12 @@ class EnhancedGenericSQLLineageParser(GenericSQLLineageParser):
             return True
         
         # Dynamic table-based resolution
-        ref_table_lower = ref_table.lower()
-        ref_col_lower = ref_col_name.lower()
-        target_col_lower = target_col_name.lower()
+        ref_table_lower = _lnorm(ref_table)
+        ref_col_lower = _lnorm(ref_col_name)
+        target_col_lower = _lnorm(target_col_name)
         
         # If the reference table name appears in the target column, it's likely a resolution
-        table_parts = ref_table_lower.split('.')[-1]  # Get table name without schema
+        table_parts = ref_table_lower.rpartition('.')[2]  # Get table name without schema
         if table_parts in target_col_lower:
             return True
         
@@ -405,17 +871,17 @@ class EnhancedGenericSQLLineageParser(GenericSQLLineageParser):
         # Reference tables often provide lookup data for core business columns
         if 'account' in ref_table_lower:
             # Account reference can resolve to account-related columns
-            if any(pattern in target_col_lower for pattern in ['account', 'acct', 'customer', 'branch']):
+            if _ACCOUNT_TARGET_RE.search(target_col_lower):
                 return True
         
         if 'currency' in ref_table_lower:
             # Currency reference can affect amount calculations
-            if any(pattern in target_col_lower for pattern in ['amount', 'currency', 'rate', 'fee', 'base']):
+            if _CURRENCY_TARGET_RE.search(target_col_lower):
                 return True
         
         if 'rate' in ref_table_lower or 'fx' in ref_table_lower:
             # Rate/FX tables affect amount calculations
-            if any(pattern in target_col_lower for pattern in ['amount', 'fee', 'base']):
+            if _RATE_TARGET_RE.search(target_col_lower):
                 return True
         
         # Use enhanced column relationship logic
@@ -423,8 +889,8 @@ class EnhancedGenericSQLLineageParser(GenericSQLLineageParser):
 
     def _are_columns_related(self, col1, col2):
         """Dynamically determine if two column names are related based on patterns"""
-        col1_lower = col1.lower()
-        col2_lower = col2.lower()
+        col1_lower = _lnorm(col1)
+        col2_lower = _lnorm(col2)
         
         # Exact match
         if col1_lower == col2_lower:
@@ -438,35 +904,10 @@ class EnhancedGenericSQLLineageParser(GenericSQLLineageParser):
         if root1 == root2 and len(root1) > 2:  # Lowered threshold for more matches
             return True
         
-        # Enhanced semantic similarity with more comprehensive groupings
-        semantic_groups = [
-            # Date/Time related
-            {'date', 'time', 'posting', 'created', 'batch', 'value', 'txn', 'transaction'},
-            # ID/Key related  
-            {'id', 'key', 'hash', 'src', 'external', 'batch', 'idem', 'potency'},
-            # Amount/Money related
-            {'amount', 'currency', 'base', 'rate', 'fx', 'fee', 'money', 'value'},
-            # Account related
-            {'account', 'acct', 'no', 'number', 'customer', 'branch'},
-            # Transaction related
-            {'txn', 'transaction', 'narrative', 'desc', 'channel', 'type'},
-            # Status/Direction related
-            {'status', 'direction', 'state', 'active', 'inactive'}
-        ]
-        
-        # Find which semantic groups each column belongs to
-        col1_groups = []
-        col2_groups = []
-        
-        for i, group in enumerate(semantic_groups):
-            if any(term in col1_lower for term in group):
-                col1_groups.append(i)
-            if any(term in col2_lower for term in group):
-                col2_groups.append(i)
-        
-        # If columns share semantic groups, they might be related
-        if set(col1_groups) & set(col2_groups):
-            return True
+        # Enhanced semantic similarity: columns sharing a semantic group might be related
+        for group_re in _SEMANTIC_GROUP_RES:
+            if group_re.search(col1_lower) and group_re.search(col2_lower):
+                return True
         
         # Additional pattern matching for common transformations
         # Check for substring containment (one column name contains the other's root)
@@ -516,158 +957,156 @@ class EnhancedGenericSQLLineageParser(GenericSQLLineageParser):
 
     def _trace_end_to_end_lineage(self):
         """Enhanced end-to-end tracing using C# metadata"""
-        print("\n🔍 Step 4: Tracing end-to-end column lineage (C# + Python hybrid)...")
+        # Tracer progress goes through the logger so --quiet can silence it (and --verbose adds per-edge detail)
+        log.info("\n🔍 Step 4: Tracing end-to-end column lineage (C# + Python hybrid)...")
         
         # Use C# identified tables as the authoritative source
-        final_target_tables = set(table.lower() for table in self.csharp_metadata.get('target_tables', []))
-        source_tables = set(table.lower() for table in self.csharp_metadata.get('source_tables', []))
-        
-        print(f"📊 C# identified source tables: {sorted(source_tables)}")
-        print(f"📊 C# identified target tables: {sorted(final_target_tables)}")
-        
-        # Build flow graph from discovered mappings
-        all_flows = {}
-        column_to_table = {}
+        final_target_tables = set(_lnorm(table) for table in self.csharp_metadata.get('target_tables', []))
+        source_tables = set(_lnorm(table) for table in self.csharp_metadata.get('source_tables', []))
         
-        for mapping in self.column_mappings:
-            source_col = mapping['source_column'].lower()
-            target_col = mapping['target_column'].lower()
-            
-            if source_col not in all_flows:
-                all_flows[source_col] = set()
-            all_flows[source_col].add(target_col)
-            
-            # Map columns to their tables
-            if '.' in source_col:
-                source_table = '.'.join(source_col.split('.')[:-1])
-                column_to_table[source_col] = source_table
-            if '.' in target_col:
-                target_table = '.'.join(target_col.split('.')[:-1])
-                column_to_table[target_col] = target_table
-        
-        def find_all_paths_to_finals(start_col, visited=None, path=None):
-            """Recursively find all paths from a column to C# identified final target tables"""
-            if visited is None:
-                visited = set()
-            if path is None:
-                path = []
-            
-            if start_col in visited:
-                return []
-            
-            visited.add(start_col)
-            current_path = path + [start_col]
-            all_paths = []
-            
-            # Check if this column is in a C# identified final target table
-            if start_col in column_to_table:
-                table = column_to_table[start_col]
-                if table in final_target_tables:
-                    return [current_path]
-            
-            # Continue tracing through all connections
-            for next_col in all_flows.get(start_col, []):
-                sub_paths = find_all_paths_to_finals(next_col, visited.copy(), current_path)
-                all_paths.extend(sub_paths)
-            
-            return all_paths
+        log.info(f"📊 C# identified source tables: {sorted(source_tables)}")
+        log.info(f"📊 C# identified target tables: {sorted(final_target_tables)}")
         
         # Find end-to-end paths from C# identified source tables to target tables
         end_to_end_mappings = []
         
-        print("🔍 Tracing paths from C# source tables to C# target tables...")
-        print("🔗 Building comprehensive lineage map from both C# and Python data...")
+        log.info("🔍 Tracing paths from C# source tables to C# target tables...")
+        log.info("🔗 Building comprehensive lineage map from both C# and Python data...")
         
         # Combine all mappings from both C# and Python
-        comprehensive_flows = {}
+        comprehensive_flows = defaultdict(list)
         
         # Add Python column mappings
         for mapping in self.column_mappings:
-            source_col = mapping['source_column'].lower()
-            target_col = mapping['target_column'].lower()
-            
-            if source_col not in comprehensive_flows:
-                comprehensive_flows[source_col] = []
+            source_col = _lnorm(mapping.source_column)
+            target_col = _lnorm(mapping.target_column)
             comprehensive_flows[source_col].append(target_col)
         
-        # Add C# column lineages from JSON metadata
+        # Add C# column lineages from JSON metadata (the C# parser groups them as real_to_real / temp_involved)
         if self.csharp_metadata and 'column_lineages' in self.csharp_metadata:
-            for lineage in self.csharp_metadata['column_lineages']:
-                source_col = f"{lineage['source_table']}.{lineage['source_column']}"
-                target_col = f"{lineage['target_table']}.{lineage['target_column']}"
-                
-                if source_col not in comprehensive_flows:
-                    comprehensive_flows[source_col] = []
+            csharp_lineages = self.csharp_metadata['column_lineages']
+            if isinstance(csharp_lineages, dict):
+                csharp_lineages = [lineage for group in csharp_lineages.values() for lineage in group]
+            
+            # Normalized like the Python mappings above so both sides name a column the same way
+            for lineage in csharp_lineages:
+                source_col = _lnorm(f"{lineage['source_table']}.{lineage['source_column']}")
+                target_col = _lnorm(f"{lineage['target_table']}.{lineage['target_column']}")
                 comprehensive_flows[source_col].append(target_col)
         
         # Add dynamic bridge connections based on discovered patterns
-        comprehensive_column_to_table = {}
-        for col in comprehensive_flows.keys():
-            if '.' in col:
-                table = '.'.join(col.split('.')[:-1])
-                comprehensive_column_to_table[col] = table
-        
-        for col_list in comprehensive_flows.values():
-            for col in col_list:
-                if '.' in col:
-                    table = '.'.join(col.split('.')[:-1])
-                    comprehensive_column_to_table[col] = table
+        comprehensive_column_to_table, column_names = _build_column_maps(comprehensive_flows)
         
-        dynamic_bridges = self._discover_dynamic_bridges(comprehensive_flows, comprehensive_column_to_table, source_tables, final_target_tables)
+        dynamic_bridges = self._discover_dynamic_bridges(comprehensive_flows, comprehensive_column_to_table, column_names,
+                                                         source_tables, final_target_tables)
         
         if dynamic_bridges:
-            print(f"🔗 Adding {len(dynamic_bridges)} dynamic bridge connections...")
-            for source_col, target_col in dynamic_bridges.items():
-                if source_col not in comprehensive_flows:
-                    comprehensive_flows[source_col] = []
-                comprehensive_flows[source_col].append(target_col)
-
-        # Build complete column-to-table mapping
-        comprehensive_column_to_table = {}
-        for col in comprehensive_flows.keys():
-            if '.' in col:
-                table = '.'.join(col.split('.')[:-1])
-                comprehensive_column_to_table[col] = table
-        
-        for col_list in comprehensive_flows.values():
-            for col in col_list:
-                if '.' in col:
-                    table = '.'.join(col.split('.')[:-1])
-                    comprehensive_column_to_table[col] = table
-        
-        print(f"🔍 Built comprehensive flow map with {len(comprehensive_flows)} source columns")
-        print(f"🔍 Mapped {len(comprehensive_column_to_table)} columns to tables")
-        
-        def find_complete_paths_to_finals(start_col, visited=None, path=None):
-            """Recursively find complete paths from a column to C# identified final target tables"""
-            if visited is None:
-                visited = set()
-            if path is None:
-                path = []
-            
-            if start_col in visited:
+            log.info(f"🔗 Adding {sum(map(len, dynamic_bridges.values()))} dynamic bridge connections...")
+            # Only the bridge endpoints can be new columns, so extend the maps rather than rebuild them
+            for source_col, bridge_targets in dynamic_bridges.items():
+                comprehensive_flows[source_col].extend(bridge_targets)
+                _map_column(source_col, comprehensive_column_to_table, column_names)
+                for target_col in bridge_targets:
+                    _map_column(target_col, comprehensive_column_to_table, column_names)
+        
+        log.info(f"🔍 Built comprehensive flow map with {len(comprehensive_flows)} source columns")
+        log.info(f"🔍 Mapped {len(comprehensive_column_to_table)} columns to tables")
+        
+        # Give every column a small integer id so path finding indexes lists instead of hashing strings
+        id_to_col = list(column_names)
+        col_to_id = {col: i for i, col in enumerate(id_to_col)}
+        column_count = len(id_to_col)
+        
+        adjacency = [()] * column_count
+        for col, targets in comprehensive_flows.items():
+            adjacency[col_to_id[col]] = [col_to_id[target] for target in targets]
+        
+        is_final = bytearray(column_count)
+        for i, col in enumerate(id_to_col):
+            if comprehensive_column_to_table.get(col) in final_target_tables:
+                is_final[i] = 1
+        
+        # One representative path per (source, final column) pair: a DFS from the source records the column
+        # each column was first reached from, and each path is rebuilt from that predecessor chain. Enumerating
+        # every path is exponential on deep CTE chains, and only the first path per pair was ever kept.
+        visit_stamp = [0] * column_count
+        pred = [0] * column_count
+        
+        def find_complete_paths_to_finals(start_id, stamp):
+            """Find one path (as an id list) from a column to each reachable column in a C# identified final target table"""
+            # A column already in a final target table has no path beyond itself
+            if is_final[start_id]:
                 return []
             
-            visited.add(start_col)
-            current_path = path + [start_col]
-            all_complete_paths = []
+            reached_finals = []
+            visit_stamp[start_id] = stamp
+            stack = [(start_id, iter(adjacency[start_id]))]
+            while stack:
+                col_id, next_ids = stack[-1]
+                for next_id in next_ids:
+                    if visit_stamp[next_id] != stamp:
+                        visit_stamp[next_id] = stamp
+                        pred[next_id] = col_id
+                        # A column in a C# identified final target table ends the path
+                        if is_final[next_id]:
+                            reached_finals.append(next_id)
+                        else:
+                            stack.append((next_id, iter(adjacency[next_id])))
+                            break
+                else:
+                    stack.pop()
             
-            # Check if this column is in a C# identified final target table
-            if start_col in comprehensive_column_to_table:
-                table = comprehensive_column_to_table[start_col]
-                if table in final_target_tables:
-                    return [current_path]
-            
-            # Continue tracing through all connections
-            for next_col in comprehensive_flows.get(start_col, []):
-                sub_paths = find_complete_paths_to_finals(next_col, visited.copy(), current_path)
-                all_complete_paths.extend(sub_paths)
+            paths = []
+            for final_id in reached_finals:
+                path = [final_id]
+                col_id = final_id
+                while col_id != start_id:
+                    col_id = pred[col_id]
+                    path.append(col_id)
+                path.reverse()
+                paths.append(path)
+            return paths
+        
+        # --all-paths: the full enumeration of simple paths. Not memoized per column - a memo filled while
+        # other columns are on the current path misses paths through them on cyclic graphs.
+        on_path = bytearray(column_count)
+        
+        def find_all_paths_to_finals(start_id, stamp=None):
+            """Find every path (as an id list) from a column to C# identified final target tables"""
+            if is_final[start_id]:
+                return []
             
-            return all_complete_paths
+            paths = []
+            path = [start_id]
+            on_path[start_id] = 1
+            # Repeated edges (the same flow from both C# and Python) would list the same path twice
+            stack = [iter(dict.fromkeys(adjacency[start_id]))]
+            while stack:
+                for next_id in stack[-1]:
+                    # Skip edges back onto the current path
+                    if on_path[next_id]:
+                        continue
+                    # A column in a C# identified final target table ends the path
+                    if is_final[next_id]:
+                        paths.append(path + [next_id])
+                    else:
+                        path.append(next_id)
+                        on_path[next_id] = 1
+                        stack.append(iter(dict.fromkeys(adjacency[next_id])))
+                        break
+                else:
+                    stack.pop()
+                    on_path[path.pop()] = 0
+            return paths
+        
+        # Enumerating every path is exponential on deep CTE chains, so it is opt-in
+        find_paths = find_all_paths_to_finals if self.all_paths else find_complete_paths_to_finals
         
         # Find end-to-end paths from original source tables to final target tables
-        print(f"🔍 Scanning {len(comprehensive_flows)} source columns for original sources...")
+        log.info(f"🔍 Scanning {len(comprehensive_flows)} source columns for original sources...")
         original_source_count = 0
+        seen_mappings = {}  # (source table, column, target table, column) -> its end-to-end mapping
+        debug = log.isEnabledFor(logging.DEBUG)
         
         for source_col in comprehensive_flows.keys():
             if source_col in comprehensive_column_to_table:
@@ -675,40 +1114,45 @@ class EnhancedGenericSQLLineageParser(GenericSQLLineageParser):
                 
                 # Check if this is an original source table (not temp/intermediate)
                 if (source_table in source_tables and 
-                    not source_table.startswith('#') and 
-                    not source_table.startswith('<default>.#') and
-                    source_table not in ['x', 'r', 'a', 'j', 'joinmap']):
+                    not source_table.startswith(_TEMP_PREFIXES) and
+                    source_table not in _ALIAS_DENYLIST):
                     
-                    print(f"🔍 Found original source column: {source_col} from table {source_table}")
+                    if debug:
+                        log.debug(f"🔍 Found original source column: {source_col} from table {source_table}")
                     original_source_count += 1
                     
-                    complete_paths = find_complete_paths_to_finals(source_col)
-                    print(f"   → Found {len(complete_paths)} complete paths")
+                    complete_paths = [[id_to_col[i] for i in path]
+                                      for path in find_paths(col_to_id[source_col], original_source_count)]
+                    if debug:
+                        log.debug(f"   → Found {len(complete_paths)} complete paths")
                     
                     for complete_path in complete_paths:
                         if len(complete_path) >= 2:  # Must have at least source and target
                             source_full = complete_path[0]
                             target_full = complete_path[-1]
                             
-                            # Parse source and target
-                            source_parts = source_full.split('.')
-                            target_parts = target_full.split('.')
-                            
-                            if len(source_parts) >= 2 and len(target_parts) >= 2:
-                                source_table_name = '.'.join(source_parts[:-1])
-                                source_column_name = source_parts[-1]
-                                target_table_name = '.'.join(target_parts[:-1])
-                                target_column_name = target_parts[-1]
+                            # Parse source and target (only qualified columns have a table)
+                            if source_full in comprehensive_column_to_table and target_full in comprehensive_column_to_table:
+                                source_table_name = comprehensive_column_to_table[source_full]
+                                source_column_name = column_names[source_full]
+                                target_table_name = comprehensive_column_to_table[target_full]
+                                target_column_name = column_names[target_full]
                                 
-                                # Create intermediate steps summary
-                                intermediate_tables = []
-                                for step in complete_path[1:-1]:  # Skip source and target
-                                    if '.' in step:
-                                        step_table = '.'.join(step.split('.')[:-1])
-                                        if step_table not in intermediate_tables:
-                                            intermediate_tables.append(step_table)
+                                # Skip duplicates before building anything for them (--all-paths just records the path)
+                                key = (source_table_name, source_column_name, target_table_name, target_column_name)
+                                seen = seen_mappings.get(key)
+                                if seen is not None:
+                                    if self.all_paths:
+                                        seen['all_paths'].append(' → '.join(complete_path))
+                                    continue
                                 
-                                end_to_end_mappings.append({
+                                # Create intermediate steps summary (ordered, de-duplicated)
+                                intermediate_tables = list(dict.fromkeys(
+                                    comprehensive_column_to_table[step] for step in complete_path[1:-1]  # Skip source and target
+                                    if step in comprehensive_column_to_table
+                                ))
+                                
+                                mapping = {
                                     'source_table': source_table_name,
                                     'source_column': source_column_name,
                                     'target_table': target_table_name,
@@ -716,26 +1160,20 @@ class EnhancedGenericSQLLineageParser(GenericSQLLineageParser):
                                     'steps': len(complete_path),
                                     'path': ' → '.join(complete_path),
                                     'intermediate_tables': intermediate_tables
-                                })
+                                }
+                                if self.all_paths:
+                                    mapping['all_paths'] = [mapping['path']]
+                                seen_mappings[key] = mapping
+                                end_to_end_mappings.append(mapping)
                                 
-                                print(f"✅ Complete lineage: {source_full} → {target_full} (via {len(intermediate_tables)} intermediate tables)")
-        
-        print(f"🔍 Found {original_source_count} original source columns to trace")
+                                if debug:
+                                    log.debug(f"✅ Complete lineage: {source_full} → {target_full} (via {len(intermediate_tables)} intermediate tables)")
         
-        print(f"✅ C# + Python hybrid traced {len(end_to_end_mappings)} unique end-to-end column lineages")
+        log.info(f"🔍 Found {original_source_count} original source columns to trace")
         
-        # Remove duplicates
-        seen_mappings = set()
-        unique_mappings = []
+        log.info(f"✅ C# + Python hybrid traced {len(end_to_end_mappings)} unique end-to-end column lineages")
         
-        for mapping in end_to_end_mappings:
-            key = (mapping['source_table'], mapping['source_column'], 
-                   mapping['target_table'], mapping['target_column'])
-            if key not in seen_mappings:
-                seen_mappings.add(key)
-                unique_mappings.append(mapping)
-        
-        self.end_to_end_mappings = unique_mappings
+        self.end_to_end_mappings = end_to_end_mappings
         return self.end_to_end_mappings
 
 
@@ -744,17 +1182,37 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='Hybrid SQL Lineage Parser (C# + Python)')
-    parser.add_argument('sql_file', help='Path to SQL file to analyze')
+    parser.add_argument('sql_file', nargs='?', help='Path to SQL file to analyze')
+    parser.add_argument('--batch', '-b', metavar='DIR', help='Analyze every .sql file in DIR in parallel')
     parser.add_argument('--export', '-e', choices=['json'], default=None,
                        help='Export results to file format')
     parser.add_argument('--output', '-o', help='Output file path')
+    parser.add_argument('--quiet', '-q', action='store_true', help='Hide the tracer\'s progress lines; only show its warnings and errors')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Show per-edge and per-path tracing details')
+    parser.add_argument('--no-cache', action='store_true', help='Always run the C# parser instead of using cached metadata')
+    parser.add_argument('--all-paths', action='store_true',
+                       help='List every path for each traced column pair (exponential on deep CTE chains)')
     
     args = parser.parse_args()
     
+    if args.no_cache:
+        # Through the environment so batch pool processes see it too
+        os.environ['HYBRID_SQL_NO_CACHE'] = '1'
+    
+    level = logging.WARNING if args.quiet else logging.DEBUG if args.verbose else logging.INFO
+    # Same stream as the rest of the report so the tracer's lines stay in order with it
+    logging.basicConfig(level=level, format='%(message)s', stream=sys.stdout)
+    
+    if args.batch:
+        analyze_batch(args.batch, args.export, args.all_paths)
+        return 0
+    if not args.sql_file:
+        parser.error('a SQL file or --batch DIR is required')
+    
     try:
         # Create hybrid parser and analyze
-        hybrid_parser = HybridSQLLineageParser(args.sql_file)
-        results = hybrid_parser.analyze()
+        hybrid_parser = HybridSQLLineageParser(args.sql_file, args.all_paths)
+        results = hybrid_parser.analyze(report=not args.export)
         
         # Export if requested
         if args.export and hybrid_parser.python_parser:
@@ -771,6 +1229,7 @@ if __name__ == "__main__":
     # If called directly without command line args, use the test file
     import sys
     if len(sys.argv) == 1:
+        logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
         hybrid_parser = HybridSQLLineageParser("test.sql")
         hybrid_parser.analyze()
     else:
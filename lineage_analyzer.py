@@ -17,7 +17,44 @@ Features:
 import json
 import sys
 from collections import defaultdict, deque
-from typing import Dict, List, Set, Tuple, Optional
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Set, Tuple, Optional
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to streaming the stdlib encoder
+    orjson = None
+
+# Table names (lower-cased) that denote temp tables, CTEs or derived-table aliases
+_TEMP_INDICATORS = frozenset({
+    '#', 'x', 'j', 'a', 'r', 'scores', 'feerule', 'feecalc', 'bal',
+    'needcheck', 'slice', 'map', 'src', 'joinmap', 'net'
+})
+
+
+@lru_cache(maxsize=None)
+def _is_temp_table_name(table_name: str) -> bool:
+    """Check if a table is temporary or CTE (cached per table name)."""
+    return table_name.startswith('#') or table_name.lower() in _TEMP_INDICATORS
+
+
+@dataclass(slots=True)
+class Lineage:
+    """One source-to-target column lineage; serialized as a dict only when saved."""
+    source: str
+    target: str
+    source_table: str
+    source_column: str
+    target_table: str
+    target_column: str
+    category: str
+    is_direct: bool
+    shortest_path: List[str]
+    path_length: int
+    all_paths: List[List[str]]  # First 5 paths (only those are kept)
+    path_count: int  # Only a lower bound when path_count_exact is False
+    path_count_exact: bool = True
 
 
 class LineageAnalyzer:
@@ -38,9 +75,27 @@ class LineageAnalyzer:
         self.forward_graph = defaultdict(set)  # source -> targets
         self.reverse_graph = defaultdict(set)  # target -> sources
         self.all_columns = set()
+        self.column_parts: Dict[str, Tuple[str, str]] = {}  # column -> (table, column name), split once
+        
+        # Strongly connected components of the forward graph and the condensation DAG between them
+        self.component_of: Dict[str, int] = {}
+        self.components: List[List[str]] = []  # in reverse topological order (downstream first)
+        self.dag_forward: List[Set[int]] = []
+        
+        # Integer-indexed copy of the forward graph for the path search (adjacency as tuples of ids)
+        self.column_ids: Dict[str, int] = {}
+        self.column_names: List[str] = []
+        self.successor_ids: List[Tuple[int, ...]] = []
+        self.component_by_id: List[int] = []
+        
+        # Ultimate source/target sets per column, filled for every column on first lookup
+        self._ult_src_cache: Dict[str, FrozenSet[str]] = {}
+        self._ult_tgt_cache: Dict[str, FrozenSet[str]] = {}
         
         # Build the lineage graph
         self._build_lineage_graph()
+        self._condense_graph()
+        self._index_graph()
         
         print(f"📊 Built lineage graph with {len(self.all_columns)} columns")
         print(f"🔗 Forward edges: {sum(len(targets) for targets in self.forward_graph.values())}")
@@ -48,46 +103,57 @@ class LineageAnalyzer:
 
     def _build_lineage_graph(self):
         """Build forward and reverse lineage graphs from metadata."""
-        lineages = []
+        # Collected as (source_table, source_column, target_table, target_column) tuples
+        lineages: List[Tuple[str, str, str, str]] = []
         
         # Collect all lineages
         column_lineages = self.metadata.get('column_lineages', {})
         
         # Add real-to-real lineages
         if 'real_to_real' in column_lineages:
-            lineages.extend(column_lineages['real_to_real'])
+            lineages.extend(
+                (lineage['source_table'], lineage['source_column'],
+                 lineage['target_table'], lineage['target_column'])
+                for lineage in column_lineages['real_to_real']
+            )
         
         # Add temp-involved lineages (filter out incomplete ones)
         if 'temp_involved' in column_lineages:
             for lineage in column_lineages['temp_involved']:
-                if (lineage.get('source_table') and lineage.get('source_column') and 
-                    lineage.get('target_table') and lineage.get('target_column')):
-                    lineages.append(lineage)
-        
-        # Build graphs
-        for lineage in lineages:
-            source = f"{lineage['source_table']}.{lineage['source_column']}"
-            target = f"{lineage['target_table']}.{lineage['target_column']}"
+                fields = (lineage.get('source_table'), lineage.get('source_column'),
+                          lineage.get('target_table'), lineage.get('target_column'))
+                if all(fields):
+                    lineages.append(fields)
+        
+        # Build graphs; column names are interned so each one is stored once and compares by identity
+        intern = sys.intern
+        for source_table, source_column, target_table, target_column in lineages:
+            source = intern(f"{source_table}.{source_column}")
+            target = intern(f"{target_table}.{target_column}")
             
             self.forward_graph[source].add(target)
             self.reverse_graph[target].add(source)
             self.all_columns.add(source)
             self.all_columns.add(target)
+            
+            for column in (source, target):
+                if column not in self.column_parts:
+                    table, _, name = column.partition('.')
+                    self.column_parts[column] = (intern(table), intern(name))
 
     def _is_temp_table(self, table_name: str) -> bool:
         """Check if a table is temporary or CTE."""
-        temp_indicators = [
-            '#', 'x', 'j', 'a', 'r', 'scores', 'feerule', 'feecalc', 'bal',
-            'needcheck', 'slice', 'map', 'src', 'joinmap', 'net'
-        ]
-        
-        return (table_name.startswith('#') or 
-                table_name.lower() in [t.lower() for t in temp_indicators])
+        return _is_temp_table_name(table_name)
+
+    def _table_of(self, column: str) -> str:
+        """Table part of a column, from the parts split when the graph was built."""
+        parts = self.column_parts.get(column)
+        return parts[0] if parts else column.partition('.')[0]
 
     def _categorize_lineage(self, source: str, target: str) -> str:
         """Categorize the lineage type."""
-        source_table = source.split('.')[0]
-        target_table = target.split('.')[0]
+        source_table = self._table_of(source)
+        target_table = self._table_of(target)
         
         source_is_temp = self._is_temp_table(source_table)
         target_is_temp = self._is_temp_table(target_table)
@@ -101,45 +167,157 @@ class LineageAnalyzer:
         else:
             return "temp_to_temp"
 
-    def find_ultimate_sources(self, column: str, visited: Optional[Set[str]] = None) -> Set[str]:
-        """Find all ultimate source columns (recursively)."""
-        if visited is None:
-            visited = set()
-        
-        if column in visited:
-            return set()  # Cycle detection
-        
-        visited.add(column)
-        
-        # If no incoming edges, this is an ultimate source
-        if column not in self.reverse_graph:
-            return {column}
-        
-        ultimate_sources = set()
-        for source in self.reverse_graph[column]:
-            ultimate_sources.update(self.find_ultimate_sources(source, visited.copy()))
-        
-        return ultimate_sources
+    def _condense_graph(self):
+        """Collapse cycles with an iterative Tarjan SCC pass and build the condensation DAG."""
+        graph = self.forward_graph
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+        
+        for root in self.all_columns:
+            if root in index:
+                continue
+            
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(graph.get(root, ())))]
+            
+            while work:
+                node, next_cols = work[-1]
+                for next_col in next_cols:
+                    if next_col not in index:
+                        index[next_col] = low[next_col] = len(index)
+                        stack.append(next_col)
+                        on_stack.add(next_col)
+                        work.append((next_col, iter(graph.get(next_col, ()))))
+                        break
+                    if next_col in on_stack:
+                        low[node] = min(low[node], index[next_col])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    
+                    # node is the root of a component: pop its members off the stack
+                    if low[node] == index[node]:
+                        component_id = len(self.components)
+                        members = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            self.component_of[member] = component_id
+                            members.append(member)
+                            if member == node:
+                                break
+                        self.components.append(members)
+        
+        self.dag_forward = [set() for _ in self.components]
+        for source, targets in graph.items():
+            source_component = self.component_of[source]
+            for target in targets:
+                target_component = self.component_of[target]
+                if target_component != source_component:
+                    self.dag_forward[source_component].add(target_component)
 
-    def find_ultimate_targets(self, column: str, visited: Optional[Set[str]] = None) -> Set[str]:
-        """Find all ultimate target columns (recursively)."""
-        if visited is None:
-            visited = set()
+    def _index_graph(self):
+        """Number the columns and pack each one's successors into a tuple of ids."""
+        self.column_names = list(self.all_columns)
+        self.column_ids = {column: column_id for column_id, column in enumerate(self.column_names)}
+        ids = self.column_ids
+        graph = self.forward_graph
+        # Successors keep the set's iteration order so searches visit them as before
+        self.successor_ids = [tuple(ids[target] for target in graph[column]) if column in graph else ()
+                              for column in self.column_names]
+        self.component_by_id = [self.component_of[column] for column in self.column_names]
+
+    def _resolve_ultimate_sets(self):
+        """Compute ultimate sources/targets for every column in one sweep over the condensation DAG."""
+        components = self.components
+        count = len(components)
+        
+        dag_reverse: List[Set[int]] = [set() for _ in components]
+        for component_id, successors in enumerate(self.dag_forward):
+            for successor in successors:
+                dag_reverse[successor].add(component_id)
+        
+        def sweep(order, graph, dag_edges, cache):
+            resolved: List[FrozenSet[str]] = [frozenset()] * count
+            for component_id in order:
+                members = components[component_id]
+                if len(members) == 1 and members[0] not in graph:
+                    # No further edges: the column is its own ultimate source/target
+                    result = frozenset(members)
+                else:
+                    result = set()
+                    for neighbour in dag_edges[component_id]:
+                        result |= resolved[neighbour]
+                    result = frozenset(result)
+                resolved[component_id] = result
+                for member in members:
+                    cache[member] = result
+        
+        # Tarjan emits components downstream-first, so targets resolve in that order and sources in reverse
+        sweep(range(count), self.forward_graph, self.dag_forward, self._ult_tgt_cache)
+        sweep(range(count - 1, -1, -1), self.reverse_graph, dag_reverse, self._ult_src_cache)
+
+    def _components_reaching(self, targets: Set[str]) -> List[bool]:
+        """Flag each component that has at least one of `targets` downstream (or inside it)."""
+        reaches = [False] * len(self.components)
+        for component_id, members in enumerate(self.components):
+            # Downstream-first order: every successor is already resolved
+            reaches[component_id] = (any(member in targets for member in members) or
+                                     any(reaches[successor] for successor in self.dag_forward[component_id]))
+        return reaches
+
+    def find_ultimate_sources(self, column: str, visited: Optional[Set[str]] = None) -> FrozenSet[str]:
+        """Find all ultimate source columns (no incoming edges) upstream of a column.
+        
+        Columns in `visited` are treated as already explored and not walked through.
+        """
+        if visited is not None:
+            return self._find_ultimate_avoiding(column, visited, self.reverse_graph)
+        if not self._ult_src_cache:
+            self._resolve_ultimate_sets()
+        return self._ult_src_cache.get(column, frozenset((column,)))
+
+    def find_ultimate_targets(self, column: str, visited: Optional[Set[str]] = None) -> FrozenSet[str]:
+        """Find all ultimate target columns (no outgoing edges) downstream of a column.
+        
+        Columns in `visited` are treated as already explored and not walked through.
+        """
+        if visited is not None:
+            return self._find_ultimate_avoiding(column, visited, self.forward_graph)
+        if not self._ult_tgt_cache:
+            self._resolve_ultimate_sets()
+        return self._ult_tgt_cache.get(column, frozenset((column,)))
+
+    @staticmethod
+    def _find_ultimate_avoiding(column: str, visited: Set[str], graph: Dict[str, Set[str]]) -> FrozenSet[str]:
+        """Columns without further edges in `graph` that column reaches without passing through `visited`.
         
+        The uncached walk behind the `visited` argument; like the old recursive search, it adds
+        column to `visited`.
+        """
         if column in visited:
-            return set()  # Cycle detection
-        
+            return frozenset()  # Cycle detection
         visited.add(column)
         
-        # If no outgoing edges, this is an ultimate target
-        if column not in self.forward_graph:
-            return {column}
-        
-        ultimate_targets = set()
-        for target in self.forward_graph[column]:
-            ultimate_targets.update(self.find_ultimate_targets(target, visited.copy()))
-        
-        return ultimate_targets
+        blocked = set(visited)
+        ultimate = set()
+        stack = [column]
+        while stack:
+            current = stack.pop()
+            if current not in graph:
+                ultimate.add(current)
+                continue
+            for neighbour in graph[current]:
+                if neighbour not in blocked:
+                    blocked.add(neighbour)
+                    stack.append(neighbour)
+        return frozenset(ultimate)
 
     def find_paths(self, source: str, target: str, max_depth: int = 15) -> List[List[str]]:
         """Find all paths from source to target using BFS."""
@@ -147,17 +325,18 @@ class LineageAnalyzer:
             return [[source]]
         
         paths = []
-        queue = deque([(source, [source])])
+        # Each queued path carries a frozenset of its columns so the cycle check is O(1)
+        queue = deque([(source, [source], frozenset((source,)))])
         
         while queue:
-            current, path = queue.popleft()
+            current, path, on_path = queue.popleft()
             
             if len(path) > max_depth:
                 continue
             
             if current in self.forward_graph:
                 for next_col in self.forward_graph[current]:
-                    if next_col in path:  # Avoid cycles
+                    if next_col in on_path:  # Avoid cycles
                         continue
                     
                     new_path = path + [next_col]
@@ -165,11 +344,113 @@ class LineageAnalyzer:
                     if next_col == target:
                         paths.append(new_path)
                     else:
-                        queue.append((next_col, new_path))
+                        queue.append((next_col, new_path, on_path | {next_col}))
         
         return paths
 
-    def generate_end_to_end_lineages(self) -> Dict[str, List[Dict]]:
+    def find_paths_to_targets(self, source: str, targets: Set[str], max_depth: int = 15,
+                              keep: int = 5, reaches: Optional[List[bool]] = None,
+                              max_paths: int = 100_000) -> Dict[str, Tuple[List[List[str]], int, bool]]:
+        """Find paths from source to each reachable target with a single BFS.
+        
+        Returns target -> (first `keep` paths, total path count, whether the count is exact).
+        The paths are the ones find_paths(source, target) would list first - BFS finds them
+        shortest first - but the graph is traversed once per source instead of once per
+        (source, target) pair, and only `keep` paths per target are ever materialized. Pass
+        `reaches` from _components_reaching(targets) to stop extending paths into dead-end columns.
+        
+        The number of paths grows exponentially with fan-out, so the search stops after queueing
+        `max_paths` partial paths. The counts are then only lower bounds, and targets the search
+        had not reached yet get just their shortest path.
+        """
+        paths_by_target: Dict[str, List[List[str]]] = {}
+        path_counts: Dict[str, int] = {}
+        if source in targets:
+            paths_by_target[source] = [[source]]
+            path_counts[source] = 1
+        
+        source_id = self.column_ids.get(source)
+        if source_id is None:
+            return {target: (paths, path_counts[target], True) for target, paths in paths_by_target.items()}
+        
+        # The search itself runs on column ids; names are only looked up for kept paths
+        ids = self.column_ids
+        successors = self.successor_ids
+        target_ids = {ids[target] for target in targets if target in ids}
+        component_by_id = self.component_by_id
+        
+        kept_by_id: Dict[int, List[Tuple[int, ...]]] = {}
+        counts_by_id: Dict[int, int] = {}
+        queue = deque([(source_id, (source_id,), frozenset((source_id,)))])
+        budget = max_paths
+        
+        while queue and budget > 0:
+            current, path, on_path = queue.popleft()
+            
+            if len(path) > max_depth:
+                continue
+            
+            for next_id in successors[current]:
+                if next_id in on_path:  # Avoid cycles
+                    continue
+                
+                if next_id in target_ids:
+                    counts_by_id[next_id] = counts_by_id.get(next_id, 0) + 1
+                    kept = kept_by_id.setdefault(next_id, [])
+                    if len(kept) < keep:
+                        kept.append(path + (next_id,))
+                if successors[next_id]:
+                    if reaches is not None and not reaches[component_by_id[next_id]]:
+                        continue  # No target downstream, so no path through here can end on one
+                    queue.append((next_id, path + (next_id,), on_path | {next_id}))
+                    budget -= 1
+        
+        exact = not queue
+        if not exact:
+            for target_id, path in self._shortest_paths_by_id(source_id, target_ids, max_depth, reaches).items():
+                if target_id not in kept_by_id:
+                    kept_by_id[target_id] = [path]
+                    counts_by_id[target_id] = 1
+        
+        names = self.column_names
+        for target_id, kept in kept_by_id.items():
+            target = names[target_id]
+            paths_by_target[target] = [[names[column_id] for column_id in path] for path in kept]
+            path_counts[target] = counts_by_id[target_id]
+        
+        return {target: (paths, path_counts[target], exact or target == source)
+                for target, paths in paths_by_target.items()}
+
+    def _shortest_paths_by_id(self, source_id: int, target_ids: Set[int], max_depth: int,
+                              reaches: Optional[List[bool]] = None) -> Dict[int, Tuple[int, ...]]:
+        """One shortest path (as column ids) to each target within max_depth steps, by BFS over columns."""
+        successors = self.successor_ids
+        component_by_id = self.component_by_id
+        parent: Dict[int, int] = {source_id: source_id}
+        depth = {source_id: 0}
+        found: Dict[int, Tuple[int, ...]] = {}
+        queue = deque([source_id])
+        
+        while queue:
+            current = queue.popleft()
+            if depth[current] >= max_depth:
+                continue
+            for next_id in successors[current]:
+                if next_id in parent:
+                    continue
+                parent[next_id] = current
+                depth[next_id] = depth[current] + 1
+                if next_id in target_ids:
+                    path = [next_id]
+                    while path[-1] != source_id:
+                        path.append(parent[path[-1]])
+                    found[next_id] = tuple(reversed(path))
+                if successors[next_id] and (reaches is None or reaches[component_by_id[next_id]]):
+                    queue.append(next_id)
+        
+        return found
+
+    def generate_end_to_end_lineages(self) -> Dict[str, List[Lineage]]:
         """Generate comprehensive end-to-end lineages."""
         print("🎯 Generating End-to-End Lineages")
         print("=" * 40)
@@ -182,20 +463,9 @@ class LineageAnalyzer:
             "statistics": {}
         }
         
-        # Find ultimate sources and targets
-        ultimate_sources = set()
-        ultimate_targets = set()
-        
-        for column in self.all_columns:
-            table = column.split('.')[0]
-            
-            # Ultimate sources (no incoming edges)
-            if column not in self.reverse_graph:
-                ultimate_sources.add(column)
-            
-            # Ultimate targets (no outgoing edges)
-            if column not in self.forward_graph:
-                ultimate_targets.add(column)
+        # Find ultimate sources (no incoming edges) and targets (no outgoing edges)
+        ultimate_sources = self.all_columns - self.reverse_graph.keys()
+        ultimate_targets = self.all_columns - self.forward_graph.keys()
         
         print(f"📍 Found {len(ultimate_sources)} ultimate sources")
         print(f"🎯 Found {len(ultimate_targets)} ultimate targets")
@@ -206,44 +476,53 @@ class LineageAnalyzer:
         direct_count = 0
         indirect_count = 0
         
+        # Components with an ultimate target downstream; sources without one are skipped outright
+        reaches = self._components_reaching(ultimate_targets)
+        
         for source in ultimate_sources:
-            for target in ultimate_targets:
-                paths = self.find_paths(source, target)
+            if not reaches[self.component_of[source]]:
+                continue
+            
+            # One path search per source covers every ultimate target it reaches
+            for target, (paths, path_count, path_count_exact) in self.find_paths_to_targets(
+                    source, ultimate_targets, reaches=reaches).items():
+                # Get the shortest path
+                shortest_path = min(paths, key=len)
+                is_direct = len(shortest_path) == 2
                 
-                if paths:
-                    # Get the shortest path
-                    shortest_path = min(paths, key=len)
-                    is_direct = len(shortest_path) == 2
-                    
-                    lineage = {
-                        "source": source,
-                        "target": target,
-                        "source_table": source.split('.')[0],
-                        "source_column": source.split('.', 1)[1],
-                        "target_table": target.split('.')[0],
-                        "target_column": target.split('.', 1)[1],
-                        "category": self._categorize_lineage(source, target),
-                        "is_direct": is_direct,
-                        "shortest_path": shortest_path,
-                        "path_length": len(shortest_path) - 1,
-                        "all_paths": paths[:5],  # Limit to first 5 paths
-                        "path_count": len(paths)
-                    }
-                    
-                    # Categorize
-                    if is_direct:
-                        results["direct_lineages"].append(lineage)
-                        direct_count += 1
-                    else:
-                        results["indirect_lineages"].append(lineage)
-                        indirect_count += 1
-                    
-                    if lineage["category"] == "real_to_real":
-                        results["real_to_real"].append(lineage)
-                    else:
-                        results["temp_involved"].append(lineage)
-                    
-                    total_lineages += 1
+                source_table, source_column = self.column_parts[source]
+                target_table, target_column = self.column_parts[target]
+                
+                lineage = Lineage(
+                    source=source,
+                    target=target,
+                    source_table=source_table,
+                    source_column=source_column,
+                    target_table=target_table,
+                    target_column=target_column,
+                    category=self._categorize_lineage(source, target),
+                    is_direct=is_direct,
+                    shortest_path=shortest_path,
+                    path_length=len(shortest_path) - 1,
+                    all_paths=paths,
+                    path_count=path_count,
+                    path_count_exact=path_count_exact
+                )
+                
+                # Categorize
+                if is_direct:
+                    results["direct_lineages"].append(lineage)
+                    direct_count += 1
+                else:
+                    results["indirect_lineages"].append(lineage)
+                    indirect_count += 1
+                
+                if lineage.category == "real_to_real":
+                    results["real_to_real"].append(lineage)
+                else:
+                    results["temp_involved"].append(lineage)
+                
+                total_lineages += 1
         
         # Generate statistics
         results["statistics"] = {
@@ -272,10 +551,10 @@ class LineageAnalyzer:
         print("=" * 60)
         
         categories = [
-            ("Real-to-Real Direct", [l for l in results["real_to_real"] if l["is_direct"]]),
-            ("Real-to-Real Indirect", [l for l in results["real_to_real"] if not l["is_direct"]]),
-            ("Temp-Involved Direct", [l for l in results["temp_involved"] if l["is_direct"]]),
-            ("Temp-Involved Indirect", [l for l in results["temp_involved"] if not l["is_direct"]])
+            ("Real-to-Real Direct", [l for l in results["real_to_real"] if l.is_direct]),
+            ("Real-to-Real Indirect", [l for l in results["real_to_real"] if not l.is_direct]),
+            ("Temp-Involved Direct", [l for l in results["temp_involved"] if l.is_direct]),
+            ("Temp-Involved Indirect", [l for l in results["temp_involved"] if not l.is_direct])
         ]
         
         for category_name, lineages in categories:
@@ -286,22 +565,49 @@ class LineageAnalyzer:
             print("-" * 50)
             
             for i, lineage in enumerate(lineages[:max_display]):
-                print(f"\n{i+1}. {lineage['source']} → {lineage['target']}")
-                print(f"   Path Length: {lineage['path_length']} steps")
-                print(f"   Path: {' → '.join(lineage['shortest_path'])}")
+                print(f"\n{i+1}. {lineage.source} → {lineage.target}")
+                print(f"   Path Length: {lineage.path_length} steps")
+                print(f"   Path: {' → '.join(lineage.shortest_path)}")
                 
-                if lineage['path_count'] > 1:
-                    print(f"   Alternative Paths: {lineage['path_count'] - 1} more")
+                if not lineage.path_count_exact:
+                    print(f"   Paths: at least {lineage.path_count} (search capped)")
+                elif lineage.path_count > 1:
+                    print(f"   Alternative Paths: {lineage.path_count - 1} more")
             
             if len(lineages) > max_display:
                 print(f"\n   ... and {len(lineages) - max_display} more lineages")
 
     def save_results(self, results: Dict, output_file: str):
         """Save results to JSON file."""
-        with open(output_file, 'w') as f:
-            json.dump(results, f, indent=2)
+        if orjson is not None:
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_file, 'w') as f:
+                self._write_results_json(f, results)
         print(f"💾 Results saved to {output_file}")
 
+    @staticmethod
+    def _write_results_json(f, results: Dict):
+        """Write results as indented JSON one lineage at a time.
+        
+        Produces the same text as json.dump(results, f, indent=2, default=asdict) without
+        building the encoded form of every lineage list in memory at once.
+        """
+        f.write('{')
+        for i, (key, value) in enumerate(results.items()):
+            f.write(',\n  ' if i else '\n  ')
+            f.write(json.dumps(key) + ': ')
+            if isinstance(value, list) and value:
+                f.write('[')
+                for j, item in enumerate(value):
+                    f.write(',\n    ' if j else '\n    ')
+                    f.write(json.dumps(item, indent=2, default=asdict).replace('\n', '\n    '))
+                f.write('\n  ]')
+            else:
+                f.write(json.dumps(value, indent=2).replace('\n', '\n  '))
+        f.write('\n}' if results else '}')
+
     def display_summary(self, results: Dict):
         """Display a comprehensive summary."""
         stats = results["statistics"]
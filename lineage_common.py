@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Shared SQL preparation and sqllineage pass for the enhanced and final lineage parsers
+Both parsers split the procedure body, keep the DML statements, clean them and run
+sqllineage on each one in exactly the same way, so the work lives here once and the
+result is cached per procedure body, in process and on disk.
+"""
+
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import multiprocessing
+from itertools import chain, islice
+from sqlparse.engine import FilterStack
+from sqllineage.runner import LineageRunner
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+# Body of a stored procedure (CREATE PROCEDURE ... AS BEGIN <body> END GO)
+PROCEDURE_BODY_RE = re.compile(r'CREATE\s+PROCEDURE\s+[^\s]+.*?AS\s*BEGIN(.*?)END\s*GO', re.DOTALL | re.IGNORECASE)
+_DML_RE = re.compile(r'\b(INSERT|UPDATE|MERGE|SELECT.*INTO|WITH)\b', re.IGNORECASE)
+_VARIABLE_RE = re.compile(r'@[a-zA-Z_]\w*')
+_LINE_COMMENT_RE = re.compile(r'--.*?$', re.MULTILINE)
+_BLOCK_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+
+# Persistent cache of extracted column flows, keyed by the SHA-256 of the SQL text together with
+# the sqllineage version and _FLOWS_CACHE_VERSION (bump it when the statement cleaning changes).
+# SQL_LINEAGE_CACHE overrides where it lives; SQL_LINEAGE_NO_CACHE=1 (or --no-cache) turns it off.
+_DEFAULT_FLOWS_CACHE = '~/.cache/sql_lineage/flows.sqlite'
+_FLOWS_CACHE_VERSION = 2
+
+
+def _flows_cache_path():
+    """Path of the column flow cache, or None when it is turned off
+
+    Read from the environment on each call so pool processes and the command line agree.
+    """
+    if os.environ.get('SQL_LINEAGE_NO_CACHE', '') not in ('', '0'):
+        return None
+    return Path(os.environ.get('SQL_LINEAGE_CACHE') or _DEFAULT_FLOWS_CACHE).expanduser()
+
+
+def _flows_cache_prefix():
+    """Version prefix hashed ahead of the SQL text in flow cache keys"""
+    try:
+        sqllineage_version = version('sqllineage')
+    except PackageNotFoundError:
+        sqllineage_version = 'unknown'
+    return f"{_FLOWS_CACHE_VERSION}\0{sqllineage_version}\0".encode()
+
+
+def iter_dml_statements(sql):
+    """Split SQL into statements and yield the DML ones (stripped)
+
+    Uses the same ungrouped splitter as sqlparse.split, but statements are produced
+    one at a time instead of materializing every statement string up front.
+    If splitting fails, the SQL not yet split is treated as one statement, as the
+    whole SQL used to be when sqlparse.split raised.
+    """
+    consumed = 0  # Length of the SQL prefix the statements so far cover, or None if they don't line up
+    try:
+        for stmt in FilterStack().run(sql):
+            stmt_text = str(stmt)
+            if consumed is not None:
+                consumed = consumed + len(stmt_text) if sql.startswith(stmt_text, consumed) else None
+            stmt_clean = stmt_text.strip()
+            if stmt_clean and _DML_RE.search(stmt_clean):
+                yield stmt_clean
+    except Exception as e:
+        rest = sql[consumed:] if consumed is not None else sql
+        if consumed:
+            print(f"ℹ️  SQL splitting stopped early ({e}); treating the last {len(rest):,} characters as one statement")
+        stmt_clean = rest.strip()
+        if stmt_clean and _DML_RE.search(stmt_clean):
+            yield stmt_clean
+
+
+def _statement_flows(stmt):
+    """Clean one statement and run sqllineage on it
+
+    Returns the lower-cased (source column, target column) pairs, or None when the
+    statement is too short or fails to parse. Module-level so pool workers can run it.
+    """
+    try:
+        # Clean statement; each substitution only runs when its marker is present
+        clean_stmt = _VARIABLE_RE.sub("'placeholder'", stmt) if '@' in stmt else stmt
+        if '--' in clean_stmt:
+            clean_stmt = _LINE_COMMENT_RE.sub('', clean_stmt)
+        if '/*' in clean_stmt:
+            clean_stmt = _BLOCK_COMMENT_RE.sub('', clean_stmt)
+
+        if len(clean_stmt.strip()) < 20:
+            return None
+
+        # Parse with sqllineage
+        result = LineageRunner(clean_stmt, dialect="tsql")
+        column_lineage = result.get_column_lineage()
+
+        return [(str(mapping[0]).lower(), str(mapping[-1]).lower())
+                for mapping in column_lineage if mapping and len(mapping) >= 2]
+
+    except Exception:
+        # Silently continue on parse errors
+        return None
+
+
+def _open_flows_cache(path):
+    """Open (creating if needed) the column flow cache database"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE IF NOT EXISTS flows (sha BLOB PRIMARY KEY, json TEXT)')
+    return conn
+
+
+def _load_cached_flows(path, digest):
+    """Return cached (dml count, processed count, flows) for a SQL digest, or None on a miss"""
+    try:
+        conn = _open_flows_cache(path)
+        try:
+            row = conn.execute('SELECT json FROM flows WHERE sha = ?', (digest,)).fetchone()
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError) as e:
+        print(f"ℹ️  Column flow cache unavailable: {e}")
+        return None
+    if row is None:
+        return None
+    dml_count, processed_count, flows = json.loads(row[0])
+    return dml_count, processed_count, tuple(map(tuple, flows))
+
+
+def _store_cached_flows(path, digest, result):
+    """Store (dml count, processed count, flows) for a SQL digest"""
+    try:
+        conn = _open_flows_cache(path)
+        try:
+            with conn:
+                conn.execute('INSERT OR REPLACE INTO flows (sha, json) VALUES (?, ?)',
+                             (digest, json.dumps(result)))
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError) as e:
+        print(f"ℹ️  Could not update column flow cache: {e}")
+
+
+# Bounded: each entry holds a whole procedure body, and the disk cache covers anything evicted
+@lru_cache(maxsize=16)
+def extract_column_flows(sql):
+    """Run sqllineage over every DML statement in the SQL
+
+    Statements are independent, so they are parsed in a multiprocessing pool when
+    there is more than one; the pool consumes them as the splitter produces them and
+    results are collected in statement order.
+    Returns (dml statement count, processed statement count, flows) where flows is a
+    tuple of lower-cased (source column, target column) pairs in discovery order.
+    The last few results are cached on the SQL text, so re-parsing a procedure in one process is free,
+    and on disk by SQL digest (and sqllineage/cleaning version), so a re-run on an unchanged
+    procedure skips sqllineage. Results where any statement failed are not stored on disk.
+    """
+    cache_path = _flows_cache_path()
+    if cache_path is not None:
+        digest = hashlib.sha256(_flows_cache_prefix() + sql.encode()).digest()
+        cached = _load_cached_flows(cache_path, digest)
+        if cached is not None:
+            return cached
+
+    statements = iter_dml_statements(sql)
+    # Only a second statement makes the pool worth starting
+    head = list(islice(statements, 2))
+    statements = chain(head, statements)
+
+    flows = []
+    dml_count = 0
+    processed_count = 0
+
+    def collect(results):
+        nonlocal dml_count, processed_count
+        for statement_flows in results:
+            dml_count += 1
+            if statement_flows is not None:
+                flows.extend(statement_flows)
+                processed_count += 1
+
+    if (len(head) > 1 and (os.cpu_count() or 1) > 1 and
+            multiprocessing.parent_process() is None):
+        with multiprocessing.Pool(os.cpu_count()) as pool:
+            collect(pool.imap(_statement_flows, statements, chunksize=4))
+    else:
+        collect(map(_statement_flows, statements))
+
+    result = (dml_count, processed_count, tuple(flows))
+    # A statement that failed to parse may succeed after an upgrade or a cleaning fix, so only
+    # complete results are persisted
+    if cache_path is not None and processed_count == dml_count:
+        _store_cached_flows(cache_path, digest, result)
+    return result
@@ -20,6 +20,36 @@ import sys
 from datetime import datetime, timezone
 from typing import Dict, List, Set, Optional
 from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain
+
+# orjson parses the (often multi-MB) lineage and schema files straight from bytes and
+# serializes the events much faster than json.dump with indent; fall back to the stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# CTE aliases that are mapped to the cte namespace (lower-case)
+_TEMP_INDICATORS = frozenset({'x', 'j', 'a', 'r', 'scores', 'feerule', 'feecalc', 'bal',
+                              'needcheck', 'slice', 'map', 'src', 'joinmap', 'net'})
+
+# Schema prefixes of the input (source) and output (target) datasets
+_INPUT_SCHEMAS = ('staging.', 'ref.')
+_OUTPUT_SCHEMAS = ('core.', 'audit.', 'ops.')
+
+
+@dataclass(slots=True, frozen=True)
+class ParsedLineage:
+    """One lineage edge with its source and target names split once at load time."""
+    source_table: Optional[str]  # None when the source has no table part
+    source_column: str
+    target_table: str
+    target_column: str
+    path_length: int
+    same_table: bool  # source_table == target_table as reported by the analysis
 
 
 class OpenLineageGenerator:
@@ -29,16 +59,16 @@ class OpenLineageGenerator:
         print("=" * 50)
         
         try:
-            with open(metadata_file, 'r') as f:
-                self.metadata = json.load(f)
+            with open(metadata_file, 'rb') as f:
+                self.metadata = _json_loads(f.read())
             print(f"✅ Loaded C# metadata from {metadata_file}")
             
-            with open(lineage_file, 'r') as f:
-                self.lineage_data = json.load(f)
+            with open(lineage_file, 'rb') as f:
+                self.lineage_data = _json_loads(f.read())
             print(f"✅ Loaded lineage analysis from {lineage_file}")
             
-            with open(schema_file, 'r') as f:
-                self.schema = json.load(f)
+            with open(schema_file, 'rb') as f:
+                self.schema = _json_loads(f.read())
             print(f"✅ Loaded schema from {schema_file}")
         except Exception as e:
             print(f"❌ Error loading files: {e}")
@@ -53,22 +83,72 @@ class OpenLineageGenerator:
         self.run_id = str(uuid.uuid4())
         self.job_name = self.metadata.get('procedure_name', 'usp_ProcessDailyCoreBankingSettlement_Monster')
         
+        # Parse every lineage once (direct first) and bucket them by target table
+        self._parsed_lineages: List[ParsedLineage] = []
+        self._lineages_by_target: Dict[str, List[ParsedLineage]] = defaultdict(list)
+        for lineage in chain(self.lineage_data.get('direct_lineages', []),
+                             self.lineage_data.get('indirect_lineages', [])):
+            target = lineage.get('target', '')
+            if '.' not in target:
+                continue
+            target_table, target_col = target.rsplit('.', 1)
+            source = lineage.get('source', '')
+            source_table, source_col = source.rsplit('.', 1) if '.' in source else (None, source)
+            parsed = ParsedLineage(
+                source_table, source_col, target_table, target_col,
+                lineage.get('path_length', 1),
+                lineage.get('source_table', '') == lineage.get('target_table', '')
+            )
+            self._parsed_lineages.append(parsed)
+            self._lineages_by_target[target_table].append(parsed)
+        
+        # Transformation dicts keyed by (path length, same table)
+        self._transformation_cache: Dict[tuple, Dict] = {}
+        
+        # Classify schema tables into inputs and outputs once, and build their schema facet fields
+        self._schema_fields: Dict[str, List[Dict]] = {}
+        self._input_tables: List[str] = []
+        self._output_tables: List[str] = []
+        for table_name, columns in self.schema.items():
+            if table_name.startswith(_INPUT_SCHEMAS):
+                self._input_tables.append(table_name)
+                description = f"Column from {table_name}"
+            elif table_name.startswith(_OUTPUT_SCHEMAS):
+                self._output_tables.append(table_name)
+                description = f"Column in {table_name}"
+            else:
+                continue
+            self._schema_fields[table_name] = [
+                {
+                    "name": col_name,
+                    "type": col_type,
+                    "description": description
+                }
+                for col_name, col_type in columns.items()
+            ]
+        # Schema-qualified names normalize to themselves, so this is dataset name order
+        self._input_tables.sort()
+        self._output_tables.sort()
+        
+        # Input/output datasets are the same for every event; built on first use and shared
+        self._inputs: Optional[List[Dict]] = None
+        self._outputs: Optional[List[Dict]] = None
+        
         print(f"🏃 Run ID: {self.run_id}")
         print(f"📋 Job: {self.job_name}")
         print(f"📊 Schema tables: {len(self.schema)} tables")
         print("")
 
-    def _normalize_table_name(self, table_name: str) -> str:
-        """Normalize table names for OpenLineage."""
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _normalize_table_name(table_name: str) -> str:
+        """Normalize table names for OpenLineage (cached per name)."""
         # Remove # prefix from temp tables
         if table_name.startswith('#'):
             return f"temp.{table_name[1:]}"
         
         # Handle CTE aliases
-        temp_indicators = ['x', 'j', 'a', 'r', 'scores', 'feerule', 'feecalc', 'bal',
-                          'needcheck', 'slice', 'map', 'src', 'joinmap', 'net']
-        
-        if table_name.lower() in [t.lower() for t in temp_indicators]:
+        if table_name.lower() in _TEMP_INDICATORS:
             return f"cte.{table_name}"
         
         # Standard schema.table format
@@ -77,15 +157,24 @@ class OpenLineageGenerator:
         
         return table_name
 
-    def _get_transformation_type(self, lineage: Dict) -> Dict:
-        """Determine transformation type based on lineage path."""
-        path_length = lineage.get('path_length', 1)
-        source_table = lineage.get('source_table', '')
-        target_table = lineage.get('target_table', '')
-        
+    def _get_transformation_type(self, lineage: ParsedLineage) -> Dict:
+        """Determine transformation type based on lineage path.
+        
+        Results are cached per (path length, same table) and shared, so callers
+        must treat the returned dict as read-only.
+        """
+        cache_key = (lineage.path_length, lineage.same_table)
+        transformation = self._transformation_cache.get(cache_key)
+        if transformation is None:
+            transformation = self._transformation_cache[cache_key] = self._build_transformation_type(*cache_key)
+        return transformation
+
+    @staticmethod
+    def _build_transformation_type(path_length, same_table: bool) -> Dict:
+        """Build the transformation dict for a path length."""
         # Direct mapping (1 step)
         if path_length == 1:
-            if source_table == target_table:
+            if same_table:
                 return {
                     "type": "DIRECT",
                     "subtype": "IDENTITY",
@@ -118,152 +207,103 @@ class OpenLineageGenerator:
             "dataset": []
         }
         
-        # Get all lineages for this target table
-        target_lineages = []
+        fields = facet["fields"]
+        input_seen = set()
+        dataset_seen = set()
         
-        for lineage in self.lineage_data.get('direct_lineages', []):
-            target = lineage.get('target', '')
-            if '.' in target:
-                table_name = target.rsplit('.', 1)[0]
-                if table_name == target_table:
-                    target_lineages.append(lineage)
-        
-        for lineage in self.lineage_data.get('indirect_lineages', []):
-            target = lineage.get('target', '')
-            if '.' in target:
-                table_name = target.rsplit('.', 1)[0]
-                if table_name == target_table:
-                    target_lineages.append(lineage)
-        
-        # Group by target column
-        columns_map = defaultdict(list)
-        for lineage in target_lineages:
-            target = lineage.get('target', '')
-            if '.' in target:
-                target_col = target.rsplit('.', 1)[1]
-                columns_map[target_col].append(lineage)
-        
-        # Build field lineages
-        for target_col, lineages in columns_map.items():
-            input_fields = []
+        # One pass over the lineages for this target table: field lineages are grouped by
+        # target column as they come, and multi-step sources feed the dataset-level entries
+        for lineage in self._lineages_by_target.get(target_table, ()):
+            field_entry = fields.get(lineage.target_column)
+            if field_entry is None:
+                field_entry = fields[lineage.target_column] = {"inputFields": []}
             
-            for lineage in lineages:
-                source = lineage.get('source', '')
-                if '.' in source:
-                    source_table = source.rsplit('.', 1)[0]
-                    source_column = source.rsplit('.', 1)[1]
-                    
-                    source_table_norm = self._normalize_table_name(source_table)
-                    transformation = self._get_transformation_type(lineage)
-                    
-                    input_field = {
-                        "namespace": self.namespace,
-                        "name": source_table_norm,
-                        "field": source_column,
-                        "transformations": [transformation]
-                    }
-                    input_fields.append(input_field)
+            if lineage.source_table is None:
+                continue
             
-            facet["fields"][target_col] = {
-                "inputFields": input_fields
-            }
-        
-        # Build dataset-level transformations (for sorting, grouping, etc.)
-        dataset_transformations = set()
-        for lineage in target_lineages:
-            if lineage.get('path_length', 1) > 1:
-                source = lineage.get('source', '')
-                if '.' in source:
-                    source_table = source.rsplit('.', 1)[0]
-                    source_column = source.rsplit('.', 1)[1]
-                    
-                    source_table_norm = self._normalize_table_name(source_table)
-                    
-                    dataset_entry = {
+            source_table_norm = self._normalize_table_name(lineage.source_table)
+            transformation = self._get_transformation_type(lineage)
+            
+            # Several edges can render the same input field of a column; keep the first
+            input_key = (lineage.target_column, source_table_norm, lineage.source_column,
+                         transformation["subtype"], transformation["description"])
+            if input_key not in input_seen:
+                input_seen.add(input_key)
+                field_entry["inputFields"].append({
+                    "namespace": self.namespace,
+                    "name": source_table_norm,
+                    "field": lineage.source_column,
+                    "transformations": [transformation]
+                })
+            
+            # Dataset-level transformations (for sorting, grouping, etc.)
+            if lineage.path_length > 1:
+                dataset_key = (source_table_norm, lineage.source_column)
+                if dataset_key not in dataset_seen:
+                    dataset_seen.add(dataset_key)
+                    facet["dataset"].append({
                         "namespace": self.namespace,
                         "name": source_table_norm,
-                        "field": source_column,
+                        "field": lineage.source_column,
                         "transformations": [{
                             "type": "INDIRECT",
                             "subtype": "AGGREGATION",
                             "description": "Part of complex transformation chain",
                             "masking": False
                         }]
-                    }
-                    
-                    # Convert to tuple for set deduplication
-                    dataset_key = (dataset_entry["name"], dataset_entry["field"])
-                    if dataset_key not in {(d.get("name"), d.get("field")) for d in facet["dataset"]}:
-                        facet["dataset"].append(dataset_entry)
+                    })
         
         return facet
 
     def _get_input_datasets(self) -> List[Dict]:
-        """Get all input datasets from schema (staging and ref tables)."""
-        inputs = []
-        
-        for table_name in self.schema.keys():
-            if table_name.startswith('staging.') or table_name.startswith('ref.'):
-                inputs.append({
-                    "namespace": self.namespace,
-                    "name": self._normalize_table_name(table_name),
-                    "facets": {
-                        "schema": {
-                            "_producer": self.producer,
-                            "_schemaURL": "https://openlineage.io/spec/facets/1-2-0/SchemaDatasetFacet.json",
-                            "fields": [
-                                {
-                                    "name": col_name,
-                                    "type": col_type,
-                                    "description": f"Column from {table_name}"
-                                }
-                                for col_name, col_type in self.schema[table_name].items()
-                            ]
-                        }
+        """Get all input datasets from schema (staging and ref tables), sorted by name."""
+        return [
+            {
+                "namespace": self.namespace,
+                "name": self._normalize_table_name(table_name),
+                "facets": {
+                    "schema": {
+                        "_producer": self.producer,
+                        "_schemaURL": "https://openlineage.io/spec/facets/1-2-0/SchemaDatasetFacet.json",
+                        "fields": self._schema_fields[table_name]
                     }
-                })
-        
-        return sorted(inputs, key=lambda x: x["name"])
+                }
+            }
+            for table_name in self._input_tables
+        ]
 
     def _get_output_datasets(self) -> List[Dict]:
-        """Get all output datasets from schema (core, audit, ops tables) with column lineage facets."""
+        """Get all output datasets from schema (core, audit, ops tables) with column lineage facets, sorted by name."""
         outputs = []
         
-        for table_name in self.schema.keys():
-            if (table_name.startswith('core.') or 
-                table_name.startswith('audit.') or 
-                table_name.startswith('ops.')):
-                
-                # Build column lineage facet for this table
-                column_lineage_facet = self._build_column_lineage_facet(table_name)
-                
-                output = {
-                    "namespace": self.namespace,
-                    "name": self._normalize_table_name(table_name),
-                    "facets": {
-                        "schema": {
-                            "_producer": self.producer,
-                            "_schemaURL": "https://openlineage.io/spec/facets/1-2-0/SchemaDatasetFacet.json",
-                            "fields": [
-                                {
-                                    "name": col_name,
-                                    "type": col_type,
-                                    "description": f"Column in {table_name}"
-                                }
-                                for col_name, col_type in self.schema[table_name].items()
-                            ]
-                        },
-                        "columnLineage": column_lineage_facet
-                    }
+        for table_name in self._output_tables:
+            # Build column lineage facet for this table
+            column_lineage_facet = self._build_column_lineage_facet(table_name)
+            
+            output = {
+                "namespace": self.namespace,
+                "name": self._normalize_table_name(table_name),
+                "facets": {
+                    "schema": {
+                        "_producer": self.producer,
+                        "_schemaURL": "https://openlineage.io/spec/facets/1-2-0/SchemaDatasetFacet.json",
+                        "fields": self._schema_fields[table_name]
+                    },
+                    "columnLineage": column_lineage_facet
                 }
-                outputs.append(output)
+            }
+            outputs.append(output)
         
-        return sorted(outputs, key=lambda x: x["name"])
+        return outputs
 
     def generate_event(self, event_type: str = "COMPLETE") -> Dict:
         """Generate a complete OpenLineage event."""
         timestamp = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
         
+        if self._inputs is None:
+            self._inputs = self._get_input_datasets()
+            self._outputs = self._get_output_datasets()
+        
         event = {
             "eventType": event_type,
             "eventTime": timestamp,
@@ -288,8 +328,8 @@ class OpenLineageGenerator:
                     }
                 }
             },
-            "inputs": self._get_input_datasets(),
-            "outputs": self._get_output_datasets(),
+            "inputs": self._inputs,
+            "outputs": self._outputs,
             "producer": self.producer
         }
         
@@ -339,37 +379,70 @@ class OpenLineageGenerator:
             }
         }
         
-        with open(output_file, 'w') as f:
-            json.dump(output_data, f, indent=2)
+        if orjson is not None:
+            with open(output_file, 'wb') as f:
+                self._write_events_orjson(f, output_data)
+        else:
+            # json.dump already encodes and writes incrementally
+            with open(output_file, 'w') as f:
+                json.dump(output_data, f, indent=2)
         
         print(f"💾 OpenLineage events saved to {output_file}")
 
+    @staticmethod
+    def _write_events_orjson(f, output_data: Dict):
+        """Write the output as indented JSON one event at a time.
+        
+        Produces the same bytes as orjson.dumps(output_data, option=OPT_INDENT_2 |
+        OPT_NON_STR_KEYS) for the (string-keyed) output without holding the encoded
+        form of every event at once.
+        """
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        f.write(b'{')
+        for i, (key, value) in enumerate(output_data.items()):
+            f.write(b',\n  ' if i else b'\n  ')
+            f.write(orjson.dumps(key) + b': ')
+            if isinstance(value, list) and value:
+                f.write(b'[')
+                for j, item in enumerate(value):
+                    f.write(b',\n    ' if j else b'\n    ')
+                    f.write(orjson.dumps(item, option=option).replace(b'\n', b'\n    '))
+                f.write(b'\n  ]')
+            else:
+                f.write(orjson.dumps(value, option=option).replace(b'\n', b'\n  '))
+        f.write(b'\n}' if output_data else b'}')
+
     def display_summary(self, events: List[Dict]):
-        """Display a summary of generated events."""
-        print("\n" + "=" * 70)
-        print("🎯 OPENLINEAGE EVENT GENERATION SUMMARY")
-        print("=" * 70)
+        """Display a summary of generated events.
         
+        The summary is collected as lines and written in one call, since it prints a line per dataset.
+        """
         complete_event = events[-1]  # Last event should be COMPLETE
-        
-        print(f"📋 Job: {self.job_name}")
-        print(f"🏃 Run ID: {self.run_id}")
-        print(f"📅 Generated: {len(events)} events")
-        print("")
-        
-        print(f"📥 Input Datasets: {len(complete_event.get('inputs', []))}")
-        for input_ds in complete_event.get('inputs', []):
-            print(f"   • {input_ds['name']}")
-        
-        print(f"\n📤 Output Datasets: {len(complete_event.get('outputs', []))}")
-        for output_ds in complete_event.get('outputs', []):
+        inputs = complete_event.get('inputs', [])
+        outputs = complete_event.get('outputs', [])
+        
+        lines = [
+            "\n" + "=" * 70,
+            "🎯 OPENLINEAGE EVENT GENERATION SUMMARY",
+            "=" * 70,
+            f"📋 Job: {self.job_name}",
+            f"🏃 Run ID: {self.run_id}",
+            f"📅 Generated: {len(events)} events",
+            "",
+            f"📥 Input Datasets: {len(inputs)}"
+        ]
+        lines += [f"   • {input_ds['name']}" for input_ds in inputs]
+        
+        lines.append(f"\n📤 Output Datasets: {len(outputs)}")
+        for output_ds in outputs:
             facets = output_ds.get('facets', {})
             column_lineage = facets.get('columnLineage', {})
             field_count = len(column_lineage.get('fields', {}))
-            print(f"   • {output_ds['name']} ({field_count} columns with lineage)")
+            lines.append(f"   • {output_ds['name']} ({field_count} columns with lineage)")
         
-        print(f"\n🔗 Total Column Lineages: {self.lineage_data.get('statistics', {}).get('total_lineages', 0)}")
-        print("=" * 70)
+        lines.append(f"\n🔗 Total Column Lineages: {self.lineage_data.get('statistics', {}).get('total_lineages', 0)}")
+        lines.append("=" * 70)
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
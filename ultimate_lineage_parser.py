@@ -1,7 +1,35 @@
+import os
+import sys
 import re
+import mmap
+import multiprocessing
 import sqlparse
 from sqllineage.runner import LineageRunner
 from collections import defaultdict, OrderedDict
+from itertools import chain
+from functools import lru_cache
+
+# First keyword of a statement after any leading whitespace and comments (group 1), and the
+# ones that make it a DML statement worth tracing. Each comment form can only match one way,
+# so a failed match doesn't backtrack into treating commented-out text as code
+_FIRST_WORD_RE = re.compile(r'((?:\s|--[^\n]*$|/\*(?:[^*]|\*(?!/))*\*/)*)([A-Za-z_]\w*)', re.MULTILINE)
+_DML_FIRST_WORDS = frozenset({'INSERT', 'UPDATE', 'MERGE', 'WITH'})
+_DML_TYPES = frozenset({'INSERT', 'UPDATE', 'MERGE'})
+
+# Procedure body, matched against the raw (memory-mapped) file bytes
+_PROC_BODY_RE = re.compile(rb"AS\s*BEGIN(.*)END\s*GO", re.DOTALL | re.IGNORECASE)
+
+# Table category by name substring, in priority order. Each branch looks ahead over the whole
+# name, so the first category with any matching substring wins (not the leftmost substring)
+_CATEGORY_RE = re.compile(
+    r"(?=.*?(?:staging|ref))(?P<source>)"
+    r"|(?=.*?(?:#|temp|work|stage|valid|invalid|fees|post|bal|scores))(?P<intermediate>)"
+    r"|(?=.*?(?:core|audit|ops))(?P<target>)",
+    re.DOTALL
+)
+
+# Procedure parameters and variables, replaced with a literal before parsing
+_PARAM_RE = re.compile(r"@[a-zA-Z_]+")
 
 def extract_table_name(table_str):
     """Extract clean table name from various formats"""
@@ -15,47 +43,176 @@ def extract_table_name(table_str):
         return parts[-1]  # Take the table name part
     return table_str
 
+@lru_cache(maxsize=None)
 def categorize_table(table_name):
-    """Categorize tables into source, intermediate, or target"""
-    table_name = table_name.lower()
+    """Categorize tables into source, intermediate, or target (cached per name)"""
+    category = _CATEGORY_RE.match(table_name.lower())
+    return category.lastgroup if category else 'other'
+
+def resolve_final_targets(table_flow, tables):
+    """Map each of the given tables to the target tables its data ends up in
     
-    if any(pattern in table_name for pattern in ['staging', 'ref']):
-        return 'source'
-    elif any(pattern in table_name for pattern in ['#', 'temp', 'work', 'stage', 'valid', 'invalid', 'fees', 'post', 'bal', 'scores']):
-        return 'intermediate'
-    elif any(pattern in table_name for pattern in ['core', 'audit', 'ops']):
-        return 'target'
-    else:
-        return 'other'
+    A table's final targets are the target tables reachable from it through intermediate
+    and other tables. Those pass-through tables are condensed into strongly connected
+    components with an iterative Tarjan walk, which completes a component only after
+    everything it feeds, so each component's targets are its own direct targets plus its
+    children's - every table and edge is visited once for all the lookups together.
+    Target sets are integer bitmasks (one bit per target table) while propagating, so a
+    union is a single int OR; they are decoded to names only for the requested tables.
+    """
+    target_bits = {}     # target table -> bit
+    target_names = []    # bit index -> target table
+    direct_targets = {}  # table -> bitmask of target-category children
+    pass_through = {}    # table -> list of intermediate/other children
+    
+    def split_children(table):
+        if table not in pass_through:
+            direct, through = 0, []
+            for child in table_flow.get(table, ()):
+                category = categorize_table(child)
+                if category == 'target':
+                    bit = target_bits.get(child)
+                    if bit is None:
+                        bit = target_bits[child] = 1 << len(target_names)
+                        target_names.append(child)
+                    direct |= bit
+                elif category in ('intermediate', 'other'):
+                    through.append(child)
+            direct_targets[table] = direct
+            pass_through[table] = through
+        return pass_through[table]
+    
+    reach = {}  # pass-through table -> bitmask of final targets (shared per component)
+    index = {}
+    lowlink = {}
+    component_stack = []
+    on_stack = set()
+    
+    def visit(root):
+        index[root] = lowlink[root] = len(index)
+        component_stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(split_children(root)))]
+        
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    component_stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(split_children(child))))
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    # node is the root of a component; everything it feeds outside it is done
+                    component = []
+                    while True:
+                        member = component_stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    final_targets = 0
+                    for member in component:
+                        final_targets |= direct_targets[member]
+                        for child in pass_through[member]:
+                            if child in reach:
+                                final_targets |= reach[child]
+                    for member in component:
+                        reach[member] = final_targets
+    
+    resolved = {}
+    for table in tables:
+        final_bits = 0
+        for child in split_children(table):
+            if child not in index:
+                visit(child)
+            final_bits |= reach[child]
+        final_bits |= direct_targets[table]
+        
+        final_targets = set()
+        while final_bits:
+            lowest = final_bits & -final_bits
+            final_targets.add(target_names[lowest.bit_length() - 1])
+            final_bits ^= lowest
+        resolved[table] = final_targets
+    return resolved
+
+def read_procedure_body(path):
+    """Read a SQL file and return the procedure body, or the whole file if it has none
+    
+    The file is memory-mapped and searched as bytes, so only the text that is used gets decoded.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            sql_body = _PROC_BODY_RE.search(mm)
+            data = sql_body.group(1) if sql_body else mm[:]
+    # Same newline translation as reading the file in text mode
+    return data.decode("utf-8", "replace").replace("\r\n", "\n").replace("\r", "\n")
+
+def analyze_statement(stmt):
+    """Run sqllineage on one DML statement
+    
+    Returns (sources, targets, intermediates, column path count) with cleaned table names,
+    or the (truncated) error message when the statement can't be analyzed.
+    Module-level so pool workers can run it.
+    """
+    try:
+        clean_stmt = _PARAM_RE.sub("'sample_value'", stmt)
+        result = LineageRunner(clean_stmt, dialect="tsql")
+        
+        # The report only needs the number of column paths per stage (it picks the
+        # key stages by it), so the paths themselves aren't kept
+        column_count = len(result.get_column_lineage())
+        
+        return ([extract_table_name(table) for table in result.source_tables],
+                [extract_table_name(table) for table in result.target_tables],
+                [extract_table_name(table) for table in result.intermediate_tables],
+                column_count)
+    except Exception as e:
+        return str(e)[:50]
 
 def create_end_to_end_lineage_report():
     """Create the ultimate end-to-end lineage report"""
     
-    # Read the SQL file
-    with open("test.sql", "r") as f:
-        sql = f.read()
+    # Read the SQL file, keeping only the procedure body
+    sql = read_procedure_body("test.sql")
 
     print("🔍 " + "=" * 98)
     print("   ULTIMATE END-TO-END SQL LINEAGE ANALYSIS")
     print("   Banking Settlement Procedure: usp_ProcessDailyCoreBankingSettlement_Monster")
     print("=" * 100)
 
-    # Extract procedure body
-    sql_body = re.search(r"AS\s*BEGIN(.*)END\s*GO", sql, re.DOTALL | re.IGNORECASE)
-    if sql_body:
-        sql = sql_body.group(1)
-
-    # Find all DML statements
-    statements = sqlparse.split(sql)
+    # Find all DML statements. Splitting doesn't need sqlparse's grouping pass; a statement
+    # is classified by its first keyword, and only needs sqlparse when that is ambiguous
     dml_statements = []
     
-    for stmt_str in statements:
+    for stmt_str in sqlparse.split(sql):
         if stmt_str.strip():
-            parsed_stmt = sqlparse.parse(stmt_str)[0]
-            stmt_type = parsed_stmt.get_type()
-            first_token = parsed_stmt.tokens[0].normalized if parsed_stmt.tokens else ""
+            first_word = _FIRST_WORD_RE.match(stmt_str)
+            keyword = first_word.group(2).upper() if first_word else None
+            if first_word and not first_word.group(1):
+                is_dml = keyword in _DML_FIRST_WORDS
+            elif first_word and keyword != 'WITH':
+                # Comments/whitespace first: the statement type is the first keyword
+                is_dml = keyword in _DML_TYPES
+            else:
+                # Punctuation first, or a CTE after a comment - let sqlparse work out the type
+                parsed_stmt = sqlparse.parse(stmt_str)[0]
+                stmt_type = parsed_stmt.get_type()
+                first_token = parsed_stmt.tokens[0].normalized if parsed_stmt.tokens else ""
+                is_dml = stmt_type in ["INSERT", "UPDATE", "MERGE"] or first_token == 'WITH'
             
-            if stmt_type in ["INSERT", "UPDATE", "MERGE"] or first_token == 'WITH':
+            if is_dml:
                 dml_statements.append(stmt_str)
 
     # Analyze lineage
@@ -67,99 +224,80 @@ def create_end_to_end_lineage_report():
     }
     
     table_flow = defaultdict(set)  # source -> targets
-    column_flows = []
     processing_stages = []
 
     print(f"📊 Processing {len(dml_statements)} DML statements...")
     
-    for i, stmt in enumerate(dml_statements):
-        try:
-            clean_stmt = re.sub(r"@[a-zA-Z_]+", "'sample_value'", stmt)
-            result = LineageRunner(clean_stmt, dialect="tsql")
-            
-            source_tables = result.source_tables
-            target_tables = result.target_tables
-            intermediate_tables = result.intermediate_tables
-            column_lineage = result.get_column_lineage()
-            
-            # Categorize and track tables
-            stage_sources = []
-            stage_targets = []
-            stage_intermediates = []
-            
-            for table in source_tables:
-                table_name = extract_table_name(table)
-                category = categorize_table(table_name)
-                all_tables[category].add(table_name)
-                stage_sources.append(table_name)
-            
-            for table in target_tables:
-                table_name = extract_table_name(table)
-                category = categorize_table(table_name)
-                all_tables[category].add(table_name)
-                stage_targets.append(table_name)
-            
-            for table in intermediate_tables:
-                table_name = extract_table_name(table)
-                all_tables['intermediate'].add(table_name)
-                stage_intermediates.append(table_name)
-            
-            # Record stage
-            processing_stages.append({
-                'stage': i + 1,
-                'sources': stage_sources,
-                'targets': stage_targets,
-                'intermediates': stage_intermediates,
-                'columns': len(column_lineage)
-            })
-            
-            # Track flows
-            for source in source_tables:
-                source_name = extract_table_name(source)
-                for target in target_tables:
-                    target_name = extract_table_name(target)
-                    table_flow[source_name].add(target_name)
-            
-            # Track column flows
-            for mapping in column_lineage:
-                if mapping and len(mapping) >= 2:
-                    source_col = str(mapping[0]) if mapping[0] else 'unknown'
-                    target_col = str(mapping[-1]) if mapping[-1] else 'unknown'
-                    column_flows.append((source_col, target_col, i+1))
-                    
-        except Exception as e:
-            print(f"   ⚠️  Stage {i+1}: Processing error - {str(e)[:50]}...")
+    # Statements are independent, so they are parsed in a process pool when there is
+    # more than one; results come back in statement order
+    if (len(dml_statements) > 1 and (os.cpu_count() or 1) > 1 and
+            multiprocessing.parent_process() is None):
+        with multiprocessing.Pool(os.cpu_count()) as pool:
+            stage_results = pool.map(analyze_statement, dml_statements, chunksize=4)
+    else:
+        stage_results = list(map(analyze_statement, dml_statements))
+    
+    for i, stage_result in enumerate(stage_results):
+        if isinstance(stage_result, str):
+            print(f"   ⚠️  Stage {i+1}: Processing error - {stage_result}...")
+            continue
+        
+        stage_sources, stage_targets, stage_intermediates, column_count = stage_result
+        
+        # Categorize and track tables
+        for table_name in chain(stage_sources, stage_targets):
+            all_tables[categorize_table(table_name)].add(table_name)
+        
+        all_tables['intermediate'].update(stage_intermediates)
+        
+        # Record stage
+        processing_stages.append({
+            'stage': i + 1,
+            'sources': stage_sources,
+            'targets': stage_targets,
+            'intermediates': stage_intermediates,
+            'columns': column_count
+        })
+        
+        # Track flows: every source of the stage feeds every target, one set union per source
+        if stage_targets:
+            stage_target_set = set(stage_targets)
+            for source_name in stage_sources:
+                table_flow[source_name] |= stage_target_set
 
-    # REPORT GENERATION
-    print("\n🎯 " + "=" * 98)
-    print("   BUSINESS DATA FLOW OVERVIEW")
-    print("=" * 100)
+    # REPORT GENERATION - collected as lines and written in one call, since it prints
+    # several lines per source table and key stage
+    lines = []
+    append = lines.append
+    append("\n🎯 " + "=" * 98)
+    append("   BUSINESS DATA FLOW OVERVIEW")
+    append("=" * 100)
     
-    print("📥 SOURCE SYSTEMS:")
+    append("📥 SOURCE SYSTEMS:")
     source_list = sorted(all_tables['source'])
     if source_list:
         for i, table in enumerate(source_list, 1):
             targets = sorted(table_flow.get(table, set()))
-            print(f"   {i:2d}. {table:<30} → {', '.join(targets[:3])}")
+            append(f"   {i:2d}. {table:<30} → {', '.join(targets[:3])}")
             if len(targets) > 3:
-                print(f"       {'':<30}   (+ {len(targets)-3} more targets)")
+                append(f"       {'':<30}   (+ {len(targets)-3} more targets)")
     else:
-        print("   No direct source tables identified")
+        append("   No direct source tables identified")
 
-    print(f"\n🔄 PROCESSING LAYERS:")
+    append(f"\n🔄 PROCESSING LAYERS:")
     intermediate_list = sorted(all_tables['intermediate'])
     if intermediate_list:
         temp_tables = [t for t in intermediate_list if t.startswith('#')]
         other_intermediate = [t for t in intermediate_list if not t.startswith('#')]
         
         if temp_tables:
-            print(f"   Temporary Tables: {', '.join(temp_tables)}")
+            append(f"   Temporary Tables: {', '.join(temp_tables)}")
         if other_intermediate:
-            print(f"   Work/Stage Tables: {', '.join(other_intermediate)}")
+            append(f"   Work/Stage Tables: {', '.join(other_intermediate)}")
     else:
-        print("   No intermediate processing layers identified")
+        append("   No intermediate processing layers identified")
 
-    print(f"\n📤 TARGET SYSTEMS:")
+    append(f"\n📤 TARGET SYSTEMS:")
     target_list = sorted(all_tables['target'])
     if target_list:
         # Group by schema/system
@@ -168,17 +306,17 @@ def create_end_to_end_lineage_report():
         ops_tables = [t for t in target_list if 'ops' in t]
         
         if core_tables:
-            print(f"   Core Banking: {', '.join(core_tables)}")
+            append(f"   Core Banking: {', '.join(core_tables)}")
         if audit_tables:
-            print(f"   Audit/Logging: {', '.join(audit_tables)}")
+            append(f"   Audit/Logging: {', '.join(audit_tables)}")
         if ops_tables:
-            print(f"   Operations: {', '.join(ops_tables)}")
+            append(f"   Operations: {', '.join(ops_tables)}")
     else:
-        print("   No target systems identified")
+        append("   No target systems identified")
 
-    print("\n🔍 " + "=" * 98)
-    print("   DETAILED PROCESSING PIPELINE")
-    print("=" * 100)
+    append("\n🔍 " + "=" * 98)
+    append("   DETAILED PROCESSING PIPELINE")
+    append("=" * 100)
     
     # Show key stages
     key_stages = []
@@ -186,8 +324,8 @@ def create_end_to_end_lineage_report():
         if stage['columns'] > 5 or any('staging' in s for s in stage['sources']) or any('core' in t for t in stage['targets']):
             key_stages.append(stage)
     
-    print(f"{'Stage':<6} {'Description':<50} {'Columns'}")
-    print("-" * 100)
+    append(f"{'Stage':<6} {'Description':<50} {'Columns'}")
+    append("-" * 100)
     
     for stage in key_stages[:15]:  # Show first 15 key stages
         sources = stage['sources'][:2]
@@ -207,37 +345,20 @@ def create_end_to_end_lineage_report():
         if len(desc) > 48:
             desc = desc[:45] + "..."
             
-        print(f"{stage['stage']:<6} {desc:<50} {stage['columns']}")
+        append(f"{stage['stage']:<6} {desc:<50} {stage['columns']}")
 
-    print("\n🎯 " + "=" * 98)
-    print("   END-TO-END SOURCE-TO-TARGET MAPPING")
-    print("=" * 100)
+    append("\n🎯 " + "=" * 98)
+    append("   END-TO-END SOURCE-TO-TARGET MAPPING")
+    append("=" * 100)
     
-    # Build source-to-target mapping by following the flow
-    def find_final_targets(table_name, visited=None):
-        if visited is None:
-            visited = set()
-        if table_name in visited:
-            return set()
-        visited.add(table_name)
-        
-        targets = table_flow.get(table_name, set())
-        final_targets = set()
-        
-        for target in targets:
-            target_category = categorize_table(target)
-            if target_category == 'target':
-                final_targets.add(target)
-            elif target_category in ['intermediate', 'other']:
-                final_targets.update(find_final_targets(target, visited.copy()))
-        
-        return final_targets
+    # Build source-to-target mapping by following the flow, in one pass over the graph
+    source_final_targets = resolve_final_targets(table_flow, all_tables['source'])
 
-    print(f"{'Source System':<30} {'Final Destination(s)':<40} {'Data Purpose'}")
-    print("-" * 100)
+    append(f"{'Source System':<30} {'Final Destination(s)':<40} {'Data Purpose'}")
+    append("-" * 100)
     
     for source in sorted(all_tables['source']):
-        final_targets = find_final_targets(source)
+        final_targets = source_final_targets[source]
         if final_targets:
             targets_str = ', '.join(sorted(final_targets))
             if len(targets_str) > 38:
@@ -255,36 +376,37 @@ def create_end_to_end_lineage_report():
             else:
                 purpose = "Core Banking"
                 
-            print(f"{source:<30} {targets_str:<40} {purpose}")
+            append(f"{source:<30} {targets_str:<40} {purpose}")
         else:
-            print(f"{source:<30} {'(intermediate processing only)':<40} {'Data Staging'}")
+            append(f"{source:<30} {'(intermediate processing only)':<40} {'Data Staging'}")
 
-    print("\n📈 " + "=" * 98)
-    print("   SUMMARY STATISTICS")
-    print("=" * 100)
+    append("\n📈 " + "=" * 98)
+    append("   SUMMARY STATISTICS")
+    append("=" * 100)
     
     total_sources = len(all_tables['source'])
     total_intermediates = len(all_tables['intermediate'])
     total_targets = len(all_tables['target'])
     total_columns = sum(stage['columns'] for stage in processing_stages)
     
-    print(f"   📊 Processing Overview:")
-    print(f"      • Source tables: {total_sources}")
-    print(f"      • Processing layers: {total_intermediates}")
-    print(f"      • Target systems: {total_targets}")
-    print(f"      • Total column transformations: {total_columns}")
-    print(f"      • Processing stages: {len(processing_stages)}")
+    append(f"   📊 Processing Overview:")
+    append(f"      • Source tables: {total_sources}")
+    append(f"      • Processing layers: {total_intermediates}")
+    append(f"      • Target systems: {total_targets}")
+    append(f"      • Total column transformations: {total_columns}")
+    append(f"      • Processing stages: {len(processing_stages)}")
     
-    print(f"\n   🎯 Business Process:")
-    print(f"      • Daily settlement batch processing")
-    print(f"      • Multi-stage data validation and enrichment")
-    print(f"      • Fee calculation and risk assessment")
-    print(f"      • Dual-entry bookkeeping (ledger + GL)")
-    print(f"      • Comprehensive audit and reconciliation")
+    append(f"\n   🎯 Business Process:")
+    append(f"      • Daily settlement batch processing")
+    append(f"      • Multi-stage data validation and enrichment")
+    append(f"      • Fee calculation and risk assessment")
+    append(f"      • Dual-entry bookkeeping (ledger + GL)")
+    append(f"      • Comprehensive audit and reconciliation")
 
-    print("\n" + "=" * 100)
-    print("✅ ANALYSIS COMPLETE - End-to-end lineage mapping successful!")
-    print("=" * 100)
+    append("\n" + "=" * 100)
+    append("✅ ANALYSIS COMPLETE - End-to-end lineage mapping successful!")
+    append("=" * 100)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     create_end_to_end_lineage_report()